@@ -0,0 +1,195 @@
+import zlib
+from typing import Optional
+
+import anyio
+import anyio.lowlevel
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas gzip é oferecido
+    brotli = None
+
+
+# Tipos já comprimidos ou que precisam chegar ao cliente sem buffer (SSE)
+TIPOS_NAO_COMPRIMIDOS = ("text/event-stream", "image/", "audio/", "video/", "application/zip", "application/gzip")
+
+
+class CompressorGzip:
+    """Compressor gzip incremental: cada bloco sai completo (`Z_SYNC_FLUSH`)."""
+
+    def __init__(self, nivel: int):
+        self._compressor = zlib.compressobj(nivel, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def comprimir(self, bloco: bytes, final: bool) -> bytes:
+        comprimido = self._compressor.compress(bloco)
+        return comprimido + (self._compressor.flush() if final else self._compressor.flush(zlib.Z_SYNC_FLUSH))
+
+
+class CompressorBrotli:
+    """Compressor brotli incremental: cada bloco sai completo (`flush`)."""
+
+    def __init__(self, nivel: int):
+        self._compressor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, bloco: bytes, final: bool) -> bytes:
+        comprimido = self._compressor.process(bloco)
+        return comprimido + (self._compressor.finish() if final else self._compressor.flush())
+
+
+def escolher_codificacao(accept_encoding: str, disponiveis: tuple[str, ...]) -> Optional[str]:
+    """
+    Escolhe, entre as codificações disponíveis (em ordem de preferência do
+    servidor), a de maior peso `q` no cabeçalho `Accept-Encoding`.
+
+    Returns:
+        Optional[str]: Codificação escolhida, ou None para enviar sem compressão.
+    """
+    pesos = {}
+    for item in accept_encoding.lower().split(","):
+        nome, _, parametros = item.partition(";")
+        peso = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                peso = float(parametro[2:])
+            except ValueError:
+                peso = 0.0
+        if nome.strip():
+            pesos[nome.strip()] = peso
+    melhor, melhor_peso = None, 0.0
+    for codificacao in disponiveis:
+        peso = pesos.get(codificacao, pesos.get("*", 0.0))
+        if peso > melhor_peso:
+            melhor, melhor_peso = codificacao, peso
+    return melhor
+
+
+class CompressaoMiddleware:
+    """
+    Middleware ASGI que comprime as respostas com brotli ou gzip, conforme o
+    `Accept-Encoding` da requisição (brotli tem preferência em caso de empate).
+
+    Respostas menores que `tamanho_minimo` são enviadas sem compressão e
+    respostas em streaming continuam em streaming, com cada bloco comprimido e
+    enviado à medida que é produzido. Blocos a partir de `tamanho_minimo_thread`
+    são comprimidos fora do event loop, em no máximo `max_threads` threads
+    próprias (não disputam o pool de `run_in_threadpool`). Como o corpo enviado
+    muda, ETags fortes de respostas comprimidas passam a ser fracas (`W/`), o
+    que mantém o `If-None-Match` funcionando.
+
+    Usa apenas a interface ASGI (`receive`/`send`), sem depender de detalhes
+    internos do `GZipMiddleware` do Starlette.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        tamanho_minimo: int = 1000,
+        nivel_gzip: int = 6,
+        nivel_brotli: int = 4,
+        tamanho_minimo_thread: int = 128 * 1024,
+        max_threads: int = 40,
+    ):
+        """
+        Args:
+            app (ASGIApp): Aplicação ASGI.
+            tamanho_minimo (int): Tamanho (bytes) mínimo de uma resposta para ser comprimida.
+            nivel_gzip (int): Nível de compressão gzip (1-9).
+            nivel_brotli (int): Qualidade da compressão brotli (0-11).
+            tamanho_minimo_thread (int): Tamanho (bytes) a partir do qual um bloco é
+                comprimido em uma thread.
+            max_threads (int): Máximo de blocos comprimidos em threads ao mesmo tempo.
+        """
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.nivel_gzip = nivel_gzip
+        self.nivel_brotli = nivel_brotli
+        self.tamanho_minimo_thread = tamanho_minimo_thread
+        self.max_threads = max_threads
+        self.codificacoes = ("br", "gzip") if brotli is not None else ("gzip",)
+        # Um limitador por event loop (o `CapacityLimiter` fica preso ao loop em que é criado)
+        self._limitador: anyio.lowlevel.RunVar[anyio.CapacityLimiter] = anyio.lowlevel.RunVar("compressao_limitador")
+
+    def _obter_limitador(self) -> anyio.CapacityLimiter:
+        try:
+            return self._limitador.get()
+        except LookupError:
+            limitador = anyio.CapacityLimiter(self.max_threads)
+            self._limitador.set(limitador)
+            return limitador
+
+    def _criar_compressor(self, codificacao: str):
+        if codificacao == "br":
+            return CompressorBrotli(self.nivel_brotli)
+        return CompressorGzip(self.nivel_gzip)
+
+    async def _comprimir(self, compressor, bloco: bytes, final: bool) -> bytes:
+        if len(bloco) >= self.tamanho_minimo_thread:
+            return await anyio.to_thread.run_sync(
+                compressor.comprimir, bloco, final, limiter=self._obter_limitador()
+            )
+        return compressor.comprimir(bloco, final)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""), self.codificacoes)
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        compressor = None
+        # None enquanto o primeiro bloco do corpo não chega; depois, se a resposta é comprimida
+        comprimindo: Optional[bool] = None
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio, compressor, comprimindo
+            if message["type"] == "http.response.start":
+                # Segura o início até saber, pelo primeiro bloco, se a resposta será comprimida
+                inicio = message
+                return
+            if message["type"] != "http.response.body":
+                if comprimindo is None and inicio is not None:
+                    comprimindo = False
+                    await send(inicio)
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            mais_blocos = message.get("more_body", False)
+            if comprimindo is None:
+                headers = MutableHeaders(raw=inicio["headers"])
+                tipo = headers.get("content-type", "")
+                comprimindo = (
+                    "content-encoding" not in headers
+                    and "content-range" not in headers
+                    and not tipo.startswith(TIPOS_NAO_COMPRIMIDOS)
+                    and (mais_blocos or len(corpo) >= self.tamanho_minimo)
+                )
+                if comprimindo:
+                    compressor = self._criar_compressor(codificacao)
+                    headers["Content-Encoding"] = codificacao
+                    headers.add_vary_header("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = f"W/{etag}"
+                    corpo = await self._comprimir(compressor, corpo, not mais_blocos)
+                    if mais_blocos:
+                        del headers["Content-Length"]
+                    else:
+                        headers["Content-Length"] = str(len(corpo))
+                    message = {**message, "body": corpo}
+                await send(inicio)
+                await send(message)
+                return
+
+            if comprimindo:
+                message = {**message, "body": await self._comprimir(compressor, corpo, not mais_blocos)}
+            await send(message)
+
+        await self.app(scope, receive, enviar)
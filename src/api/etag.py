@@ -0,0 +1,22 @@
+import hashlib
+from typing import Optional
+
+
+def calcular_etag(*partes) -> str:
+    """
+    Gera uma ETag forte a partir das partes que determinam o conteúdo da resposta
+    (ex.: recurso, ID do cliente, versão e parâmetros da página).
+    """
+    conteudo = "\x1f".join(str(parte) for parte in partes).encode()
+    return f'"{hashlib.blake2b(conteudo, digest_size=16).hexdigest()}"'
+
+
+def if_none_match_corresponde(cabecalho: Optional[str], etag: str) -> bool:
+    """
+    Verifica se o cabeçalho `If-None-Match` da requisição contém a ETag
+    (comparação fraca, conforme a RFC 9110 para este cabeçalho).
+    """
+    if not cabecalho:
+        return False
+    candidatas = [candidata.strip() for candidata in cabecalho.split(",")]
+    return "*" in candidatas or etag in (candidata.removeprefix("W/") for candidata in candidatas)
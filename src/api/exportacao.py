@@ -0,0 +1,39 @@
+import csv
+import io
+from typing import AsyncIterator
+
+from pydantic import TypeAdapter
+
+from core.domain.cliente import Cliente
+
+_CLIENTE_JSON = TypeAdapter(Cliente)
+CAMPOS_CSV = ("id", "nome", "email", "tipo")
+
+# Formato da exportação -> (media type, extensão do arquivo)
+FORMATOS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+async def clientes_ndjson(lotes: AsyncIterator[list[Cliente]]) -> AsyncIterator[bytes]:
+    """
+    Converte lotes de clientes em NDJSON (um objeto por linha), um bloco por lote.
+    """
+    async for clientes in lotes:
+        yield b"".join(_CLIENTE_JSON.dump_json(cliente) + b"\n" for cliente in clientes)
+
+
+async def clientes_csv(lotes: AsyncIterator[list[Cliente]]) -> AsyncIterator[str]:
+    """
+    Converte lotes de clientes em CSV com cabeçalho, um bloco por lote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CAMPOS_CSV)
+    yield buffer.getvalue()
+    async for clientes in lotes:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((c.id, c.nome, c.email, int(c.tipo)) for c in clientes)
+        yield buffer.getvalue()
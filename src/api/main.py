@@ -1,29 +1,55 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request, Body
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Body, Query
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.openapi.models import Response as OpenAPIResponse
 from fastapi import status as http_status
+import asyncio
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Literal, Optional
+from pydantic import TypeAdapter
 
-from core.config.db import SessionLocal, Base, engine
-from core.domain.cliente import Cliente, ClienteCreate, ClienteUpdate
+from api.compressao import CompressaoMiddleware
+from api.etag import calcular_etag, if_none_match_corresponde
+from api.exportacao import FORMATOS, clientes_csv, clientes_ndjson
+from core.config.db import (
+    Base,
+    async_engine,
+    async_replica_engine,
+    engine,
+    estatisticas_pool,
+    get_async_db,
+    get_async_sessionmaker,
+    ler_do_primario,
+)
+from core.config.redis_config import RedisConfig
+from core.config.settings import get_settings
+from core.domain.cliente import Cliente, ClienteCreate, ClienteNaoEncontradoError, ClienteUpdate
 from core.domain.favorito import (
     FavoritoCreate, FavoritoResponse, FavoritoBatchCreate
 )
-from core.repository.cliente_repository import ClienteRepository
-from core.repository.favorito_repository import FavoritoRepository
-from core.service.cliente_service import ClienteService
+from core.domain.paginacao import CursorInvalidoError
+from core.domain.produto import ProdutoIndisponivelError
+from core.repository.cliente_cache import ClienteCache
+from core.repository.cliente_repository import AsyncClienteRepository
+from core.repository.favorito_repository import AsyncFavoritoRepository
+from core.repository.produto_cache import ProdutoCache, ProdutoCacheLocal
+from core.repository.versao_cache import VersaoCache
+from core.service.cliente_service import AsyncClienteService
 from core.security.security import (
+    SenhaExecutorSobrecarregadoError,
     create_access_token,
     get_current_user,
-    get_password_hash,
-    verify_password,
+    senha_executor,
+    token_cache,
 )
 from core.service.favorito_service import FavoritoService
+from core.service.produto_service import ProdutoService
+from externos.circuit_breaker import CircuitBreaker
 from externos.fake_store_product import FakeStoreProduct
 
+settings = get_settings()
 logger = logging.getLogger("uvicorn.error")
 # Configuração do logger
 logging.basicConfig(
@@ -31,29 +57,147 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )   
 
-app = FastAPI(title="AqiFome RESTful API")
 
-# Cria as tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
+def iniciar_recursos(state) -> None:
+    """
+    Cria os recursos compartilhados por todas as requisições do worker:
+    pool de conexões Redis, cache de produtos (memória + Redis), cache de perfis
+    para autenticação, contadores de versão (ETags), cliente HTTP da FakeStore e
+    o serviço de produtos que coalesce buscas simultâneas.
+    """
+    redis_config = RedisConfig()
+    state.redis_pool = redis_config.get_async_pool()
+    state.redis = redis_config.get_async_client(state.redis_pool)
+    state.produto_cache = ProdutoCache(
+        state.redis,
+        redis_config.get_expires(),
+        local=ProdutoCacheLocal(
+            max_itens=settings.produto_cache_local_max_itens,
+            ttl=settings.produto_cache_local_ttl,
+        ),
+        soft_ttl=settings.produto_cache_soft_ttl,
+        negativo_ttl=settings.produto_cache_negativo_ttl,
+    )
+    state.cliente_cache = (
+        ClienteCache(state.redis, settings.auth_cache_ttl) if settings.auth_cache_ttl > 0 else None
+    )
+    state.versao_cache = VersaoCache(state.redis)
+    state.fake_store_product = FakeStoreProduct(
+        circuit_breaker=CircuitBreaker(
+            "fakestore",
+            limite_falhas=settings.fakestore_cb_limite_falhas,
+            tempo_recuperacao=settings.fakestore_cb_tempo_recuperacao,
+        )
+    )
+    state.produto_service = ProdutoService(
+        state.produto_cache,
+        state.fake_store_product,
+        max_concorrencia=settings.fakestore_max_concurrency,
+        tempo_limite_lote=settings.fakestore_batch_timeout,
+        lock_distribuido=settings.produto_lock_distribuido,
+        lock_ttl=settings.produto_lock_ttl,
+    )
+    state.recursos_iniciados = True
 
 
-def get_db():
-    db = SessionLocal()
+async def encerrar_recursos(state) -> None:
+    """
+    Libera os recursos criados em `iniciar_recursos`.
+    """
+    await state.fake_store_product.aclose()
+    await state.redis.aclose()
+    await state.redis_pool.disconnect()
+    state.recursos_iniciados = False
+
+
+async def aquecer_catalogo(produto_service: ProdutoService, intervalo: float) -> None:
+    """
+    Carrega o catálogo no cache antes de aceitar requisições, evitando uma rajada
+    de consultas individuais à API externa após um cold start. Falhas não impedem
+    a inicialização: os produtos passam a ser carregados sob demanda.
+
+    Com `intervalo` zero (atualização periódica desativada), o catálogo é
+    carregado sem verificar se outro worker acabou de carregá-lo.
+    """
+    try:
+        async with asyncio.timeout(settings.fakestore_batch_timeout):
+            total = await produto_service.carregar_catalogo(intervalo)
+        logger.info(f"Catálogo aquecido com {total} produtos")
+    except Exception as e:
+        logger.warning(f"Falha ao aquecer o catálogo de produtos: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cria os recursos compartilhados por worker na inicialização e os libera no desligamento.
+    """
+    iniciar_recursos(app.state)
+    tarefas = [asyncio.create_task(app.state.produto_cache.escutar_invalidacoes())]
+    intervalo = settings.catalogo_intervalo_atualizacao
+    await aquecer_catalogo(app.state.produto_service, intervalo)
+    if intervalo > 0:
+        tarefas.append(asyncio.create_task(app.state.produto_service.atualizar_catalogo_periodicamente(intervalo)))
     try:
-        yield db
+        yield
     finally:
-        db.close()
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        await encerrar_recursos(app.state)
+        await async_engine.dispose()
+        if async_replica_engine is not None:
+            await async_replica_engine.dispose()
+
+
+app = FastAPI(title="AqiFome RESTful API", lifespan=lifespan)
+app.add_middleware(
+    CompressaoMiddleware,
+    tamanho_minimo=settings.compressao_tamanho_minimo,
+    nivel_gzip=settings.compressao_nivel_gzip,
+    nivel_brotli=settings.compressao_nivel_brotli,
+    max_threads=settings.compressao_max_threads,
+)
+
+# Cria as tabelas no banco de dados
+Base.metadata.create_all(bind=engine)
 
-def get_fake_store_product() -> FakeStoreProduct:
-    return FakeStoreProduct()
+
+def get_recursos(request: Request):
+    """
+    Retorna o estado da aplicação com os recursos compartilhados do worker.
+    """
+    state = request.app.state
+    if not getattr(state, "recursos_iniciados", False):
+        # Aplicação iniciada sem lifespan (ex.: TestClient fora de contexto)
+        iniciar_recursos(state)
+    return state
+
+def get_produto_cache(recursos=Depends(get_recursos)) -> ProdutoCache:
+    return recursos.produto_cache
+
+def get_produto_service(recursos=Depends(get_recursos)) -> ProdutoService:
+    return recursos.produto_service
+
+def get_versao_cache(recursos=Depends(get_recursos)) -> VersaoCache:
+    return recursos.versao_cache
 
 def get_favorito_service(
-    db: Session = Depends(get_db),
-    fake_store_product: FakeStoreProduct = Depends(get_fake_store_product)
+    db: AsyncSession = Depends(get_async_db),
+    produto_service: ProdutoService = Depends(get_produto_service),
+    versoes: VersaoCache = Depends(get_versao_cache),
 ) -> FavoritoService:
     return FavoritoService(
-        repository=FavoritoRepository(db),
-        fake_store_product=fake_store_product,
+        repository=AsyncFavoritoRepository(db),
+        produto_service=produto_service,
+        versoes=versoes,
+    )
+
+def get_cliente_service(
+    db: AsyncSession = Depends(get_async_db), recursos=Depends(get_recursos)
+) -> AsyncClienteService:
+    return AsyncClienteService(
+        AsyncClienteRepository(db), cliente_cache=recursos.cliente_cache, versoes=recursos.versao_cache
     )
 
 
@@ -70,24 +214,131 @@ def get_admin_user(current_user: Cliente = Depends(get_current_user)):
     return current_user
 
 
+# Cabeçalho com o cursor da próxima página nas listagens paginadas (ausente na última página)
+CABECALHO_PROXIMO_CURSOR = "X-Next-Cursor"
+
+
+def parametro_limite():
+    return Query(
+        settings.paginacao_limite_padrao, ge=1, le=settings.paginacao_limite_maximo,
+        description="Quantidade máxima de itens na página",
+    )
+
+
+def parametro_cursor():
+    return Query(None, description=f"Cursor da próxima página, obtido no cabeçalho {CABECALHO_PROXIMO_CURSOR}")
+
+
 def error_response(status_code: int, message: str) -> JSONResponse:
     return JSONResponse(
         status_code=status_code,
         content={"error": {"code": status_code, "message": message}},
     )
 
+
+# Serializadores dos modelos retornados pelas rotas (ver `json_response`)
+CLIENTE_JSON = TypeAdapter(Cliente)
+CLIENTES_JSON = TypeAdapter(list[Cliente])
+FAVORITOS_JSON = TypeAdapter(list[FavoritoResponse])
+
+
+def json_response(
+    adapter: TypeAdapter, conteudo: Any, status_code: int = 200, headers: Optional[dict] = None
+) -> Response:
+    """
+    Serializa modelos já validados pelas camadas de serviço direto para JSON
+    (pydantic-core), sem a segunda validação do `response_model`, que permanece
+    na rota apenas para documentar o schema no OpenAPI.
+    """
+    return Response(
+        adapter.dump_json(conteudo), status_code=status_code, headers=headers, media_type="application/json"
+    )
+
+
+async def etag_do_recurso(
+    request: Request,
+    db: AsyncSession,
+    versoes: VersaoCache,
+    cliente_id: int,
+    recurso: str,
+    *parametros,
+    produtos: Optional[ProdutoCache] = None,
+) -> tuple[Optional[str], Optional[Response]]:
+    """
+    Calcula a ETag de um recurso do cliente a partir do seu contador de versão
+    (e da geração do cache de produtos, se o recurso inclui dados de produtos),
+    sem acessar o banco. Se corresponder ao `If-None-Match` da requisição,
+    retorna também a resposta 304 a ser enviada.
+
+    Quando uma ETag é emitida, as consultas seguintes da sessão vão ao primário:
+    uma réplica atrasada poderia devolver dados anteriores à versão lida, e a
+    ETag passaria a validar uma representação que nunca foi enviada.
+
+    Returns:
+        tuple[Optional[str], Optional[Response]]: ETag (None se a versão estiver
+            indisponível) e resposta 304 (ou None).
+    """
+    consultas = [versoes.obter(cliente_id, recurso)]
+    if produtos is not None:
+        consultas.append(produtos.geracao())
+    versoes_lidas = await asyncio.gather(*consultas)
+    if None in versoes_lidas:
+        return None, None
+    etag = calcular_etag(recurso, cliente_id, *versoes_lidas, *parametros)
+    if if_none_match_corresponde(request.headers.get("if-none-match"), etag):
+        return etag, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos_etag(etag))
+    ler_do_primario(db)
+    return etag, None
+
+
+def cabecalhos_etag(etag: Optional[str]) -> dict:
+    # no-cache: o cliente pode guardar a resposta, mas deve revalidá-la a cada uso
+    return {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
+
+@app.exception_handler(SenhaExecutorSobrecarregadoError)
+async def senha_executor_sobrecarregado_handler(request: Request, exc: SenhaExecutorSobrecarregadoError):
+    """
+    Responde 503 imediatamente quando a fila de hashing de senhas está cheia,
+    em vez de deixar logins e cadastros acumularem.
+    """
+    logger.warning(f"{request.method} {request.url.path} rejeitada: {exc}")
+    resposta = error_response(503, "Serviço temporariamente sobrecarregado, tente novamente")
+    resposta.headers["Retry-After"] = "1"
+    return resposta
+
+
 @app.get("/")
 def root():
     return {"message": "API Online"}
 
+@app.get("/metricas", tags=["Monitoramento"])
+def metricas(
+    recursos=Depends(get_recursos), admin_user: Cliente = Depends(get_admin_user)
+):
+    """
+    Retorna métricas internas do worker (ex.: acertos e falhas de cada nível de cache,
+    estado do circuit breaker da API externa e uso do pool de conexões do banco).
+    Requer privilégios de administrador.
+    """
+    dados = {
+        "produto_cache": recursos.produto_cache.estatisticas(),
+        "auth_cache": recursos.cliente_cache.estatisticas() if recursos.cliente_cache else None,
+        "senhas": senha_executor.estatisticas(),
+        "token_cache": token_cache.estatisticas(),
+        "fakestore": recursos.fake_store_product.circuit_breaker.estatisticas(),
+        "db_pool": estatisticas_pool(async_engine),
+    }
+    if async_replica_engine is not None:
+        dados["db_pool_replica"] = estatisticas_pool(async_replica_engine)
+    return dados
+
 @app.post("/token")
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    service: AsyncClienteService = Depends(get_cliente_service)
     ):
-    cliente_repo = ClienteRepository(db)
-    user = cliente_repo.get_by_email(email=form_data.username)
-    if not user or not verify_password(form_data.password, user.senha.get_secret_value()):
+    user = await service.autenticar(form_data.username, form_data.password)
+    if not user:
         return error_response(401, "Usuário ou senha incorretos")
     access_token = create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -104,87 +355,144 @@ def login_for_access_token(
         500: {"description": "Erro interno"},
     },
 )
-def criar_cliente(
+async def criar_cliente(
     cliente: ClienteCreate = Body(..., example={
         "nome": "Edson Bezerra",
         "email": "exemplo@teste.com",
         "senha": "senha123",
         "tipo": 1
     }),
-    db: Session = Depends(get_db)
+    service: AsyncClienteService = Depends(get_cliente_service)
 ):
     """
     Cria um novo cliente.
     O cliente deve fornecer ao menos nome, e-mail, senha e tipo.
     A senha será armazenada com hash.
     """
-    service = ClienteService(ClienteRepository(db))
     try:
-        return service.criar_cliente(cliente)
+        return json_response(CLIENTE_JSON, await service.criar_cliente(cliente), status.HTTP_201_CREATED)
     except ValueError as e:
         logger.warning(f"Erro de validação ao criar cliente: {e}")
         return error_response(400, str(e))
+    except SenhaExecutorSobrecarregadoError:
+        raise
     except Exception as e:
         logger.error(f"Erro inesperado ao criar cliente: {e}", exc_info=True)
         return error_response(500, "Erro interno ao criar cliente")
 
 
 @app.get("/clientes", response_model=list[Cliente])
-def listar_clientes(
-    db: Session = Depends(get_db), admin_user: Cliente = Depends(get_admin_user)
+async def listar_clientes(
+    limit: int = parametro_limite(),
+    cursor: Optional[str] = parametro_cursor(),
+    service: AsyncClienteService = Depends(get_cliente_service),
+    admin_user: Cliente = Depends(get_admin_user)
 ):
     """
-    Lista todos os clientes. Requer privilégios de administrador.
+    Lista os clientes, paginados por cursor. Requer privilégios de administrador.
+    O cursor da próxima página é retornado no cabeçalho `X-Next-Cursor`.
     """
     try:
-        service = ClienteService(ClienteRepository(db))
-        return service.listar_clientes()
+        pagina = await service.listar_clientes_paginado(limit, cursor)
+    except CursorInvalidoError as e:
+        return error_response(400, str(e))
     except Exception as e:
         logger.error(f"Erro ao listar clientes: {e}", exc_info=True)
         return error_response(500, "Erro interno ao listar clientes")
+    headers = {CABECALHO_PROXIMO_CURSOR: pagina.proximo_cursor} if pagina.proximo_cursor else None
+    return json_response(CLIENTES_JSON, pagina.itens, headers=headers)
+
+
+async def lotes_exportacao(sessoes: async_sessionmaker, tamanho_lote: int) -> AsyncIterator[list[Cliente]]:
+    """
+    Lê os clientes da exportação em uma sessão do próprio stream, aberta no
+    primeiro lote e fechada após o último (ou quando o cliente desconecta). A
+    sessão da requisição (`get_async_db`) não serve: dependências com yield
+    podem ser encerradas antes de o corpo da resposta ser enviado.
+    """
+    async with sessoes() as db:
+        async for lote in AsyncClienteService(AsyncClienteRepository(db)).exportar_clientes(tamanho_lote):
+            yield lote
+
+
+@app.get(
+    "/clientes/exportar",
+    summary="Exportar todos os clientes em streaming",
+    responses={
+        200: {
+            "description": "Clientes em NDJSON (um por linha) ou CSV",
+            "content": {media_type: {} for media_type, _ in FORMATOS.values()},
+        },
+    },
+)
+async def exportar_clientes(
+    formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato da exportação"),
+    sessoes: async_sessionmaker = Depends(get_async_sessionmaker),
+    admin_user: Cliente = Depends(get_admin_user)
+):
+    """
+    Exporta todos os clientes, em ordem de ID. Requer privilégios de administrador.
+    As linhas são lidas do banco em lotes e enviadas à medida que chegam, com uso
+    de memória constante independentemente da quantidade de clientes.
+    """
+    lotes = lotes_exportacao(sessoes, settings.exportacao_tamanho_lote)
+    conteudo = clientes_csv(lotes) if formato == "csv" else clientes_ndjson(lotes)
+    media_type, extensao = FORMATOS[formato]
+    return StreamingResponse(
+        conteudo,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="clientes.{extensao}"'},
+    )
     
 
 @app.get("/clientes/{cliente_id}", response_model=Cliente)
-def buscar_cliente(
+async def buscar_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    service: AsyncClienteService = Depends(get_cliente_service),
+    versoes: VersaoCache = Depends(get_versao_cache),
     current_user: Cliente = Depends(get_current_user),
 ):
+    """
+    Retorna um cliente, com ETag. Um `If-None-Match` com a ETag atual recebe 304
+    sem consulta ao banco.
+    """
     if current_user.tipo != 1 and current_user.id != cliente_id:
         return error_response(403, "Operação não permitida")
-    service = ClienteService(ClienteRepository(db))
-    cliente = service.buscar_cliente(cliente_id)
+    etag, nao_modificado = await etag_do_recurso(request, db, versoes, cliente_id, VersaoCache.PERFIL)
+    if nao_modificado:
+        return nao_modificado
+    cliente = await service.buscar_cliente(cliente_id)
     if not cliente:
         return error_response(404, "Cliente não encontrado")
-    return cliente
+    return json_response(CLIENTE_JSON, cliente, headers=cabecalhos_etag(etag))
 
 
 @app.put("/clientes/{cliente_id}", response_model=Cliente)
-def atualizar_cliente(
+async def atualizar_cliente(
     cliente_id: int,
     cliente: ClienteUpdate,
-    db: Session = Depends(get_db),
+    service: AsyncClienteService = Depends(get_cliente_service),
     current_user: Cliente = Depends(get_current_user),
 ):
     if current_user.tipo != 1 and current_user.id != cliente_id:
         return error_response(403, "Operação não permitida")
-    service = ClienteService(ClienteRepository(db))
-    atualizado = service.atualizar_cliente(cliente_id, cliente)
-    if not atualizado:
+    try:
+        return json_response(CLIENTE_JSON, await service.atualizar_cliente(cliente_id, cliente))
+    except ClienteNaoEncontradoError:
         return error_response(404, "Cliente não encontrado")
-    return atualizado
 
 
 @app.delete("/clientes/{cliente_id}")
-def deletar_cliente(
+async def deletar_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    service: AsyncClienteService = Depends(get_cliente_service),
     current_user: Cliente = Depends(get_current_user),
 ):
     if current_user.tipo != 1 and current_user.id != cliente_id:
         return error_response(403, "Operação não permitida")
-    service = ClienteService(ClienteRepository(db))
-    if not service.deletar_cliente(cliente_id):
+    if not await service.deletar_cliente(cliente_id):
         return error_response(404, "Cliente não encontrado")
     return {"ok": True}
 
@@ -200,6 +508,7 @@ def deletar_cliente(
         400: {"description": "Erro de validação"},
         403: {"description": "Operação não permitida"},
         500: {"description": "Erro interno"},
+        504: {"description": "API externa de produtos indisponível"},
     },
     tags=["Favoritos"],
 )
@@ -219,7 +528,10 @@ async def adicionar_favoritos(
         favoritos_criados = await service.adicionar_favoritos(
             cliente_id=cliente_id, produto_ids=request_data.produto_ids
         )
-        return favoritos_criados
+        return json_response(FAVORITOS_JSON, favoritos_criados, status.HTTP_201_CREATED)
+    except ProdutoIndisponivelError as e:
+        logger.warning(f"Erro ao adicionar favoritos: {e}")
+        return error_response(504, str(e))
     except ValueError as e:
         logger.error(f"Erro ao adicionar favoritos: {e}")
         return error_response(400, str(e))
@@ -234,22 +546,50 @@ async def adicionar_favoritos(
     summary="Listar favoritos de um cliente",
     responses={
         200: {"description": "Lista de favoritos do cliente", "model": FavoritoResponse},
+        304: {"description": "Favoritos inalterados desde a ETag informada em If-None-Match"},
+        400: {"description": "Cursor de paginação inválido"},
         403: {"description": "Operação não permitida"},
         500: {"description": "Erro interno"},
+        504: {"description": "API externa de produtos indisponível"},
     },
     tags=["Favoritos"],
 )
-def listar_favoritos(
+async def listar_favoritos(
     cliente_id: int,
+    request: Request,
+    limit: int = parametro_limite(),
+    cursor: Optional[str] = parametro_cursor(),
+    db: AsyncSession = Depends(get_async_db),
     service: FavoritoService = Depends(get_favorito_service),
+    versoes: VersaoCache = Depends(get_versao_cache),
+    produto_cache: ProdutoCache = Depends(get_produto_cache),
     current_user: Cliente = Depends(get_current_user),
 ):
     """
-    Lista todos os produtos favoritos de um cliente autenticado.
+    Lista os produtos favoritos de um cliente autenticado, paginados por cursor.
+    O cursor da próxima página é retornado no cabeçalho `X-Next-Cursor`.
+
+    A resposta tem ETag; um `If-None-Match` com a ETag atual recebe 304 sem
+    consulta ao banco nem ao cache de produtos.
     """
     if cliente_id != current_user.id:
         return error_response(403, "Operação não permitida")
-    return service.listar_favoritos(cliente_id)
+    etag, nao_modificado = await etag_do_recurso(
+        request, db, versoes, cliente_id, VersaoCache.FAVORITOS, limit, cursor or "", produtos=produto_cache
+    )
+    if nao_modificado:
+        return nao_modificado
+    try:
+        pagina = await service.listar_favoritos_paginado(cliente_id, limit, cursor)
+    except CursorInvalidoError as e:
+        return error_response(400, str(e))
+    except ProdutoIndisponivelError as e:
+        logger.warning(f"Erro ao listar favoritos: {e}")
+        return error_response(504, str(e))
+    headers = cabecalhos_etag(etag)
+    if pagina.proximo_cursor:
+        headers[CABECALHO_PROXIMO_CURSOR] = pagina.proximo_cursor
+    return json_response(FAVORITOS_JSON, pagina.itens, headers=headers)
 
 
 @app.delete(
@@ -264,7 +604,7 @@ def listar_favoritos(
     },
     tags=["Favoritos"],
 )
-def remover_favorito(
+async def remover_favorito(
     cliente_id: int,
     produto_id: int,
     service: FavoritoService = Depends(get_favorito_service),
@@ -275,6 +615,24 @@ def remover_favorito(
     """
     if cliente_id != current_user.id:
         return error_response(403, "Operação não permitida")
-    if not service.remover_favorito(cliente_id, produto_id):
+    if not await service.remover_favorito(cliente_id, produto_id):
         return error_response(404, "Favorito não encontrado")
     return {"ok": True}
+
+
+# --- Produtos ---
+@app.delete(
+    "/produtos/{produto_id}/cache",
+    summary="Invalidar um produto em cache",
+    tags=["Produtos"],
+)
+async def invalidar_produto(
+    produto_id: int,
+    produto_cache: ProdutoCache = Depends(get_produto_cache),
+    admin_user: Cliente = Depends(get_admin_user),
+):
+    """
+    Remove o produto do cache em todos os workers e réplicas. Requer privilégios de administrador.
+    """
+    await produto_cache.invalidar([produto_id])
+    return {"ok": True}
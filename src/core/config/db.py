@@ -1,14 +1,217 @@
 """
 Módulo de configuração e inicialização do banco de dados SQLAlchemy.
 
-Responsável por criar engine, sessão e base declarativa.
+Responsável por criar engine, sessão e base declarativa. A engine síncrona
+(psycopg2) atende scripts e a criação das tabelas; a API usa a engine
+assíncrona (asyncpg), que não ocupa threads do worker durante o I/O.
+
+O pool de conexões é configurado por `Settings` (tamanho, overflow, timeout,
+recycle e pre-ping). Com `db_pgbouncer`, o pool local é desativado, o cache de
+prepared statements do asyncpg é desligado e os statements recebem nomes únicos,
+como exige o pgbouncer em modo transaction pooling.
+
+Com `db_replica_host`, as sessões da API enviam leituras à réplica e escritas
+ao primário (ver `RoutingSession`); leituras que não toleram atraso de
+replicação usam `ler_do_primario`.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from core.config.settings import get_settings
+import time
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import create_engine, exc, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from core.config.settings import Settings, get_settings
+
+
+class EstatisticasPool:
+    """
+    Contadores de espera por conexões (checkout) do pool do banco de dados.
+    """
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def registrar(self, espera: float, timeout: bool = False) -> None:
+        self.checkouts += 1
+        self.timeouts += int(timeout)
+        self.espera_total += espera
+        self.espera_maxima = max(self.espera_maxima, espera)
+
+    def resumo(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "espera_media_ms": round(1000 * self.espera_total / self.checkouts, 3) if self.checkouts else 0.0,
+            "espera_maxima_ms": round(1000 * self.espera_maxima, 3),
+        }
+
+
+class EsperaMonitoradaMixin:
+    """
+    Mede o tempo de cada checkout do pool (espera por conexão livre + pre-ping).
+
+    As estatísticas ficam na classe, e não na instância, para sobreviverem ao
+    `recreate()` do pool (ex.: após `engine.dispose()`).
+    """
+    estatisticas: EstatisticasPool
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except exc.TimeoutError:
+            self.estatisticas.registrar(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.estatisticas.registrar(time.perf_counter() - inicio)
+        return conexao
+
+
+class AsyncQueuePoolMonitorado(EsperaMonitoradaMixin, AsyncAdaptedQueuePool):
+    estatisticas = EstatisticasPool()
+    # Mantém os logs do pool sob o logger do SQLAlchemy (nível WARNING por padrão)
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+
+def pool_kwargs(settings: Settings, poolclass=None) -> dict:
+    """
+    Parâmetros de pool comuns às engines, conforme as configurações.
+    """
+    if settings.db_pgbouncer:
+        # O pgbouncer já mantém o pool; conexões locais ociosas apenas o ocupariam
+        return {"poolclass": NullPool}
+    kwargs = dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    if poolclass is not None:
+        kwargs["poolclass"] = poolclass
+    return kwargs
+
+
+def _nome_prepared_statement() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def criar_async_engine(settings: Settings, url: Optional[str] = None):
+    """
+    Cria a engine assíncrona (asyncpg) com o pool configurado.
+
+    Args:
+        settings (Settings): Configurações do pool.
+        url (str, opcional): URL de conexão; por padrão, a do primário.
+    """
+    url = make_url(url or settings.async_database_url)
+    connect_args = {}
+    if settings.db_pgbouncer:
+        # Prepared statements não sobrevivem à troca de conexão do pgbouncer
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        connect_args["statement_cache_size"] = 0
+        # Nomes únicos: o contador por conexão do asyncpg (__asyncpg_stmt_N__) colide
+        # entre conexões de cliente que compartilham a mesma conexão do servidor
+        connect_args["prepared_statement_name_func"] = _nome_prepared_statement
+    # Subclasse por engine: primário e réplica têm estatísticas separadas
+    poolclass = type(
+        AsyncQueuePoolMonitorado.__name__, (AsyncQueuePoolMonitorado,), {"estatisticas": EstatisticasPool()}
+    )
+    return create_async_engine(url, connect_args=connect_args, **pool_kwargs(settings, poolclass))
+
+
+def estatisticas_pool(engine) -> dict:
+    """
+    Retorna o estado atual do pool da engine (conexões em uso, ociosas e em
+    overflow) e os tempos de espera por conexão.
+    """
+    pool = engine.pool
+    if isinstance(pool, NullPool):
+        return {"modo": "pgbouncer"}
+    estatisticas = {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "ociosas": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, EsperaMonitoradaMixin):
+        estatisticas.update(pool.estatisticas.resumo())
+    return estatisticas
+
+
+class RoutingSession(Session):
+    """
+    Sessão que envia leituras à réplica e escritas (INSERT/UPDATE/DELETE e flush)
+    ao primário. Após a primeira escrita, todas as consultas da sessão vão ao
+    primário, para que a requisição leia o que acabou de gravar apesar do atraso
+    de replicação.
+    """
+    def __init__(self, *args, primario=None, replica=None, **kwargs):
+        """
+        Args:
+            primario (Engine): Engine (síncrona) do banco primário.
+            replica (Engine): Engine (síncrona) da réplica de leitura.
+        """
+        super().__init__(*args, **kwargs)
+        self.primario = primario
+        self.replica = replica
+        self.usar_primario = False
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self.usar_primario or self._flushing or getattr(clause, "is_dml", False):
+            self.usar_primario = True
+            return self.primario
+        return self.replica
+
 
 settings = get_settings()
-engine = create_engine(settings.database_url)
+engine = create_engine(settings.database_url, **pool_kwargs(settings))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = criar_async_engine(settings)
+async_replica_engine = (
+    criar_async_engine(settings, settings.async_replica_database_url)
+    if settings.async_replica_database_url else None
+)
+if async_replica_engine is not None:
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primario=async_engine.sync_engine,
+        replica=async_replica_engine.sync_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+else:
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
+
+
+async def get_async_db():
+    """
+    Dependência que fornece uma AsyncSession por requisição.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Dependência que fornece a fábrica de sessões, para respostas em streaming
+    que abrem a própria sessão e a mantêm até o fim do corpo.
+    """
+    return AsyncSessionLocal
+
+
+def ler_do_primario(db) -> None:
+    """
+    Envia as próximas consultas da sessão ao primário. Sem réplica configurada,
+    não tem efeito.
+
+    Args:
+        db (AsyncSession): Sessão da requisição.
+    """
+    if isinstance(db.sync_session, RoutingSession):
+        db.sync_session.usar_primario = True
@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 import os
 
 class RedisConfig:
@@ -8,14 +9,48 @@ class RedisConfig:
         self.db = int(os.getenv("REDIS_DB", 0))
         self.decode_responses = True
         self.expires = int(os.getenv("REDIS_EXPIRATION", 3600))
+        self.max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+        self.pool_timeout = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+        self.socket_timeout = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+        self.socket_connect_timeout = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 2))
+        self.health_check_interval = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
 
-    def get_client(self):
-        return redis.Redis(
+    def _pool_kwargs(self) -> dict:
+        return dict(
             host=self.host,
             port=self.port,
             db=self.db,
-            decode_responses=self.decode_responses
+            decode_responses=self.decode_responses,
+            max_connections=self.max_connections,
+            timeout=self.pool_timeout,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_connect_timeout,
+            health_check_interval=self.health_check_interval,
         )
 
+    def get_pool(self) -> redis.BlockingConnectionPool:
+        """
+        Pool de conexões síncrono e limitado. Ao atingir `max_connections`,
+        aguarda até `pool_timeout` segundos por uma conexão livre.
+        """
+        return redis.BlockingConnectionPool(**self._pool_kwargs())
+
+    def get_async_pool(self) -> redis.asyncio.BlockingConnectionPool:
+        """
+        Pool de conexões asyncio e limitado, a ser criado uma vez por worker
+        e compartilhado por todos os clientes (ver `lifespan` em `api/main.py`).
+        """
+        return redis.asyncio.BlockingConnectionPool(**self._pool_kwargs())
+
+    def get_client(self, pool: redis.ConnectionPool | None = None):
+        return redis.Redis(connection_pool=pool or self.get_pool())
+
+    def get_async_client(self, pool: redis.asyncio.ConnectionPool | None = None):
+        """
+        Cliente asyncio do Redis, para uso em rotas e serviços assíncronos
+        sem bloquear o event loop. Reutiliza `pool` quando informado.
+        """
+        return redis.asyncio.Redis(connection_pool=pool or self.get_async_pool())
+
     def get_expires(self):
         return self.expires
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv, find_dotenv
 import os
+from typing import Optional
 import logging
 
 # Configurando logging básico
@@ -21,6 +22,46 @@ class Settings(BaseSettings):
         secret_key (str): Chave secreta para assinar tokens JWT.
         algorithm (str): Algoritmo de assinatura JWT.
         access_token_expire_minutes (int): Tempo de expiração do token de acesso.
+        bcrypt_rounds (int): Custo (log2 de iterações) do bcrypt; hashes com outro custo são refeitos no login.
+        senha_max_workers (int): Threads dedicadas ao hashing e à verificação de senhas, por worker.
+        senha_max_fila (int): Operações de senha que podem aguardar uma thread; além disso a API responde 503.
+        token_cache_max_itens (int): Máximo de tokens verificados mantidos em memória por worker (0 desativa).
+        auth_cache_ttl (int): Tempo (s) que o perfil do cliente autenticado permanece em cache (0 desativa).
+        fakestore_url (str): URL base da API externa de produtos (FakeStore).
+        http_max_connections (int): Máximo de conexões simultâneas do pool HTTP.
+        http_max_keepalive_connections (int): Máximo de conexões ociosas mantidas vivas (keep-alive).
+        http_keepalive_expiry (float): Tempo (s) que uma conexão ociosa permanece no pool.
+        http_connect_timeout (float): Timeout (s) para estabelecer conexão com a API externa.
+        http_read_timeout (float): Timeout (s) de leitura da resposta da API externa.
+        http2 (bool): Habilita HTTP/2 no cliente HTTP (requer o pacote `h2`).
+        fakestore_max_concurrency (int): Máximo de consultas simultâneas à API externa por lote.
+        fakestore_batch_timeout (float): Tempo total (s) para validar um lote de produtos.
+        produto_cache_local_max_itens (int): Máximo de produtos no cache em memória de cada worker.
+        produto_cache_local_ttl (float): Tempo (s) de vida de um produto no cache em memória.
+        produto_lock_distribuido (bool): Coalesce buscas de um mesmo produto entre workers via lock no Redis.
+        produto_lock_ttl (float): Validade (s) do lock distribuído de busca de produto.
+        produto_cache_soft_ttl (float): Idade (s) a partir da qual um produto em cache é revalidado em segundo plano.
+        produto_cache_negativo_ttl (int): Tempo (s) que um ID desconhecido pela API externa permanece no cache como inexistente.
+        fakestore_cb_limite_falhas (int): Falhas consecutivas da API externa que abrem o circuit breaker.
+        fakestore_cb_tempo_recuperacao (float): Tempo (s) com o circuito aberto antes de uma nova tentativa.
+        catalogo_intervalo_atualizacao (float): Intervalo (s) entre cargas completas do catálogo no cache
+            (0 desativa a atualização periódica; a carga na inicialização é sempre feita).
+        paginacao_limite_padrao (int): Tamanho de página padrão das listagens paginadas.
+        paginacao_limite_maximo (int): Tamanho de página máximo aceito nas listagens paginadas.
+        compressao_tamanho_minimo (int): Tamanho (bytes) a partir do qual as respostas são comprimidas.
+        compressao_nivel_gzip (int): Nível de compressão gzip das respostas (1-9).
+        compressao_nivel_brotli (int): Qualidade da compressão brotli das respostas (0-11).
+        compressao_max_threads (int): Máximo de threads comprimindo blocos grandes de respostas ao mesmo tempo.
+        exportacao_tamanho_lote (int): Linhas lidas do banco por vez nas exportações em streaming.
+        db_pool_size (int): Conexões mantidas abertas no pool do banco de dados, por worker.
+        db_max_overflow (int): Conexões extras permitidas acima de `db_pool_size` em picos.
+        db_pool_timeout (float): Tempo (s) máximo de espera por uma conexão livre no pool.
+        db_pool_recycle (int): Idade (s) após a qual uma conexão é descartada e reaberta (-1 desativa).
+        db_pool_pre_ping (bool): Testa a conexão antes de usá-la, descartando conexões mortas.
+        db_pgbouncer (bool): Modo compatível com pgbouncer em transaction pooling (sem pool local
+            e sem prepared statements em cache).
+        db_replica_host (str): Host da réplica de leitura do banco de dados (vazio desativa). Usa
+            as mesmas credenciais, porta e banco do primário.
     """
 
     db_host: str = os.getenv("DB_HOST", "localhost")
@@ -31,6 +72,43 @@ class Settings(BaseSettings):
     secret_key: str = os.getenv("SECRET_KEY", "22fe53ced2c099e3f81f42cbb1ef7e2daeb120cf858184c25072d9cce611e2bb")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    senha_max_workers: int = int(os.getenv("SENHA_MAX_WORKERS", 4))
+    senha_max_fila: int = int(os.getenv("SENHA_MAX_FILA", 32))
+    token_cache_max_itens: int = int(os.getenv("TOKEN_CACHE_MAX_ITENS", 10000))
+    auth_cache_ttl: int = int(os.getenv("AUTH_CACHE_TTL", 60))
+    fakestore_url: str = os.getenv("FAKESTORE_URL", "https://fakestoreapi.com")
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+    http_connect_timeout: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3))
+    http_read_timeout: float = float(os.getenv("HTTP_READ_TIMEOUT", 5))
+    http2: bool = os.getenv("HTTP2", "false").lower() == "true"
+    fakestore_max_concurrency: int = int(os.getenv("FAKESTORE_MAX_CONCURRENCY", 10))
+    fakestore_batch_timeout: float = float(os.getenv("FAKESTORE_BATCH_TIMEOUT", 10))
+    produto_cache_local_max_itens: int = int(os.getenv("PRODUTO_CACHE_LOCAL_MAX_ITENS", 1000))
+    produto_cache_local_ttl: float = float(os.getenv("PRODUTO_CACHE_LOCAL_TTL", 300))
+    produto_lock_distribuido: bool = os.getenv("PRODUTO_LOCK_DISTRIBUIDO", "false").lower() == "true"
+    produto_lock_ttl: float = float(os.getenv("PRODUTO_LOCK_TTL", 5))
+    produto_cache_soft_ttl: float = float(os.getenv("PRODUTO_CACHE_SOFT_TTL", 600))
+    produto_cache_negativo_ttl: int = int(os.getenv("PRODUTO_CACHE_NEGATIVO_TTL", 60))
+    fakestore_cb_limite_falhas: int = int(os.getenv("FAKESTORE_CB_LIMITE_FALHAS", 5))
+    fakestore_cb_tempo_recuperacao: float = float(os.getenv("FAKESTORE_CB_TEMPO_RECUPERACAO", 30))
+    catalogo_intervalo_atualizacao: float = float(os.getenv("CATALOGO_INTERVALO_ATUALIZACAO", 300))
+    paginacao_limite_padrao: int = int(os.getenv("PAGINACAO_LIMITE_PADRAO", 50))
+    paginacao_limite_maximo: int = int(os.getenv("PAGINACAO_LIMITE_MAXIMO", 200))
+    compressao_tamanho_minimo: int = int(os.getenv("COMPRESSAO_TAMANHO_MINIMO", 1000))
+    compressao_nivel_gzip: int = int(os.getenv("COMPRESSAO_NIVEL_GZIP", 6))
+    compressao_nivel_brotli: int = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", 4))
+    compressao_max_threads: int = int(os.getenv("COMPRESSAO_MAX_THREADS", 40))
+    exportacao_tamanho_lote: int = int(os.getenv("EXPORTACAO_TAMANHO_LOTE", 1000))
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 10))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 5))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    db_pgbouncer: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    db_replica_host: str = os.getenv("DB_REPLICA_HOST", "")
 
     # Mantendo model_config apenas para compatibilidade com o Pydantic
     model_config = {
@@ -68,6 +146,28 @@ class Settings(BaseSettings):
         logger.info(f"Construindo URL do banco de dados com host: {self.db_host}, porta: {self.db_port}, usuário: {self.db_user}")
         return f"postgresql://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    @property
+    def async_database_url(self) -> str:
+        """
+        Monta a URL de conexão assíncrona (driver asyncpg) com o banco de dados PostgreSQL.
+
+        Returns:
+            str: URL de conexão.
+        """
+        return self.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    @property
+    def async_replica_database_url(self) -> Optional[str]:
+        """
+        Monta a URL de conexão assíncrona com a réplica de leitura, se configurada.
+
+        Returns:
+            Optional[str]: URL de conexão, ou None sem réplica.
+        """
+        if not self.db_replica_host:
+            return None
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_pass}@{self.db_replica_host}:{self.db_port}/{self.db_name}"
+
 def get_settings() -> Settings:
     """
     Retorna uma instância das configurações da aplicação.
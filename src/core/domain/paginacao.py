@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from typing import Generic, Optional, TypeVar
+from pydantic import BaseModel, ConfigDict
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    """
+    Página de uma listagem paginada por cursor (keyset no `id`).
+    `proximo_cursor` é None na última página.
+    """
+    itens: list[T]
+    proximo_cursor: Optional[str] = None
+
+    model_config = ConfigDict(frozen=True)
+
+
+class CursorInvalidoError(ValueError):
+    """Exceção para cursores de paginação malformados ou adulterados."""
+
+    pass
+
+
+def codificar_cursor(ultimo_id: int) -> str:
+    """
+    Gera o cursor opaco que aponta para os registros após `ultimo_id`.
+    """
+    dados = json.dumps({"id": ultimo_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> int:
+    """
+    Extrai o último `id` da página anterior a partir do cursor.
+
+    Raises:
+        CursorInvalidoError: Se o cursor não foi gerado por `codificar_cursor`.
+    """
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        ultimo_id = dados["id"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise CursorInvalidoError("Cursor de paginação inválido") from e
+    if not isinstance(ultimo_id, int) or isinstance(ultimo_id, bool):
+        raise CursorInvalidoError("Cursor de paginação inválido")
+    return ultimo_id
+
+
+def fatiar_pagina(registros: list, limite: int) -> tuple[list, Optional[str]]:
+    """
+    Separa a página atual do cursor da próxima.
+
+    Args:
+        registros (list): Até `limite + 1` registros ordenados por `id`; o excedente
+            indica que há uma próxima página.
+        limite (int): Tamanho da página.
+    Returns:
+        tuple[list, Optional[str]]: Registros da página e cursor da próxima (ou None).
+    """
+    if len(registros) <= limite:
+        return registros, None
+    pagina = registros[:limite]
+    return pagina, codificar_cursor(pagina[-1].id)
@@ -26,3 +26,10 @@ class ProdutoExterno(BaseModel):
     rating: Optional[Rating] = None  # Alguns produtos podem não ter avaliações
     
     model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+
+class ProdutoIndisponivelError(Exception):
+    """Exceção para produtos que não puderam ser validados na API externa a tempo."""
+
+    pass
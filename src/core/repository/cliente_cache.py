@@ -0,0 +1,82 @@
+import logging
+from typing import Optional
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from core.domain.cliente import Cliente
+
+logger = logging.getLogger(__name__)
+
+
+class ClienteCache:
+    """
+    Cache no Redis do perfil do cliente autenticado (id, tipo, nome e e-mail,
+    nunca o hash da senha), indexado pelo subject do token (e-mail).
+
+    Evita uma consulta ao banco a cada requisição autenticada. As entradas têm
+    vida curta (`expires`) e são removidas quando o cliente é alterado ou
+    removido (ver `AsyncClienteService`). Falhas do Redis não impedem a
+    autenticação: o cliente é então carregado do banco.
+    """
+    PREFIXO = "auth:cliente:"
+
+    def __init__(self, redis_client, expires: int = 60):
+        """
+        Args:
+            redis_client (redis.asyncio.Redis): Cliente Redis assíncrono.
+            expires (int): Expiração (s) de cada perfil em cache.
+        """
+        self.redis = redis_client
+        self.expires = expires
+        self.contadores = {"hits": 0, "misses": 0}
+
+    def _chave(self, email: str) -> str:
+        return f"{self.PREFIXO}{email}"
+
+    async def get(self, email: str) -> Optional[Cliente]:
+        """
+        Retorna o perfil em cache do cliente com o e-mail informado, ou None.
+        """
+        try:
+            valor = await self.redis.get(self._chave(email))
+        except RedisError as e:
+            logger.warning(f"Falha ao consultar o cache de autenticação: {e}")
+            return None
+        if valor:
+            try:
+                cliente = Cliente.model_validate_json(valor)
+            except ValidationError:
+                cliente = None
+            if cliente is not None:
+                self.contadores["hits"] += 1
+                return cliente
+        self.contadores["misses"] += 1
+        return None
+
+    async def set(self, cliente: Cliente) -> None:
+        """
+        Grava o perfil do cliente no cache (apenas os campos de `Cliente`).
+        """
+        # `include` descarta campos de subclasses, como a senha de ClienteInDB
+        valor = cliente.model_dump_json(include=set(Cliente.model_fields))
+        try:
+            await self.redis.set(self._chave(cliente.email), valor, ex=self.expires)
+        except RedisError as e:
+            logger.warning(f"Falha ao gravar o cache de autenticação: {e}")
+
+    async def invalidar(self, *emails: str) -> None:
+        """
+        Remove do cache os perfis dos e-mails informados, em um único comando; a
+        próxima requisição os recarrega do banco.
+        """
+        try:
+            await self.redis.delete(*[self._chave(email) for email in emails])
+        except RedisError as e:
+            logger.warning(f"Falha ao invalidar o cache de autenticação de {', '.join(emails)}: {e}")
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna os contadores de acertos e falhas do cache.
+        """
+        return dict(self.contadores)
@@ -1,10 +1,55 @@
 from core.domain.cliente import Cliente, ClienteCreate, ClienteInDB, ClienteUpdate
 from core.config.db import SessionLocal
 from core.repository.cliente_orm import ClienteORM
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from pydantic import SecretStr
 
+# Colunas do modelo Cliente (sem a senha) retornadas por UPDATE ... RETURNING
+_COLUNAS_CLIENTE = (ClienteORM.id, ClienteORM.nome, ClienteORM.email, ClienteORM.tipo)
+
+
+def _update_cliente(cliente_id: int, cliente_update: ClienteUpdate, email_anterior: bool = False):
+    """
+    UPDATE ... RETURNING dos campos informados, ou None se não houver o que alterar.
+
+    Com `email_anterior`, retorna também (coluna `email_anterior`) o e-mail que o
+    cliente tinha antes da alteração, lido no mesmo comando por uma CTE que
+    bloqueia a linha (SELECT ... FOR UPDATE).
+    """
+    valores = {
+        # Se o valor for SecretStr, extrai a string antes de gravar
+        key: value.get_secret_value() if isinstance(value, SecretStr) else value
+        for key, value in cliente_update.model_dump(exclude_unset=True).items()
+    }
+    if not valores:
+        return None
+    stmt = update(ClienteORM).values(**valores).execution_options(synchronize_session=False)
+    if not email_anterior:
+        return stmt.where(ClienteORM.id == cliente_id).returning(*_COLUNAS_CLIENTE)
+    anterior = (
+        select(ClienteORM.id, ClienteORM.email)
+        .where(ClienteORM.id == cliente_id)
+        .with_for_update()
+        .cte("anterior")
+        .prefix_with("MATERIALIZED")  # lida uma vez, antes da alteração
+    )
+    return stmt.where(ClienteORM.id == anterior.c.id).returning(
+        *_COLUNAS_CLIENTE, anterior.c.email.label("email_anterior")
+    )
+
+
+def _delete_cliente(cliente_id: int):
+    return (
+        delete(ClienteORM)
+        .where(ClienteORM.id == cliente_id)
+        .returning(ClienteORM.email)
+        .execution_options(synchronize_session=False)
+    )
+
+
 class ClienteRepository:
     """
     Repositório para operações CRUD da entidade Cliente.
@@ -61,18 +106,27 @@ class ClienteRepository:
         db_cliente = self.db.query(ClienteORM).filter(ClienteORM.email == email).first()
         return ClienteInDB.model_validate(db_cliente) if db_cliente else None
 
-    def list(self) -> List[Cliente]:
+    def list(self, apos_id: Optional[int] = None, limite: Optional[int] = None) -> List[Cliente]:
         """
-        Lista todos os clientes cadastrados.
+        Lista os clientes cadastrados em ordem de `id` (paginação keyset).
 
+        Args:
+            apos_id (int, opcional): Retorna apenas clientes com `id` maior que este.
+            limite (int, opcional): Quantidade máxima de clientes. Se omitido, retorna todos.
         Returns:
             List[Cliente]: Lista de clientes.
         """
-        return [Cliente.model_validate(c) for c in self.db.query(ClienteORM).all()]
+        query = self.db.query(ClienteORM)
+        if apos_id is not None:
+            query = query.filter(ClienteORM.id > apos_id)
+        query = query.order_by(ClienteORM.id)
+        if limite is not None:
+            query = query.limit(limite)
+        return [Cliente.model_validate(c) for c in query.all()]
 
     def update(self, cliente_id: int, cliente_update: ClienteUpdate) -> Cliente | None:
         """
-        Atualiza os dados de um cliente existente.
+        Atualiza os dados de um cliente existente com um único UPDATE ... RETURNING.
 
         Args:
             cliente_id (int): ID do cliente a ser atualizado.
@@ -80,34 +134,139 @@ class ClienteRepository:
         Returns:
             Optional[Cliente]: Cliente atualizado ou None se não encontrado.
         """
-        cliente_orm = self.db.query(ClienteORM).filter(ClienteORM.id == cliente_id).first()
-        if cliente_orm:
-            update_data = cliente_update.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                # Se o valor for SecretStr, extrai a string antes de atribuir
-                if isinstance(value, SecretStr):
-                    setattr(cliente_orm, key, value.get_secret_value())
-                else:
-                    setattr(cliente_orm, key, value)
-            self.db.commit()
-            self.db.refresh(cliente_orm)
-            return Cliente.model_validate(cliente_orm)
-        return None
+        stmt = _update_cliente(cliente_id, cliente_update)
+        if stmt is None:
+            return self.get_by_id(cliente_id)
+        row = self.db.execute(stmt).first()
+        self.db.commit()
+        return Cliente.model_validate(row) if row else None
 
     def delete(self, cliente_id: int) -> bool:
         """
-        Remove um cliente do banco de dados.
+        Remove um cliente do banco de dados com um único DELETE ... RETURNING.
 
         Args:
             cliente_id (int): ID do cliente a ser removido.
         Returns:
             bool: True se removido, False se não encontrado.
         """
-        db_cliente = (
-            self.db.query(ClienteORM).filter(ClienteORM.id == cliente_id).first()
-        )
-        if not db_cliente:
-            return False
-        self.db.delete(db_cliente)
+        removido = self.db.execute(_delete_cliente(cliente_id)).first() is not None
         self.db.commit()
-        return True
+        return removido
+
+
+class AsyncClienteRepository:
+    """
+    Variante assíncrona (AsyncSession) do ClienteRepository, usada pela API
+    para não bloquear o event loop durante as consultas.
+    """
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db (AsyncSession): Sessão assíncrona do banco de dados SQLAlchemy.
+        """
+        self.db = db
+
+    async def create(self, cliente: ClienteCreate) -> Cliente:
+        """
+        Cria um novo cliente no banco de dados.
+        A senha já deve vir com hash do serviço.
+        """
+        db_cliente = ClienteORM(
+            nome=cliente.nome,
+            email=cliente.email,
+            senha=cliente.senha.get_secret_value(),
+            tipo=cliente.tipo,
+        )
+        self.db.add(db_cliente)
+        await self.db.commit()
+        await self.db.refresh(db_cliente)
+        return Cliente.model_validate(db_cliente)
+
+    async def get_by_id(self, cliente_id: int) -> Optional[Cliente]:
+        db_cliente = await self.db.get(ClienteORM, cliente_id)
+        return Cliente.model_validate(db_cliente) if db_cliente else None
+
+    async def get_by_email(self, email: str) -> Optional[ClienteInDB]:
+        """
+        Busca um cliente pelo e-mail, retornando o modelo com a senha.
+        """
+        db_cliente = await self.db.scalar(select(ClienteORM).where(ClienteORM.email == email))
+        return ClienteInDB.model_validate(db_cliente) if db_cliente else None
+
+    async def get_perfil_by_email(self, email: str) -> Optional[Cliente]:
+        """
+        Busca um cliente pelo e-mail carregando apenas os campos do perfil (sem a senha),
+        usado para identificar o cliente autenticado.
+        """
+        row = (await self.db.execute(select(*_COLUNAS_CLIENTE).where(ClienteORM.email == email))).first()
+        return Cliente.model_validate(row) if row else None
+
+    async def list(self, apos_id: Optional[int] = None, limite: Optional[int] = None) -> List[Cliente]:
+        """
+        Lista os clientes cadastrados em ordem de `id` (paginação keyset).
+        """
+        stmt = select(ClienteORM)
+        if apos_id is not None:
+            stmt = stmt.where(ClienteORM.id > apos_id)
+        stmt = stmt.order_by(ClienteORM.id)
+        if limite is not None:
+            stmt = stmt.limit(limite)
+        return [Cliente.model_validate(c) for c in (await self.db.scalars(stmt)).all()]
+
+    async def stream_all(self, tamanho_lote: int = 1000) -> AsyncIterator[List[Cliente]]:
+        """
+        Percorre todos os clientes em ordem de `id` com um cursor no servidor,
+        trazendo `tamanho_lote` linhas por vez (`yield_per`), sem carregar a
+        tabela inteira em memória. Apenas os campos do perfil são lidos.
+
+        Returns:
+            AsyncIterator[List[Cliente]]: Lotes de até `tamanho_lote` clientes.
+        """
+        stmt = select(*_COLUNAS_CLIENTE).order_by(ClienteORM.id).execution_options(yield_per=tamanho_lote)
+        resultado = await self.db.stream(stmt)
+        async for linhas in resultado.partitions():
+            yield [Cliente.model_validate(linha) for linha in linhas]
+
+    async def update(self, cliente_id: int, cliente_update: ClienteUpdate) -> Cliente | None:
+        """
+        Atualiza os dados de um cliente existente com um único UPDATE ... RETURNING.
+
+        Returns:
+            Optional[Cliente]: Cliente atualizado ou None se não encontrado.
+        """
+        stmt = _update_cliente(cliente_id, cliente_update)
+        if stmt is None:
+            return await self.get_by_id(cliente_id)
+        row = (await self.db.execute(stmt)).first()
+        await self.db.commit()
+        return Cliente.model_validate(row) if row else None
+
+    async def update_returning_previous_email(
+        self, cliente_id: int, cliente_update: ClienteUpdate
+    ) -> Optional[tuple[Cliente, str]]:
+        """
+        Como `update`, mas informa também o e-mail que o cliente tinha antes da
+        alteração, lido no mesmo comando.
+
+        Returns:
+            Optional[tuple[Cliente, str]]: Cliente atualizado e e-mail anterior, ou None se não encontrado.
+        """
+        stmt = _update_cliente(cliente_id, cliente_update, email_anterior=True)
+        if stmt is None:
+            cliente = await self.get_by_id(cliente_id)
+            return (cliente, cliente.email) if cliente else None
+        row = (await self.db.execute(stmt)).first()
+        await self.db.commit()
+        return (Cliente.model_validate(row), row.email_anterior) if row else None
+
+    async def delete(self, cliente_id: int) -> Optional[str]:
+        """
+        Remove um cliente do banco de dados com um único DELETE ... RETURNING.
+
+        Returns:
+            Optional[str]: E-mail do cliente removido, ou None se não encontrado.
+        """
+        email = (await self.db.execute(_delete_cliente(cliente_id))).scalar_one_or_none()
+        await self.db.commit()
+        return email
@@ -1,8 +1,33 @@
 from core.domain.favorito import Favorito, FavoritoCreate
 from core.config.db import SessionLocal
 from core.repository.favorito_orm import FavoritoORM
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Iterable, Optional, List
+
+
+def _insert_favoritos(favoritos: List[FavoritoCreate]):
+    """
+    INSERT ... ON CONFLICT DO NOTHING RETURNING de vários favoritos em um único comando.
+    """
+    return (
+        insert(FavoritoORM)
+        .values([{"cliente_id": f.cliente_id, "produto_id": f.produto_id} for f in favoritos])
+        .on_conflict_do_nothing(constraint="uix_cliente_produto")
+        .returning(FavoritoORM.id, FavoritoORM.cliente_id, FavoritoORM.produto_id)
+    )
+
+
+def _delete_favorito(cliente_id: int, produto_id: int):
+    return (
+        delete(FavoritoORM)
+        .where(FavoritoORM.cliente_id == cliente_id, FavoritoORM.produto_id == produto_id)
+        .returning(FavoritoORM.id)
+        .execution_options(synchronize_session=False)
+    )
+
 
 class FavoritoRepository:
     """
@@ -20,34 +45,47 @@ class FavoritoRepository:
 
     def create_many(self, favoritos: List[FavoritoCreate]) -> List[Favorito]:
         """
-        Cria múltiplos favoritos para um cliente em uma única transação.
+        Cria múltiplos favoritos para um cliente com um único INSERT.
+
+        Favoritos que já existem (inclusive os criados por requisições simultâneas)
+        são ignorados via ON CONFLICT DO NOTHING, sem abortar o lote, e os IDs dos
+        novos registros vêm do próprio INSERT (RETURNING), sem consultas adicionais.
 
         Args:
             favoritos (List[FavoritoCreate]): Lista de dados dos favoritos a serem criados.
         Returns:
-            List[Favorito]: Lista de favoritos criados com IDs atribuídos.
+            List[Favorito]: Favoritos efetivamente criados, com IDs atribuídos.
         """
-        db_favoritos = [FavoritoORM(cliente_id=f.cliente_id, produto_id=f.produto_id) for f in favoritos]
-        self.db.add_all(db_favoritos)
+        if not favoritos:
+            return []
+        rows = self.db.execute(_insert_favoritos(favoritos)).all()
         self.db.commit()
-        for db_fav in db_favoritos:
-            self.db.refresh(db_fav)
-        return [Favorito.model_validate(fav) for fav in db_favoritos]
+        return [Favorito.model_validate(row) for row in rows]
 
-    def list_by_cliente(self, cliente_id: int) -> List[Favorito]:
+    def list_by_cliente(
+        self, cliente_id: int, apos_id: Optional[int] = None, limite: Optional[int] = None
+    ) -> List[Favorito]:
         """
-        Lista todos os favoritos de um cliente.
+        Lista os favoritos de um cliente em ordem de `id` (paginação keyset).
 
         Args:
             cliente_id (int): ID do cliente.
+            apos_id (int, opcional): Retorna apenas favoritos com `id` maior que este.
+            limite (int, opcional): Quantidade máxima de favoritos. Se omitido, retorna todos.
         Returns:
             List[Favorito]: Lista de favoritos do cliente.
         """
-        return [Favorito.model_validate(f) for f in self.db.query(FavoritoORM).filter(FavoritoORM.cliente_id == cliente_id).all()]
+        filtros = [FavoritoORM.cliente_id == cliente_id]
+        if apos_id is not None:
+            filtros.append(FavoritoORM.id > apos_id)
+        query = self.db.query(FavoritoORM).filter(*filtros).order_by(FavoritoORM.id)
+        if limite is not None:
+            query = query.limit(limite)
+        return [Favorito.model_validate(f) for f in query.all()]
 
     def delete(self, cliente_id: int, produto_id: int) -> bool:
         """
-        Remove um favorito do cliente.
+        Remove um favorito do cliente com um único DELETE ... RETURNING.
 
         Args:
             cliente_id (int): ID do cliente.
@@ -55,15 +93,9 @@ class FavoritoRepository:
         Returns:
             bool: True se removido, False se não encontrado.
         """
-        db_fav = self.db.query(FavoritoORM).filter(
-            FavoritoORM.cliente_id == cliente_id,
-            FavoritoORM.produto_id == produto_id
-        ).first()
-        if not db_fav:
-            return False
-        self.db.delete(db_fav)
+        removido = self.db.execute(_delete_favorito(cliente_id, produto_id)).first() is not None
         self.db.commit()
-        return True
+        return removido
 
     def exists(self, cliente_id: int, produto_id: int) -> bool:
         """
@@ -79,3 +111,89 @@ class FavoritoRepository:
             FavoritoORM.cliente_id == cliente_id,
             FavoritoORM.produto_id == produto_id
         ).first() is not None
+
+    def existing_produto_ids(self, cliente_id: int, produto_ids: Iterable[int]) -> set[int]:
+        """
+        Retorna, com uma única consulta, quais dos produtos informados já estão nos favoritos do cliente.
+
+        Args:
+            cliente_id (int): ID do cliente.
+            produto_ids (Iterable[int]): IDs dos produtos a verificar.
+        Returns:
+            set[int]: Subconjunto de `produto_ids` já favoritado pelo cliente.
+        """
+        produto_ids = list(produto_ids)
+        if not produto_ids:
+            return set()
+        rows = self.db.query(FavoritoORM.produto_id).filter(
+            FavoritoORM.cliente_id == cliente_id,
+            FavoritoORM.produto_id.in_(produto_ids)
+        ).all()
+        return {row.produto_id for row in rows}
+
+
+class AsyncFavoritoRepository:
+    """
+    Variante assíncrona (AsyncSession) do FavoritoRepository, usada pela API
+    para não bloquear o event loop durante as consultas.
+    """
+    def __init__(self, db: AsyncSession):
+        """
+        Args:
+            db (AsyncSession): Sessão assíncrona do banco de dados SQLAlchemy.
+        """
+        self.db = db
+
+    async def create_many(self, favoritos: List[FavoritoCreate]) -> List[Favorito]:
+        """
+        Cria múltiplos favoritos com um único INSERT, ignorando os já existentes.
+
+        Returns:
+            List[Favorito]: Favoritos efetivamente criados, com IDs atribuídos.
+        """
+        if not favoritos:
+            return []
+        rows = (await self.db.execute(_insert_favoritos(favoritos))).all()
+        await self.db.commit()
+        return [Favorito.model_validate(row) for row in rows]
+
+    async def list_by_cliente(
+        self, cliente_id: int, apos_id: Optional[int] = None, limite: Optional[int] = None
+    ) -> List[Favorito]:
+        """
+        Lista os favoritos de um cliente em ordem de `id` (paginação keyset).
+        """
+        stmt = select(FavoritoORM).where(FavoritoORM.cliente_id == cliente_id)
+        if apos_id is not None:
+            stmt = stmt.where(FavoritoORM.id > apos_id)
+        stmt = stmt.order_by(FavoritoORM.id)
+        if limite is not None:
+            stmt = stmt.limit(limite)
+        return [Favorito.model_validate(f) for f in (await self.db.scalars(stmt)).all()]
+
+    async def delete(self, cliente_id: int, produto_id: int) -> bool:
+        """
+        Remove um favorito do cliente com um único DELETE ... RETURNING.
+
+        Returns:
+            bool: True se removido, False se não encontrado.
+        """
+        removido = (await self.db.execute(_delete_favorito(cliente_id, produto_id))).first() is not None
+        await self.db.commit()
+        return removido
+
+    async def exists(self, cliente_id: int, produto_id: int) -> bool:
+        return bool(await self.existing_produto_ids(cliente_id, [produto_id]))
+
+    async def existing_produto_ids(self, cliente_id: int, produto_ids: Iterable[int]) -> set[int]:
+        """
+        Retorna, com uma única consulta, quais dos produtos informados já estão nos favoritos do cliente.
+        """
+        produto_ids = list(produto_ids)
+        if not produto_ids:
+            return set()
+        result = await self.db.scalars(select(FavoritoORM.produto_id).where(
+            FavoritoORM.cliente_id == cliente_id,
+            FavoritoORM.produto_id.in_(produto_ids)
+        ))
+        return set(result.all())
@@ -0,0 +1,357 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from core.domain.produto import ProdutoExterno
+
+logger = logging.getLogger(__name__)
+
+
+class ProdutoCacheLocal:
+    """
+    Cache em memória (L1) de produtos já validados, com política LRU e expiração (TTL).
+
+    Existe uma instância por worker; por isso é limitado em quantidade de itens
+    e depende de invalidações via pub/sub para não servir dados desatualizados.
+    Produtos sabidamente inexistentes são guardados com valor None.
+    """
+
+    def __init__(self, max_itens: int = 1000, ttl: float = 300):
+        """
+        Args:
+            max_itens (int): Quantidade máxima de produtos mantidos em memória.
+            ttl (float): Tempo (s) que um produto permanece válido em memória.
+        """
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens: OrderedDict[int, tuple[float, Optional[ProdutoExterno], float]] = OrderedDict()
+
+    def get_registro(self, produto_id: int) -> Optional[tuple[Optional[ProdutoExterno], float]]:
+        """
+        Retorna o produto e o instante (epoch) em que foi obtido da API externa.
+        """
+        item = self._itens.get(produto_id)
+        if item is None:
+            return None
+        expira_em, produto, atualizado_em = item
+        if expira_em <= time.monotonic():
+            del self._itens[produto_id]
+            return None
+        self._itens.move_to_end(produto_id)
+        return produto, atualizado_em
+
+    def get(self, produto_id: int) -> Optional[ProdutoExterno]:
+        registro = self.get_registro(produto_id)
+        return registro[0] if registro else None
+
+    def set(
+        self,
+        produto_id: int,
+        produto: Optional[ProdutoExterno],
+        atualizado_em: Optional[float] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        atualizado_em = time.time() if atualizado_em is None else atualizado_em
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._itens[produto_id] = (time.monotonic() + ttl, produto, atualizado_em)
+        self._itens.move_to_end(produto_id)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def invalidar(self, produto_ids: Iterable[int]) -> None:
+        for produto_id in produto_ids:
+            self._itens.pop(produto_id, None)
+
+    def limpar(self) -> None:
+        self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+
+class ProdutoCache:
+    """
+    Cache de produtos externos em dois níveis: memória local (L1, opcional) e
+    Redis (L2, cliente `redis.asyncio`).
+
+    Agrupa os acessos em lote: todas as leituras de uma requisição são feitas em
+    um único MGET e todas as escritas em um único pipeline, evitando uma ida e
+    volta ao Redis por produto. Invalidações são propagadas a todos os workers
+    e réplicas pelo canal pub/sub `CANAL_INVALIDACAO`; cada mensagem leva a
+    origem (`origem`, única por instância), e o worker ignora as próprias.
+
+    Cada produto guarda o instante em que foi obtido da API externa. Passado o
+    `soft_ttl` ele é considerado desatualizado, mas continua sendo servido até a
+    expiração definitiva no Redis (`expires`), dando tempo para revalidá-lo.
+
+    IDs que a API externa não conhece são guardados como entradas negativas
+    (`{"produto": null}`) por `negativo_ttl` segundos, evitando consultá-la a
+    cada requisição com um ID inválido. Falhas transitórias nunca são cacheadas.
+
+    Toda alteração anunciada (`set_many` com `notificar` e `invalidar`) incrementa
+    a geração do cache (`CHAVE_GERACAO`), que compõe as ETags de respostas com
+    dados de produtos. Como os contadores de versão, a geração ausente é iniciada
+    com o instante atual em nanossegundos, para nunca repetir um valor já usado.
+    """
+    PREFIXO = "produto:"
+    PREFIXO_LOCK = "lock:produto:"
+    CHAVE_ATUALIZACAO_CATALOGO = "catalogo:atualizacao"
+    CANAL_INVALIDACAO = "produtos:invalidacao"
+    CHAVE_GERACAO = "produtos:geracao"
+    # Remove o lock apenas se ainda pertencer a quem o adquiriu
+    SCRIPT_LIBERAR_LOCK = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        expires: int = 3600,
+        local: Optional[ProdutoCacheLocal] = None,
+        soft_ttl: Optional[float] = None,
+        negativo_ttl: int = 60,
+    ):
+        """
+        Inicializa o cache de produtos.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Cliente Redis assíncrono.
+            expires (int): Expiração definitiva (s) dos produtos em cache (hard TTL).
+            local (ProdutoCacheLocal, opcional): Cache em memória consultado antes do Redis.
+            soft_ttl (float, opcional): Idade (s) a partir da qual um produto é considerado desatualizado.
+                Se omitido, equivale a `expires`.
+            negativo_ttl (int): Expiração (s) das entradas de produtos inexistentes.
+        """
+        self.redis = redis_client
+        self.expires = expires
+        self.local = local
+        self.soft_ttl = expires if soft_ttl is None else soft_ttl
+        self.negativo_ttl = negativo_ttl
+        self.origem = uuid.uuid4().hex
+        self.contadores = {
+            "l1": {"hits": 0, "misses": 0},
+            "l2": {"hits": 0, "misses": 0},
+        }
+
+    def _chave(self, produto_id: int) -> str:
+        return f"{self.PREFIXO}{produto_id}"
+
+    @staticmethod
+    def _serializar(produto: Optional[ProdutoExterno], atualizado_em: float) -> str:
+        dados = produto.model_dump_json() if produto is not None else "null"
+        return f'{{"atualizado_em": {atualizado_em}, "produto": {dados}}}'
+
+    @staticmethod
+    def _desserializar(valor: str) -> tuple[Optional[ProdutoExterno], float]:
+        dados = json.loads(valor)
+        if "produto" not in dados:
+            # Formato antigo (produto sem envelope): tratado como desatualizado
+            return ProdutoExterno.model_validate(dados), 0.0
+        if dados["produto"] is None:
+            return None, dados["atualizado_em"]
+        return ProdutoExterno.model_validate(dados["produto"]), dados["atualizado_em"]
+
+    async def get_many(self, produto_ids: Iterable[int]) -> dict[int, ProdutoExterno]:
+        """
+        Busca vários produtos no cache local e, para os ausentes, no Redis com um único MGET.
+
+        Args:
+            produto_ids (Iterable[int]): IDs dos produtos.
+        Returns:
+            dict[int, ProdutoExterno]: Produtos encontrados indexados pelo ID (ausentes são omitidos).
+        """
+        produtos, _ = await self.get_many_com_validade(produto_ids)
+        return {produto_id: produto for produto_id, produto in produtos.items() if produto is not None}
+
+    async def get_many_com_validade(
+        self, produto_ids: Iterable[int]
+    ) -> tuple[dict[int, Optional[ProdutoExterno]], set[int]]:
+        """
+        Como `get_many`, mas também informa quais produtos já passaram do `soft_ttl`
+        e inclui, com valor None, os produtos sabidamente inexistentes (cache negativo).
+
+        Returns:
+            tuple[dict[int, Optional[ProdutoExterno]], set[int]]: Produtos encontrados e IDs dos desatualizados.
+        """
+        registros = {}
+        faltantes = []
+        for produto_id in produto_ids:
+            registro = self.local.get_registro(produto_id) if self.local is not None else None
+            if registro is not None:
+                registros[produto_id] = registro
+            else:
+                faltantes.append(produto_id)
+        if self.local is not None:
+            self.contadores["l1"]["hits"] += len(registros)
+            self.contadores["l1"]["misses"] += len(faltantes)
+
+        if faltantes:
+            valores = await self.redis.mget([self._chave(produto_id) for produto_id in faltantes])
+            for produto_id, valor in zip(faltantes, valores):
+                if not valor:
+                    continue
+                registros[produto_id] = (produto, atualizado_em) = self._desserializar(valor)
+                if self.local is not None:
+                    # Entradas negativas ficam em memória apenas pelo que lhes resta no Redis
+                    ttl = None if produto is not None else max(self.negativo_ttl - (time.time() - atualizado_em), 0)
+                    self.local.set(produto_id, produto, atualizado_em, ttl=ttl)
+            hits_l2 = sum(1 for valor in valores if valor)
+            self.contadores["l2"]["hits"] += hits_l2
+            self.contadores["l2"]["misses"] += len(faltantes) - hits_l2
+
+        limite = time.time() - self.soft_ttl
+        produtos = {produto_id: produto for produto_id, (produto, _) in registros.items()}
+        desatualizados = {
+            produto_id for produto_id, (produto, atualizado_em) in registros.items()
+            if produto is not None and atualizado_em < limite
+        }
+        return produtos, desatualizados
+
+    async def set_many(self, produtos: dict[int, Optional[ProdutoExterno]], notificar: Iterable[int] = ()) -> None:
+        """
+        Grava vários produtos no cache, com expiração, em um único pipeline.
+
+        Args:
+            produtos (dict[int, Optional[ProdutoExterno]]): Produtos indexados pelo ID;
+                None registra o produto como inexistente, por `negativo_ttl` segundos.
+            notificar (Iterable[int]): IDs cujas cópias em memória dos demais workers
+                devem ser descartadas (produtos que mudaram); avança a geração do cache.
+        """
+        if not produtos:
+            return
+        agora = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        for produto_id, produto in produtos.items():
+            expires = self.expires if produto is not None else self.negativo_ttl
+            pipe.set(self._chave(produto_id), self._serializar(produto, agora), ex=expires)
+            if self.local is not None:
+                self.local.set(produto_id, produto, agora, ttl=expires)
+        notificar = list(notificar)
+        if notificar:
+            pipe.publish(self.CANAL_INVALIDACAO, self._mensagem_invalidacao(notificar))
+            self._avancar_geracao(pipe)
+        await pipe.execute()
+
+    async def invalidar(self, produto_ids: Iterable[int]) -> None:
+        """
+        Remove produtos do Redis e avisa todos os workers para descartá-los da memória local.
+
+        Args:
+            produto_ids (Iterable[int]): IDs dos produtos a invalidar.
+        """
+        produto_ids = list(produto_ids)
+        if not produto_ids:
+            return
+        if self.local is not None:
+            self.local.invalidar(produto_ids)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(*[self._chave(produto_id) for produto_id in produto_ids])
+        pipe.publish(self.CANAL_INVALIDACAO, self._mensagem_invalidacao(produto_ids))
+        self._avancar_geracao(pipe)
+        await pipe.execute()
+
+    def _mensagem_invalidacao(self, produto_ids: list[int]) -> str:
+        return json.dumps({"origem": self.origem, "produtos": produto_ids})
+
+    def _avancar_geracao(self, pipe) -> None:
+        pipe.set(self.CHAVE_GERACAO, time.time_ns(), nx=True)
+        pipe.incr(self.CHAVE_GERACAO)
+
+    async def geracao(self) -> Optional[int]:
+        """
+        Retorna a geração atual do cache de produtos, ou None se o Redis estiver
+        indisponível (a resposta é então gerada sem ETag).
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(self.CHAVE_GERACAO, time.time_ns(), nx=True)
+        pipe.get(self.CHAVE_GERACAO)
+        try:
+            _, geracao = await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Falha ao consultar a geração do cache de produtos: {e}")
+            return None
+        return int(geracao)
+
+    async def escutar_invalidacoes(self) -> None:
+        """
+        Assina o canal de invalidação e descarta da memória local os produtos anunciados
+        por outros workers.
+
+        Executa até ser cancelada (ver `lifespan` em `api/main.py`). Em caso de falha
+        na conexão, limpa o cache local — invalidações podem ter sido perdidas — e
+        assina novamente.
+        """
+        if self.local is None:
+            return
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.CANAL_INVALIDACAO)
+                try:
+                    while True:
+                        mensagem = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if not mensagem:
+                            continue
+                        dados = json.loads(mensagem["data"])
+                        # A memória local já reflete as gravações e invalidações deste worker
+                        if dados["origem"] != self.origem:
+                            self.local.invalidar(dados["produtos"])
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Falha no canal de invalidação de produtos: {e}")
+                self.local.limpar()
+                await asyncio.sleep(1)
+
+    async def reservar_atualizacao_catalogo(self, intervalo: float) -> bool:
+        """
+        Reserva a próxima atualização do catálogo para este worker.
+
+        Retorna False se outro worker ou réplica já atualizou o catálogo nos
+        últimos `intervalo` segundos, evitando cargas repetidas da API externa.
+        """
+        return bool(await self.redis.set(
+            self.CHAVE_ATUALIZACAO_CATALOGO, "1", nx=True, px=max(int(intervalo * 1000), 1)
+        ))
+
+    async def adquirir_lock(self, produto_id: int, ttl: float) -> Optional[str]:
+        """
+        Tenta adquirir o lock distribuído de busca de um produto.
+
+        Args:
+            produto_id (int): ID do produto.
+            ttl (float): Validade (s) do lock, liberado automaticamente ao expirar.
+        Returns:
+            Optional[str]: Token do lock, ou None se outro processo já o detém.
+        """
+        token = uuid.uuid4().hex
+        adquirido = await self.redis.set(
+            f"{self.PREFIXO_LOCK}{produto_id}", token, nx=True, px=int(ttl * 1000)
+        )
+        return token if adquirido else None
+
+    async def liberar_lock(self, produto_id: int, token: str) -> None:
+        await self.redis.eval(self.SCRIPT_LIBERAR_LOCK, 1, f"{self.PREFIXO_LOCK}{produto_id}", token)
+
+    async def lock_ativo(self, produto_id: int) -> bool:
+        return bool(await self.redis.exists(f"{self.PREFIXO_LOCK}{produto_id}"))
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna os contadores de acertos e falhas de cada nível do cache.
+        """
+        estatisticas = {"l2": dict(self.contadores["l2"])}
+        if self.local is not None:
+            estatisticas["l1"] = dict(self.contadores["l1"], itens=len(self.local))
+        return estatisticas
@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class VersaoCache:
+    """
+    Contadores de versão por cliente no Redis, usados para gerar ETags sem
+    consultar o banco: cada recurso (perfil, favoritos) tem um contador que é
+    incrementado a cada alteração bem-sucedida.
+
+    Um contador ausente (cliente novo, chave expirada ou Redis reiniciado) é
+    iniciado com o instante atual em nanossegundos, e não com zero, para que
+    nunca volte a um valor já usado em uma ETag anterior.
+
+    Falhas do Redis ao registrar uma alteração não desfazem a operação já
+    gravada no banco: os contadores do cliente são descartados (e recriados com
+    um novo valor na próxima leitura). Se nem o descarte for possível, o cliente
+    fica pendente neste worker — suas versões são tratadas como desconhecidas e
+    o descarte é repetido na próxima consulta ao Redis.
+    """
+    PREFIXO = "versao:cliente:"
+    PERFIL = "perfil"
+    FAVORITOS = "favoritos"
+
+    def __init__(self, redis_client, expires: int = 7 * 24 * 3600):
+        """
+        Args:
+            redis_client (redis.asyncio.Redis): Cliente Redis assíncrono.
+            expires (int): Expiração (s) dos contadores de um cliente sem alterações.
+        """
+        self.redis = redis_client
+        self.expires = expires
+        self._pendentes: set[int] = set()
+
+    def _chave(self, cliente_id: int) -> str:
+        return f"{self.PREFIXO}{cliente_id}"
+
+    async def obter(self, cliente_id: int, recurso: str) -> Optional[int]:
+        """
+        Retorna a versão atual do recurso do cliente, ou None se o Redis estiver
+        indisponível (a resposta é então gerada sem ETag).
+        """
+        chave = self._chave(cliente_id)
+        pendentes = list(self._pendentes)
+        pipe = self.redis.pipeline(transaction=False)
+        if pendentes:
+            pipe.delete(*[self._chave(pendente) for pendente in pendentes])
+        pipe.hsetnx(chave, recurso, time.time_ns())
+        pipe.hget(chave, recurso)
+        # Expira contadores recém-criados sem estender a validade dos existentes (Redis 7+)
+        pipe.expire(chave, self.expires, nx=True)
+        try:
+            *_, versao, _ = await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Falha ao consultar a versão de {recurso} do cliente {cliente_id}: {e}")
+            return None
+        self._pendentes.difference_update(pendentes)
+        return int(versao)
+
+    async def incrementar(self, cliente_id: int, recurso: str) -> None:
+        """
+        Registra uma alteração do recurso do cliente, invalidando as ETags emitidas.
+        """
+        chave = self._chave(cliente_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hsetnx(chave, recurso, time.time_ns())
+        pipe.hincrby(chave, recurso, 1)
+        pipe.expire(chave, self.expires)
+        try:
+            await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Falha ao incrementar a versão de {recurso} do cliente {cliente_id}: {e}")
+            await self.remover(cliente_id)
+
+    async def remover(self, cliente_id: int) -> None:
+        """
+        Descarta os contadores de um cliente; se recriados, partem de um novo valor.
+        """
+        try:
+            await self.redis.delete(self._chave(cliente_id))
+            self._pendentes.discard(cliente_id)
+        except RedisError as e:
+            logger.error(f"Falha ao descartar as versões do cliente {cliente_id}; descarte pendente: {e}")
+            self._pendentes.add(cliente_id)
@@ -1,18 +1,33 @@
 from passlib.context import CryptContext
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import asyncio
+import hashlib
+import threading
+import time
 from jose import JWTError, jwt
 from core.config.settings import get_settings
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.repository.cliente_repository import ClienteRepository
-from core.config.db import SessionLocal
+from core.domain.cliente import Cliente
+from core.repository.cliente_cache import ClienteCache
+from core.repository.cliente_repository import AsyncClienteRepository
+from core.config.db import get_async_db
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max iguais ao custo configurado: hashes com outro custo são refeitos no login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -26,6 +41,98 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash usar um custo diferente do configurado, gera um novo.
+
+    Returns:
+        tuple[bool, Optional[str]]: Se a senha confere e o novo hash a gravar (ou None).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class SenhaExecutorSobrecarregadoError(Exception):
+    """Exceção para operações de senha rejeitadas porque a fila do executor está cheia."""
+
+    pass
+
+
+class SenhaExecutor:
+    """
+    Executor dedicado e limitado para hashing e verificação de senhas (bcrypt).
+
+    O bcrypt é custoso em CPU; executá-lo no threadpool padrão permite que uma
+    rajada de logins ou cadastros ocupe todas as threads e atrase rotas não
+    relacionadas. Aqui ele roda em `max_workers` threads próprias (o bcrypt libera
+    o GIL durante o cálculo) e no máximo `max_fila` operações aguardam uma thread
+    livre; além disso a operação é rejeitada imediatamente.
+
+    A vaga de uma operação só é liberada quando ela termina no executor: uma
+    requisição cancelada não desconta o bcrypt que continua em execução.
+    """
+
+    def __init__(self, max_workers: int = 4, max_fila: int = 32):
+        """
+        Args:
+            max_workers (int): Threads dedicadas ao bcrypt.
+            max_fila (int): Operações que podem aguardar uma thread livre.
+        """
+        self.max_workers = max_workers
+        self.max_fila = max_fila
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.em_andamento = 0
+        self.rejeitadas = 0
+        # A vaga é liberada na thread do bcrypt (ver `_liberar`)
+        self._lock = threading.Lock()
+
+    async def _executar(self, funcao, *args):
+        with self._lock:
+            if self.em_andamento >= self.max_workers + self.max_fila:
+                self.rejeitadas += 1
+                raise SenhaExecutorSobrecarregadoError("Fila de processamento de senhas cheia")
+            self.em_andamento += 1
+        futuro = self._executor.submit(funcao, *args)
+        futuro.add_done_callback(self._liberar)
+        # Cancelar a espera só cancela a operação que ainda não começou
+        return await asyncio.wrap_future(futuro)
+
+    def _liberar(self, futuro) -> None:
+        with self._lock:
+            self.em_andamento -= 1
+
+    async def hash(self, senha: str) -> str:
+        """
+        Gera o hash da senha no executor dedicado.
+
+        Raises:
+            SenhaExecutorSobrecarregadoError: Se a fila do executor estiver cheia.
+        """
+        return await self._executar(get_password_hash, senha)
+
+    async def verificar(self, senha: str, hash_senha: str) -> tuple[bool, Optional[str]]:
+        """
+        Verifica a senha no executor dedicado (ver `verify_and_update_password`).
+
+        Raises:
+            SenhaExecutorSobrecarregadoError: Se a fila do executor estiver cheia.
+        """
+        return await self._executar(verify_and_update_password, senha, hash_senha)
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna a ocupação atual do executor e o total de operações rejeitadas.
+        """
+        return {
+            "em_andamento": self.em_andamento,
+            "max_workers": self.max_workers,
+            "max_fila": self.max_fila,
+            "rejeitadas": self.rejeitadas,
+        }
+
+
+senha_executor = SenhaExecutor(settings.senha_max_workers, settings.senha_max_fila)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Cria um novo token de acesso JWT.
@@ -40,36 +147,116 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class TokenCache:
+    """
+    Cache em memória (LRU) das claims de tokens JWT já verificados, por worker.
+
+    Um cliente reenvia o mesmo token a cada requisição durante sua validade;
+    com o cache, apenas o primeiro uso verifica a assinatura. Os tokens são
+    indexados pelo SHA-256 (o token em si não é guardado) e cada entrada vale
+    até o `exp` do token. Tokens sem `exp` não são guardados.
+    """
+
+    def __init__(self, max_itens: int = 10000):
+        """
+        Args:
+            max_itens (int): Quantidade máxima de tokens mantidos em memória.
+        """
+        self.max_itens = max_itens
+        self._itens: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.contadores = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _chave(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        chave = self._chave(token)
+        item = self._itens.get(chave)
+        if item is not None and item[0] <= time.time():
+            del self._itens[chave]
+            item = None
+        if item is None:
+            self.contadores["misses"] += 1
+            return None
+        self._itens.move_to_end(chave)
+        self.contadores["hits"] += 1
+        return item[1]
+
+    def set(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_itens <= 0:
+            return
+        chave = self._chave(token)
+        self._itens[chave] = (exp, claims)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna os contadores de acertos e falhas e a quantidade de tokens em memória.
+        """
+        return {**self.contadores, "itens": len(self._itens)}
+
+
+token_cache = TokenCache(settings.token_cache_max_itens)
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Retorna as claims do token, verificando a assinatura apenas se ele ainda
+    não estiver no `token_cache`.
+
+    Raises:
+        JWTError: Se o token for inválido ou estiver expirado.
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        token_cache.set(token, claims)
+    return claims
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def get_cliente_cache(request: Request) -> Optional[ClienteCache]:
+    """
+    Cache de perfis criado no startup da aplicação (ver `iniciar_recursos` em
+    `api/main.py`); None se indisponível ou desativado.
+    """
+    return getattr(request.app.state, "cliente_cache", None)
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    cliente_cache: Optional[ClienteCache] = Depends(get_cliente_cache),
+) -> Cliente:
+    """
+    Identifica o cliente autenticado pelo token. O perfil (sem a senha) é lido do
+    cache e, na ausência, carregado do banco e gravado no cache.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
-        )
+        payload = decode_access_token(token)
         email = payload.get("sub")
         if email is None:
             raise credentials_exception
         token_data = email
     except JWTError:
         raise credentials_exception
-    user = ClienteRepository(db).get_by_email(email=token_data)
+    user = await cliente_cache.get(token_data) if cliente_cache is not None else None
+    if user is not None:
+        return user
+    user = await AsyncClienteRepository(db).get_perfil_by_email(email=token_data)
     if user is None:
         raise credentials_exception
+    if cliente_cache is not None:
+        await cliente_cache.set(user)
     return user
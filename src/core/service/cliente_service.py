@@ -1,12 +1,17 @@
 from core.domain.cliente import (
     Cliente,
     ClienteCreate,
+    ClienteInDB,
     ClienteUpdate,  # Alterado de ClienteUpdateRequest
     ClienteNaoEncontradoError,
 )
-from core.repository.cliente_repository import ClienteRepository
-from core.security.security import get_password_hash
+from core.domain.paginacao import Pagina, decodificar_cursor, fatiar_pagina
+from core.repository.cliente_cache import ClienteCache
+from core.repository.cliente_repository import AsyncClienteRepository, ClienteRepository
+from core.repository.versao_cache import VersaoCache
+from core.security.security import SenhaExecutor, get_password_hash, senha_executor
 from pydantic import SecretStr
+from typing import AsyncIterator, Optional
 
 class ClienteService:
     """
@@ -53,6 +58,22 @@ class ClienteService:
         """
         return self.repository.list()
 
+    def listar_clientes_paginado(self, limite: int, cursor: Optional[str] = None) -> Pagina[Cliente]:
+        """
+        Lista uma página de clientes, em ordem de ID.
+
+        Args:
+            limite (int): Tamanho da página.
+            cursor (str, opcional): Cursor retornado na página anterior.
+        Returns:
+            Pagina[Cliente]: Clientes da página e cursor da próxima.
+        Raises:
+            CursorInvalidoError: Se o cursor for inválido.
+        """
+        apos_id = decodificar_cursor(cursor) if cursor else None
+        clientes, proximo_cursor = fatiar_pagina(self.repository.list(apos_id=apos_id, limite=limite + 1), limite)
+        return Pagina[Cliente](itens=clientes, proximo_cursor=proximo_cursor)
+
     def buscar_cliente(self, cliente_id: int):
         """
         Busca um cliente pelo ID.
@@ -114,3 +135,125 @@ class ClienteService:
             bool: True se removido, False caso contrário.
         """
         return self.repository.delete(cliente_id)
+
+
+
+class AsyncClienteService:
+    """
+    Variante assíncrona do ClienteService, usada pela API sobre o AsyncClienteRepository.
+
+    O hashing e a verificação de senhas (bcrypt, custoso em CPU) são executados
+    fora do event loop, em um executor dedicado e limitado. Alterações e remoções
+    bem-sucedidas invalidam o perfil do cliente no cache de autenticação e
+    incrementam sua versão, usada nas ETags.
+    """
+    def __init__(
+        self,
+        repository: AsyncClienteRepository,
+        cliente_cache: Optional[ClienteCache] = None,
+        senhas: SenhaExecutor = senha_executor,
+        versoes: Optional[VersaoCache] = None,
+    ):
+        """
+        Args:
+            repository (AsyncClienteRepository): Repositório assíncrono de clientes.
+            cliente_cache (ClienteCache, opcional): Cache de perfis usado na autenticação.
+            senhas (SenhaExecutor): Executor de hashing e verificação de senhas.
+            versoes (VersaoCache, opcional): Contadores de versão por cliente.
+        """
+        self.repository = repository
+        self.cliente_cache = cliente_cache
+        self.senhas = senhas
+        self.versoes = versoes
+
+    async def criar_cliente(self, cliente_data: ClienteCreate) -> Cliente:
+        """
+        Cria um novo cliente após validação de unicidade do e-mail e hashing da senha.
+
+        Raises:
+            ValueError: Se o e-mail já estiver cadastrado.
+            SenhaExecutorSobrecarregadoError: Se o executor de senhas estiver sobrecarregado.
+        """
+        if await self.repository.get_by_email(cliente_data.email):
+            raise ValueError("E-mail já cadastrado")
+        hashed_password = await self.senhas.hash(cliente_data.senha.get_secret_value())
+        return await self.repository.create(
+            cliente_data.model_copy(update={"senha": SecretStr(hashed_password)})
+        )
+
+    async def autenticar(self, email: str, senha: str) -> Optional[ClienteInDB]:
+        """
+        Verifica as credenciais do cliente. Se o hash armazenado usar um custo de
+        bcrypt diferente do configurado, ele é refeito e gravado.
+
+        Returns:
+            Optional[ClienteInDB]: O cliente, ou None se o e-mail ou a senha não conferirem.
+        Raises:
+            SenhaExecutorSobrecarregadoError: Se o executor de senhas estiver sobrecarregado.
+        """
+        cliente = await self.repository.get_by_email(email)
+        if cliente is None:
+            return None
+        valida, novo_hash = await self.senhas.verificar(senha, cliente.senha.get_secret_value())
+        if not valida:
+            return None
+        if novo_hash is not None:
+            # O hash já vem pronto: grava direto no repositório, sem passar por atualizar_cliente
+            await self.repository.update(cliente.id, ClienteUpdate(senha=SecretStr(novo_hash)))
+        return cliente
+
+    async def listar_clientes_paginado(self, limite: int, cursor: Optional[str] = None) -> Pagina[Cliente]:
+        """
+        Lista uma página de clientes, em ordem de ID.
+
+        Raises:
+            CursorInvalidoError: Se o cursor for inválido.
+        """
+        apos_id = decodificar_cursor(cursor) if cursor else None
+        clientes, proximo_cursor = fatiar_pagina(
+            await self.repository.list(apos_id=apos_id, limite=limite + 1), limite
+        )
+        return Pagina[Cliente](itens=clientes, proximo_cursor=proximo_cursor)
+
+    def exportar_clientes(self, tamanho_lote: int = 1000) -> AsyncIterator[list[Cliente]]:
+        """
+        Percorre todos os clientes em lotes lidos sob demanda do banco, para
+        exportação em streaming.
+        """
+        return self.repository.stream_all(tamanho_lote)
+
+    async def buscar_cliente(self, cliente_id: int) -> Optional[Cliente]:
+        return await self.repository.get_by_id(cliente_id)
+
+    async def atualizar_cliente(self, cliente_id: int, cliente_update: ClienteUpdate) -> Cliente:
+        """
+        Atualiza um cliente existente; uma nova senha é armazenada com hash.
+
+        Raises:
+            ClienteNaoEncontradoError: Se o cliente não for encontrado.
+            SenhaExecutorSobrecarregadoError: Se o executor de senhas estiver sobrecarregado.
+        """
+        if cliente_update.senha is not None:
+            hashed_password = await self.senhas.hash(cliente_update.senha.get_secret_value())
+            cliente_update = cliente_update.model_copy(update={"senha": SecretStr(hashed_password)})
+        resultado = await self.repository.update_returning_previous_email(cliente_id, cliente_update)
+        if not resultado:
+            raise ClienteNaoEncontradoError()
+        cliente_atualizado, email_anterior = resultado
+        if self.cliente_cache is not None:
+            # Se o e-mail mudou, tokens emitidos para o anterior não podem manter o perfil antigo
+            await self.cliente_cache.invalidar(*dict.fromkeys((email_anterior, cliente_atualizado.email)))
+        if self.versoes is not None:
+            await self.versoes.incrementar(cliente_id, VersaoCache.PERFIL)
+        return cliente_atualizado
+
+    async def deletar_cliente(self, cliente_id: int) -> bool:
+        # O DELETE ... RETURNING informa o e-mail, que indexa o cache de autenticação
+        email = await self.repository.delete(cliente_id)
+        if email is None:
+            return False
+        if self.cliente_cache is not None:
+            await self.cliente_cache.invalidar(email)
+        if self.versoes is not None:
+            await self.versoes.remover(cliente_id)
+        return True
@@ -1,65 +1,80 @@
-from typing import List
+from typing import List, Optional
 from core.domain.favorito import Favorito, FavoritoCreate, FavoritoResponse, ProdutoExterno
-from core.repository.favorito_repository import FavoritoRepository
-from externos.fake_store_product import FakeStoreProduct
-from core.config.redis_config import RedisConfig
-import redis
-import json
+from core.domain.paginacao import Pagina, decodificar_cursor, fatiar_pagina
+from core.repository.favorito_repository import AsyncFavoritoRepository
+from core.repository.versao_cache import VersaoCache
+from core.service.produto_service import ProdutoService
 
 class FavoritoService:
     """
     Serviço de regras de negócio para favoritos de clientes.
-    Utiliza cache Redis para produtos externos.
+    Os produtos externos são obtidos via ProdutoService (cache + API externa).
+    Alterações incrementam a versão dos favoritos do cliente, usada nas ETags.
     """
-    def __init__(self, repository: FavoritoRepository, fake_store_product: FakeStoreProduct, redis_client=None, redis_expires=None):
+    def __init__(
+        self,
+        repository: AsyncFavoritoRepository,
+        produto_service: ProdutoService,
+        versoes: Optional[VersaoCache] = None,
+    ):
+        """
+        Args:
+            repository (AsyncFavoritoRepository): Repositório assíncrono de favoritos.
+            produto_service (ProdutoService): Serviço de consulta de produtos compartilhado pelo worker.
+            versoes (VersaoCache, opcional): Contadores de versão por cliente.
+        """
         self.repository = repository
-        self.fake_store_product = fake_store_product
-        if redis_client is None:
-            redis_config = RedisConfig()
-            self.redis = redis_config.get_client()
-            self.redis_expires = redis_config.get_expires() if redis_expires is None else redis_expires
-        else:
-            self.redis = redis_client
-            self.redis_expires = redis_expires or 3600
+        self.produto_service = produto_service
+        self.versoes = versoes
 
     async def adicionar_favoritos(self, cliente_id: int, produto_ids: list[int]) -> list[FavoritoResponse]:
-        favoritos_para_criar = []
-        produtos_processados = set()
-        for produto_id in produto_ids:
-            if produto_id in produtos_processados:
-                continue
-            if self.repository.exists(cliente_id, produto_id):
-                continue
-            produto_cache = self.redis.get(f"produto:{produto_id}")
-            if produto_cache:
-                produto_externo = json.loads(produto_cache)
-            else:
-                produto_externo = await self.fake_store_product.get_product(produto_id)
-                if not produto_externo:
-                    continue
-                self.redis.set(f"produto:{produto_id}", json.dumps(produto_externo), ex=self.redis_expires)
-            favoritos_para_criar.append(FavoritoCreate(cliente_id=cliente_id, produto_id=produto_id))
-            produtos_processados.add(produto_id)
-        if not favoritos_para_criar:
-            return self.listar_favoritos(cliente_id)
-        self.repository.create_many(favoritos_para_criar)
-        return self.listar_favoritos(cliente_id)
+        # dict.fromkeys remove duplicados preservando a ordem de entrada
+        produto_ids = list(dict.fromkeys(produto_ids))
+        existentes = await self.repository.existing_produto_ids(cliente_id, produto_ids)
+        candidatos = [produto_id for produto_id in produto_ids if produto_id not in existentes]
+        produtos = await self.produto_service.obter_produtos(candidatos)
+        favoritos_para_criar = [
+            FavoritoCreate(cliente_id=cliente_id, produto_id=produto_id)
+            for produto_id in candidatos if produto_id in produtos
+        ]
+        if favoritos_para_criar:
+            await self.repository.create_many(favoritos_para_criar)
+            await self._nova_versao(cliente_id)
+        return await self.listar_favoritos(cliente_id)
 
-    def listar_favoritos(self, cliente_id: int) -> list[FavoritoResponse]:
-        favoritos = self.repository.list_by_cliente(cliente_id)
-        response = []
-        for fav in favoritos:
-            produto_cache = self.redis.get(f"produto:{fav.produto_id}")
-            if produto_cache:
-                produto_externo = json.loads(produto_cache)
-            else:
-                # Busca na API externa e salva no cache se não estiver em cache
-                produto_externo = self.fake_store_product.get_product_sync(fav.produto_id)
-                if produto_externo:
-                    self.redis.set(f"produto:{fav.produto_id}", json.dumps(produto_externo), ex=self.redis_expires)
-            if produto_externo and fav.id is not None:
-                response.append(FavoritoResponse(id=fav.id, cliente_id=fav.cliente_id, produto=produto_externo))
-        return response
+    async def listar_favoritos(self, cliente_id: int) -> list[FavoritoResponse]:
+        favoritos = await self.repository.list_by_cliente(cliente_id)
+        return await self._com_produtos(favoritos)
 
-    def remover_favorito(self, cliente_id: int, produto_id: int) -> bool:
-        return self.repository.delete(cliente_id, produto_id)
\ No newline at end of file
+    async def listar_favoritos_paginado(
+        self, cliente_id: int, limite: int, cursor: Optional[str] = None
+    ) -> Pagina[FavoritoResponse]:
+        """
+        Lista uma página de favoritos do cliente, consultando apenas os produtos da página.
+
+        Raises:
+            CursorInvalidoError: Se o cursor for inválido.
+        """
+        apos_id = decodificar_cursor(cursor) if cursor else None
+        favoritos, proximo_cursor = fatiar_pagina(
+            await self.repository.list_by_cliente(cliente_id, apos_id=apos_id, limite=limite + 1), limite
+        )
+        return Pagina[FavoritoResponse](itens=await self._com_produtos(favoritos), proximo_cursor=proximo_cursor)
+
+    async def _com_produtos(self, favoritos: list[Favorito]) -> list[FavoritoResponse]:
+        produtos = await self.produto_service.obter_produtos([fav.produto_id for fav in favoritos])
+        return [
+            FavoritoResponse(id=fav.id, cliente_id=fav.cliente_id, produto=produtos[fav.produto_id])
+            for fav in favoritos
+            if fav.produto_id in produtos and fav.id is not None
+        ]
+
+    async def remover_favorito(self, cliente_id: int, produto_id: int) -> bool:
+        removido = await self.repository.delete(cliente_id, produto_id)
+        if removido:
+            await self._nova_versao(cliente_id)
+        return removido
+
+    async def _nova_versao(self, cliente_id: int) -> None:
+        if self.versoes is not None:
+            await self.versoes.incrementar(cliente_id, VersaoCache.FAVORITOS)
@@ -0,0 +1,255 @@
+from typing import Iterable
+from core.domain.produto import ProdutoExterno, ProdutoIndisponivelError
+from core.repository.produto_cache import ProdutoCache
+from externos.circuit_breaker import CircuitoAbertoError
+from externos.fake_store_product import FakeStoreProduct
+from pydantic import ValidationError
+import asyncio
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resultado de busca para produtos com dados inválidos na API externa: ao
+# contrário de produtos inexistentes (None), não é gravado no cache.
+_INVALIDO = object()
+# Valor anterior de um produto ausente do cache: difere de qualquer resultado de busca.
+_AUSENTE = object()
+
+
+class ProdutoService:
+    """
+    Serviço de consulta de produtos externos, compartilhado por todas as requisições do worker.
+
+    Consulta o cache e busca os ausentes na API externa em paralelo. Buscas
+    simultâneas do mesmo produto são coalescidas (single-flight): apenas uma
+    consulta por produto fica em andamento no worker e as demais aguardam seu
+    resultado. Com `lock_distribuido`, um lock no Redis estende a coalescência
+    a todos os workers e réplicas.
+
+    Produtos desatualizados (além do soft TTL do cache) são servidos
+    imediatamente e revalidados em segundo plano (stale-while-revalidate); se a
+    API externa falhar, a cópia em cache continua sendo usada até expirar.
+
+    Produtos que a API externa não conhece são gravados no cache como
+    inexistentes (cache negativo) e omitidos do resultado.
+    """
+    def __init__(
+        self,
+        produto_cache: ProdutoCache,
+        fake_store_product: FakeStoreProduct,
+        max_concorrencia: int = 10,
+        tempo_limite_lote: float = 10.0,
+        lock_distribuido: bool = False,
+        lock_ttl: float = 5.0,
+    ):
+        """
+        Args:
+            produto_cache (ProdutoCache): Cache de produtos.
+            fake_store_product (FakeStoreProduct): Cliente da API externa de produtos.
+            max_concorrencia (int): Máximo de consultas simultâneas à API externa por lote.
+            tempo_limite_lote (float): Tempo total (s) para resolver um lote de produtos.
+            lock_distribuido (bool): Coalesce buscas entre workers/réplicas com um lock no Redis.
+            lock_ttl (float): Validade (s) do lock distribuído.
+        """
+        self.produto_cache = produto_cache
+        self.fake_store_product = fake_store_product
+        self.max_concorrencia = max_concorrencia
+        self.tempo_limite_lote = tempo_limite_lote
+        self.lock_distribuido = lock_distribuido
+        self.lock_ttl = lock_ttl
+        self._em_andamento: dict[int, asyncio.Future] = {}
+        self._revalidacoes: set[asyncio.Task] = set()
+        self._semaforo_revalidacao = asyncio.Semaphore(max_concorrencia)
+
+    async def obter_produtos(self, produto_ids: Iterable[int]) -> dict[int, ProdutoExterno]:
+        """
+        Obtém produtos com uma única leitura em lote no cache e, para os ausentes,
+        consultas paralelas à API externa.
+
+        As consultas externas são limitadas a `max_concorrencia` simultâneas e o lote
+        inteiro deve terminar em `tempo_limite_lote` segundos.
+
+        Returns:
+            dict[int, ProdutoExterno]: Produtos válidos indexados pelo ID (ausentes são omitidos).
+        Raises:
+            ProdutoIndisponivelError: Se o lote não for resolvido dentro do tempo limite ou
+                se a API externa falhar para um produto sem cópia em cache.
+        """
+        produto_ids = list(dict.fromkeys(produto_ids))
+        if not produto_ids:
+            return {}
+        registros, desatualizados = await self.produto_cache.get_many_com_validade(produto_ids)
+        for produto_id in desatualizados:
+            self._revalidar(produto_id, registros[produto_id])
+        produtos = {produto_id: produto for produto_id, produto in registros.items() if produto is not None}
+        faltantes = [produto_id for produto_id in produto_ids if produto_id not in registros]
+        if not faltantes:
+            return produtos
+
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+        buscas = {}
+        proprias = set()
+        for produto_id in faltantes:
+            busca = self._em_andamento.get(produto_id)
+            if busca is None:
+                busca = self._iniciar_busca(produto_id, semaforo)
+                proprias.add(produto_id)
+            buscas[produto_id] = busca
+
+        try:
+            async with asyncio.timeout(self.tempo_limite_lote):
+                # shield: o tempo limite deste lote não cancela buscas aguardadas por outros
+                resultados = await asyncio.gather(
+                    *(asyncio.shield(b) for b in buscas.values()), return_exceptions=True
+                )
+        except TimeoutError:
+            raise ProdutoIndisponivelError(
+                f"Tempo limite de {self.tempo_limite_lote}s excedido ao consultar produtos"
+            )
+        encontrados = {}
+        falhas = []
+        for produto_id, resultado in zip(buscas, resultados):
+            if isinstance(resultado, BaseException):
+                falhas.append((produto_id, resultado))
+            elif resultado is not _INVALIDO:
+                encontrados[produto_id] = resultado
+        # Apenas quem iniciou a busca grava no cache (inclusive inexistentes), em um único pipeline;
+        # com o lock distribuído, o produto já foi gravado pelo detentor do lock (ver `_buscar_com_lock`).
+        # Um produto ausente do cache pode ter expirado com outro conteúdo: a gravação é anunciada.
+        if not self.lock_distribuido:
+            gravados = {produto_id: produto for produto_id, produto in encontrados.items() if produto_id in proprias}
+            await self.produto_cache.set_many(gravados, notificar=list(gravados))
+        if falhas:
+            produto_id, erro = falhas[0]
+            if not isinstance(erro, (httpx.HTTPError, CircuitoAbertoError)):
+                raise erro
+            raise ProdutoIndisponivelError(f"API externa indisponível ao consultar o produto {produto_id}: {erro}")
+        produtos.update((produto_id, produto) for produto_id, produto in encontrados.items() if produto is not None)
+        return produtos
+
+    async def carregar_catalogo(self, intervalo: float = 0) -> int:
+        """
+        Carrega o catálogo completo da API externa em uma única chamada e grava
+        todos os produtos no cache. Produtos alterados ou ausentes do cache são
+        anunciados aos demais workers para que descartem suas cópias em memória.
+
+        Args:
+            intervalo (float): Se maior que zero, a carga é ignorada quando outro
+                worker ou réplica já atualizou o catálogo nos últimos `intervalo` segundos.
+        Returns:
+            int: Quantidade de produtos gravados no cache (0 se a carga foi ignorada).
+        Raises:
+            CircuitoAbertoError, httpx.HTTPError: Se a API externa estiver indisponível.
+        """
+        if intervalo > 0 and not await self.produto_cache.reservar_atualizacao_catalogo(intervalo):
+            return 0
+        produtos = {}
+        for dados in await self.fake_store_product.get_products():
+            try:
+                produto = ProdutoExterno.model_validate(dados)
+            except ValidationError as e:
+                logger.warning(f"Produto inválido no catálogo da API externa: {e}")
+                continue
+            produtos[produto.id] = produto
+        anteriores, _ = await self.produto_cache.get_many_com_validade(produtos)
+        alterados = [
+            produto_id for produto_id, produto in produtos.items()
+            if anteriores.get(produto_id) != produto
+        ]
+        await self.produto_cache.set_many(produtos, notificar=alterados)
+        return len(produtos)
+
+    async def atualizar_catalogo_periodicamente(self, intervalo: float) -> None:
+        """
+        Recarrega o catálogo a cada `intervalo` segundos até ser cancelada
+        (ver `lifespan` em `api/main.py`). Falhas da API externa ou do Redis são
+        registradas e não interrompem o ciclo.
+        """
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                await self.carregar_catalogo(intervalo)
+            except Exception as e:
+                logger.warning(f"Falha ao atualizar o catálogo de produtos: {e}")
+
+    def _revalidar(self, produto_id: int, anterior: ProdutoExterno) -> None:
+        """
+        Agenda, em segundo plano, a atualização de um produto desatualizado no cache;
+        se o produto mudou, a alteração é anunciada aos demais workers.
+        Não faz nada se já houver uma busca do produto em andamento.
+        """
+        if produto_id in self._em_andamento:
+            return
+        busca = self._iniciar_busca(produto_id, self._semaforo_revalidacao, anterior)
+
+        async def gravar():
+            try:
+                produto = await busca
+            except (httpx.HTTPError, CircuitoAbertoError) as e:
+                logger.warning(f"Falha ao revalidar o produto {produto_id}; mantendo cópia em cache: {e}")
+                return
+            if produto is _INVALIDO or self.lock_distribuido:
+                return
+            # Um produto removido da API externa (None) passa a constar como inexistente em todos os workers
+            await self.produto_cache.set_many(
+                {produto_id: produto}, notificar=[produto_id] if produto != anterior else []
+            )
+
+        tarefa = asyncio.create_task(gravar())
+        self._revalidacoes.add(tarefa)
+        tarefa.add_done_callback(self._revalidacoes.discard)
+
+    def _iniciar_busca(self, produto_id: int, semaforo: asyncio.Semaphore, anterior=_AUSENTE) -> asyncio.Future:
+        busca = asyncio.ensure_future(self._buscar(produto_id, semaforo, anterior))
+        self._em_andamento[produto_id] = busca
+        busca.add_done_callback(lambda _: self._em_andamento.pop(produto_id, None))
+        return busca
+
+    async def _buscar(self, produto_id: int, semaforo: asyncio.Semaphore, anterior=_AUSENTE):
+        """
+        Retorna o produto, None se a API externa não o conhece ou `_INVALIDO`.
+        `anterior` é a cópia em cache (se houver), usada para anunciar alterações.
+        """
+        if self.lock_distribuido:
+            return await self._buscar_com_lock(produto_id, semaforo, anterior)
+        return await self._buscar_na_api(produto_id, semaforo)
+
+    async def _buscar_na_api(self, produto_id: int, semaforo: asyncio.Semaphore):
+        async with semaforo:
+            produto_externo = await self.fake_store_product.get_product(produto_id)
+        if not produto_externo:
+            return None
+        try:
+            return ProdutoExterno.model_validate(produto_externo)
+        except ValidationError as e:
+            logger.warning(f"Produto {produto_id} inválido na API externa: {e}")
+            return _INVALIDO
+
+    async def _buscar_com_lock(self, produto_id: int, semaforo: asyncio.Semaphore, anterior=_AUSENTE):
+        """
+        Busca o produto na API externa somente se obtiver o lock distribuído; caso
+        contrário, aguarda outro worker gravá-lo no cache. Se o lock expirar sem
+        que o produto apareça no cache, tenta obter o lock novamente.
+
+        O detentor do lock é o único a gravar o produto: quem iniciou a busca no
+        worker não o grava de novo.
+        """
+        while True:
+            token = await self.produto_cache.adquirir_lock(produto_id, self.lock_ttl)
+            if token is not None:
+                try:
+                    produto = await self._buscar_na_api(produto_id, semaforo)
+                    if produto is not _INVALIDO:
+                        # Grava antes de liberar o lock para que os demais encontrem no cache
+                        await self.produto_cache.set_many(
+                            {produto_id: produto}, notificar=[produto_id] if produto != anterior else []
+                        )
+                    return produto
+                finally:
+                    await self.produto_cache.liberar_lock(produto_id, token)
+            while await self.produto_cache.lock_ativo(produto_id):
+                await asyncio.sleep(0.05)
+            registros, _ = await self.produto_cache.get_many_com_validade([produto_id])
+            if produto_id in registros:
+                return registros[produto_id]
@@ -0,0 +1,84 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitoAbertoError(Exception):
+    """Exceção levantada quando o circuito está aberto e a chamada é rejeitada sem ser feita."""
+
+    pass
+
+
+class CircuitBreaker:
+    """
+    Disjuntor (circuit breaker) para dependências externas.
+
+    Após `limite_falhas` falhas consecutivas o circuito abre e as chamadas falham
+    imediatamente com CircuitoAbertoError. Passado `tempo_recuperacao`, o circuito
+    fica meio-aberto e permite uma única chamada de teste: sucesso fecha o
+    circuito, falha o abre novamente.
+    """
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, nome: str, limite_falhas: int = 5, tempo_recuperacao: float = 30.0):
+        """
+        Args:
+            nome (str): Nome da dependência protegida (usado em logs e métricas).
+            limite_falhas (int): Falhas consecutivas que abrem o circuito.
+            tempo_recuperacao (float): Tempo (s) aberto antes de permitir uma chamada de teste.
+        """
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.tempo_recuperacao = tempo_recuperacao
+        self.estado = self.FECHADO
+        self.falhas_consecutivas = 0
+        self.aberto_em = 0.0
+        self.rejeitadas = 0
+        self._teste_em_andamento = False
+
+    def verificar(self) -> None:
+        """
+        Verifica se uma chamada pode ser feita.
+
+        Raises:
+            CircuitoAbertoError: Se o circuito estiver aberto (ou meio-aberto com teste em andamento).
+        """
+        if self.estado == self.ABERTO and time.monotonic() - self.aberto_em >= self.tempo_recuperacao:
+            self.estado = self.MEIO_ABERTO
+            self._teste_em_andamento = False
+        if self.estado == self.FECHADO:
+            return
+        if self.estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+            self._teste_em_andamento = True
+            return
+        self.rejeitadas += 1
+        raise CircuitoAbertoError(f"Circuito de '{self.nome}' aberto")
+
+    def registrar_sucesso(self) -> None:
+        if self.estado != self.FECHADO:
+            logger.warning(f"Circuito de '{self.nome}' fechado")
+        self.estado = self.FECHADO
+        self.falhas_consecutivas = 0
+        self._teste_em_andamento = False
+
+    def registrar_falha(self) -> None:
+        self.falhas_consecutivas += 1
+        if self.estado == self.MEIO_ABERTO or self.falhas_consecutivas >= self.limite_falhas:
+            if self.estado != self.ABERTO:
+                logger.warning(f"Circuito de '{self.nome}' aberto após {self.falhas_consecutivas} falhas")
+            self.estado = self.ABERTO
+            self.aberto_em = time.monotonic()
+            self._teste_em_andamento = False
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna o estado atual do circuito.
+        """
+        return {
+            "estado": self.estado,
+            "falhas_consecutivas": self.falhas_consecutivas,
+            "rejeitadas": self.rejeitadas,
+        }
@@ -1,26 +1,158 @@
 import httpx
+import importlib.util
+import logging
 from typing import Optional
 
+from core.config.settings import Settings, get_settings
+from externos.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+def _http_config(settings: Settings) -> dict:
+    """
+    Monta os parâmetros comuns aos clientes HTTP (pool, keep-alive, timeouts e HTTP/2).
+    """
+    http2 = settings.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 solicitado, mas o pacote 'h2' não está instalado. Usando HTTP/1.1.")
+        http2 = False
+    return {
+        "base_url": settings.fakestore_url,
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(
+            settings.http_read_timeout, connect=settings.http_connect_timeout
+        ),
+    }
+
+
 class FakeStoreProduct:
-    BASE_URL = "https://fakestoreapi.com"
+    """
+    Cliente da API FakeStore.
+
+    Mantém clientes HTTP de longa duração (com pool de conexões e keep-alive),
+    evitando um novo handshake TCP/TLS a cada consulta. Deve ser criado uma vez
+    por worker (ver `lifespan` em `api/main.py`) e encerrado com `aclose()`.
+
+    As chamadas passam por um circuit breaker: timeouts, erros de conexão,
+    respostas 5xx e qualquer outra exceção durante a chamada (inclusive
+    cancelamento) contam como falha e são propagados, para que a chamada de
+    teste do estado meio-aberto seja sempre liberada; com o circuito aberto,
+    as chamadas falham imediatamente com CircuitoAbertoError. Apenas 404, ou
+    200 com corpo vazio (como a FakeStore responde a IDs desconhecidos), indicam
+    produto inexistente e retornam None; os demais 4xx (ex.: 408, 429) também
+    contam como falha e são propagados.
+    """
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        sync_client: Optional[httpx.Client] = None,
+        settings: Optional[Settings] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Args:
+            client (httpx.AsyncClient, opcional): Cliente assíncrono compartilhado. Criado a partir das configurações se omitido.
+            sync_client (httpx.Client, opcional): Cliente síncrono compartilhado. Criado sob demanda se omitido.
+            settings (Settings, opcional): Configurações usadas para criar os clientes.
+            circuit_breaker (CircuitBreaker, opcional): Disjuntor que protege as chamadas à API.
+        """
+        self._settings = settings
+        self._client = client
+        self._sync_client = sync_client
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("fakestore")
+
+    def _config(self) -> dict:
+        if self._settings is None:
+            self._settings = get_settings()
+        return _http_config(self._settings)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._config())
+        return self._client
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        if self._sync_client is None:
+            self._sync_client = httpx.Client(**self._config())
+        return self._sync_client
+
+    def _processar_resposta(self, response: httpx.Response) -> Optional[dict]:
+        if response.status_code == httpx.codes.NOT_FOUND:
+            self.circuit_breaker.registrar_sucesso()
+            return None
+        if response.is_error:
+            # 5xx e demais 4xx (ex.: 408, 429) são transitórios ou inesperados, nunca "inexistente"
+            self.circuit_breaker.registrar_falha()
+            response.raise_for_status()
+        self.circuit_breaker.registrar_sucesso()
+        if not response.content:
+            return None
+        return response.json()
 
     async def get_product(self, product_id: int) -> Optional[dict]:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.BASE_URL}/products/{product_id}")
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError:
-                return None
+        """
+        Busca um produto na API externa.
+
+        Returns:
+            Optional[dict]: Dados do produto, ou None se a API não o conhece.
+        Raises:
+            CircuitoAbertoError: Se o circuito estiver aberto.
+            httpx.HTTPError: Em timeouts, falhas de conexão ou respostas de erro (exceto 404).
+        """
+        self.circuit_breaker.verificar()
+        try:
+            response = await self.client.get(f"/products/{product_id}")
+        except BaseException:
+            self.circuit_breaker.registrar_falha()
+            raise
+        return self._processar_resposta(response)
+
+    async def get_products(self) -> list[dict]:
+        """
+        Busca o catálogo completo de produtos em uma única chamada.
+
+        Raises:
+            CircuitoAbertoError: Se o circuito estiver aberto.
+            httpx.HTTPError: Em timeouts, falhas de conexão ou respostas de erro.
+        """
+        self.circuit_breaker.verificar()
+        try:
+            response = await self.client.get("/products")
+        except BaseException:
+            self.circuit_breaker.registrar_falha()
+            raise
+        produtos = self._processar_resposta(response)
+        if produtos is None:
+            response.raise_for_status()
+        return produtos or []
 
     def get_product_sync(self, product_id: int) -> Optional[dict]:
         """
         Método síncrono para buscar produto na API externa (útil para rotas/serviços síncronos).
         """
+        self.circuit_breaker.verificar()
         try:
-            with httpx.Client() as client:
-                response = client.get(f"{self.BASE_URL}/products/{product_id}")
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError:
-            return None
\ No newline at end of file
+            response = self.sync_client.get(f"/products/{product_id}")
+        except BaseException:
+            self.circuit_breaker.registrar_falha()
+            raise
+        return self._processar_resposta(response)
+
+    async def aclose(self) -> None:
+        """
+        Encerra os clientes HTTP e libera as conexões do pool.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
@@ -0,0 +1,183 @@
+import gzip
+from unittest.mock import patch
+
+import anyio
+import anyio.to_thread
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.compressao import CompressaoMiddleware, escolher_codificacao
+
+CORPO = "favorito " * 500
+
+
+async def grande(request):
+    return PlainTextResponse(CORPO, headers={"ETag": '"v1"'})
+
+
+async def pequeno(request):
+    return PlainTextResponse("ok")
+
+
+async def streaming(request):
+    async def blocos():
+        for i in range(3):
+            yield f"{i}:" + CORPO
+
+    return StreamingResponse(blocos(), media_type="application/x-ndjson")
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/grande", grande), Route("/pequeno", pequeno), Route("/streaming", streaming)])
+    app.add_middleware(CompressaoMiddleware, tamanho_minimo=500, nivel_gzip=6, nivel_brotli=4)
+    return TestClient(app)
+
+
+def _get_bruto(client, caminho, accept_encoding):
+    with client.stream("GET", caminho, headers={"Accept-Encoding": accept_encoding}) as resp:
+        return resp, b"".join(resp.iter_raw())
+
+
+def test_escolher_codificacao():
+    disponiveis = ("br", "gzip")
+    assert escolher_codificacao("gzip, deflate, br", disponiveis) == "br"
+    assert escolher_codificacao("br;q=0.5, gzip", disponiveis) == "gzip"
+    assert escolher_codificacao("br;q=0, *", disponiveis) == "gzip"
+    assert escolher_codificacao("deflate", disponiveis) is None
+    assert escolher_codificacao("", disponiveis) is None
+
+
+def test_comprime_com_brotli_e_enfraquece_etag(client):
+    resp, corpo = _get_bruto(client, "/grande", "gzip, br")
+
+    assert resp.headers["content-encoding"] == "br"
+    assert resp.headers["etag"] == 'W/"v1"'
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert brotli.decompress(corpo).decode() == CORPO
+    assert len(corpo) < len(CORPO) / 10
+
+
+def test_comprime_com_gzip(client):
+    resp, corpo = _get_bruto(client, "/grande", "gzip")
+
+    assert resp.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(corpo).decode() == CORPO
+
+
+def test_respostas_pequenas_ou_sem_negociacao_nao_sao_comprimidas(client):
+    resp, corpo = _get_bruto(client, "/pequeno", "gzip, br")
+    assert "content-encoding" not in resp.headers
+    assert corpo == b"ok"
+
+    resp, corpo = _get_bruto(client, "/grande", "identity")
+    assert "content-encoding" not in resp.headers
+    assert resp.headers["etag"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_streaming_continua_em_blocos():
+    """Testa que cada bloco de uma resposta em streaming é comprimido e enviado separadamente."""
+    async def app(scope, receive, send):
+        await (await streaming(None))(scope, receive, send)
+
+    middleware = CompressaoMiddleware(app, tamanho_minimo=500)
+    mensagens = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        mensagens.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"br")]}
+    await middleware(scope, receive, send)
+
+    inicio, *corpos = mensagens
+    assert dict(inicio["headers"])[b"content-encoding"] == b"br"
+    assert b"content-length" not in dict(inicio["headers"])
+    # Um bloco comprimido por bloco produzido, mais o final do stream brotli
+    blocos = [m["body"] for m in corpos]
+    assert len(blocos) == 4
+    descompressor = brotli.Decompressor()
+    assert [descompressor.process(bloco).decode() for bloco in blocos[:3]] == [f"{i}:" + CORPO for i in range(3)]
+    assert descompressor.process(blocos[3]) == b""
+    assert descompressor.is_finished()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codificacao", [b"br", b"gzip"])
+async def test_blocos_grandes_sao_comprimidos_fora_do_event_loop(codificacao):
+    """Testa que blocos a partir de `tamanho_minimo_thread` são comprimidos em uma thread."""
+    async def app(scope, receive, send):
+        await (await streaming(None))(scope, receive, send)
+
+    middleware = CompressaoMiddleware(app, tamanho_minimo=500, tamanho_minimo_thread=len(CORPO))
+    mensagens = []
+
+    async def receive():
+        # Cliente conectado até o fim: a compressão em thread cede o event loop
+        await anyio.sleep_forever()
+
+    async def send(message):
+        mensagens.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", codificacao)]}
+    with patch("anyio.to_thread.run_sync", wraps=anyio.to_thread.run_sync) as run_sync:
+        await middleware(scope, receive, send)
+
+    # Os três blocos produzidos vão para a thread; o fechamento vazio do stream, não
+    assert run_sync.await_count == 3
+    corpo = b"".join(m["body"] for m in mensagens[1:])
+    descomprimido = brotli.decompress(corpo) if codificacao == b"br" else gzip.decompress(corpo)
+    assert descomprimido.decode() == "".join(f"{i}:" + CORPO for i in range(3))
+
+
+@pytest.mark.asyncio
+async def test_respostas_ja_codificadas_nao_sao_comprimidas_de_novo():
+    """Testa que uma resposta com `Content-Encoding` próprio passa intacta pelo middleware."""
+    corpo = gzip.compress(CORPO.encode())
+
+    async def app(scope, receive, send):
+        await PlainTextResponse(corpo, headers={"Content-Encoding": "gzip"})(scope, receive, send)
+
+    middleware = CompressaoMiddleware(app, tamanho_minimo=10)
+    mensagens = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        mensagens.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"br")]}
+    await middleware(scope, receive, send)
+
+    inicio, fim = mensagens
+    assert dict(inicio["headers"])[b"content-encoding"] == b"gzip"
+    assert fim["body"] == corpo
+
+
+@pytest.mark.asyncio
+async def test_threads_de_compressao_limitadas_por_max_threads():
+    """Testa que a compressão em thread usa um limitador com `max_threads` vagas."""
+    async def app(scope, receive, send):
+        await (await grande(None))(scope, receive, send)
+
+    middleware = CompressaoMiddleware(app, tamanho_minimo=500, tamanho_minimo_thread=500, max_threads=3)
+
+    async def receive():
+        await anyio.sleep_forever()
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    with patch("anyio.to_thread.run_sync", wraps=anyio.to_thread.run_sync) as run_sync:
+        await middleware(scope, receive, send)
+
+    assert run_sync.call_args.kwargs["limiter"].total_tokens == 3
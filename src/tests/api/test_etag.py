@@ -0,0 +1,20 @@
+from api.etag import calcular_etag, if_none_match_corresponde
+
+
+def test_calcular_etag_forte_e_deterministica():
+    etag = calcular_etag("favoritos", 1, 10, 50, "")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == calcular_etag("favoritos", 1, 10, 50, "")
+    assert etag != calcular_etag("favoritos", 1, 11, 50, "")
+    assert etag != calcular_etag("favoritos", 1, 10, 50, "cursor")
+
+
+def test_if_none_match_corresponde():
+    etag = calcular_etag("perfil", 1, 10)
+
+    assert if_none_match_corresponde(etag, etag)
+    assert if_none_match_corresponde(f'"outra", W/{etag}', etag)
+    assert if_none_match_corresponde("*", etag)
+    assert not if_none_match_corresponde('"outra"', etag)
+    assert not if_none_match_corresponde(None, etag)
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+import pytest
+
+from api.exportacao import clientes_csv, clientes_ndjson
+from core.domain.cliente import Cliente, TipoCliente
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _lotes():
+    yield [
+        Cliente(id=1, nome="Ana", email="ana@exemplo.com", tipo=TipoCliente.ADMIN),
+        Cliente(id=2, nome="Silva, Bruno", email="bruno@exemplo.com", tipo=TipoCliente.USER),
+    ]
+    yield [Cliente(id=3, nome="Caio", email="caio@exemplo.com", tipo=TipoCliente.USER)]
+
+
+async def test_clientes_ndjson_um_bloco_por_lote():
+    """Testa que cada lote vira um bloco com um objeto JSON por linha."""
+    blocos = [bloco async for bloco in clientes_ndjson(_lotes())]
+
+    assert len(blocos) == 2
+    linhas = b"".join(blocos).decode().splitlines()
+    assert [json.loads(linha)["id"] for linha in linhas] == [1, 2, 3]
+    assert json.loads(linhas[0]) == {"id": 1, "nome": "Ana", "email": "ana@exemplo.com", "tipo": 1}
+
+
+async def test_clientes_csv_com_cabecalho():
+    """Testa a geração do CSV com cabeçalho e campos escapados."""
+    blocos = [bloco async for bloco in clientes_csv(_lotes())]
+
+    assert len(blocos) == 3
+    linhas = list(csv.reader(io.StringIO("".join(blocos))))
+    assert linhas == [
+        ["id", "nome", "email", "tipo"],
+        ["1", "Ana", "ana@exemplo.com", "1"],
+        ["2", "Silva, Bruno", "bruno@exemplo.com", "0"],
+        ["3", "Caio", "caio@exemplo.com", "0"],
+    ]
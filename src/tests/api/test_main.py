@@ -1,7 +1,22 @@
+import json
 import pytest
+from decimal import Decimal
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
-from api.main import app
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from api.main import (
+    FAVORITOS_JSON, app, get_favorito_service, get_produto_cache, get_produto_service, get_versao_cache, json_response
+)
+from core.config.db import get_async_sessionmaker
+from core.domain.cliente import Cliente, TipoCliente
+from core.domain.favorito import FavoritoResponse
+from core.domain.paginacao import Pagina
+from core.domain.produto import ProdutoExterno
+from core.repository.produto_cache import ProdutoCache
+from core.repository.versao_cache import VersaoCache
+from core.security.security import get_current_user
+from core.service.favorito_service import FavoritoService
+from core.service.produto_service import ProdutoService
 
 client = TestClient(app)
 
@@ -16,24 +31,23 @@ def test_login_invalido():
     assert resp.status_code == 401
 
 # --- Testes de fluxo completo ---
-@patch("core.service.favorito_service.FakeStoreProduct")
-@patch("core.service.favorito_service.RedisConfig")
-def test_crud_cliente_e_favoritos(mock_redis_config, mock_fake_store):
-    # Mock Redis
-    mock_redis = MagicMock()
-    mock_redis.get.return_value = None
-    mock_redis.set.return_value = True
-    mock_redis_config.return_value.get_client.return_value = mock_redis
-    mock_redis_config.return_value.get_expires.return_value = 3600
-
-    # Mock FakeStoreProduct
-    mock_fake_store.return_value.get_product.return_value = {
-        "id": 1, "titulo": "Produto Teste", "imagem": "img.png", "preco": 10.0
-    }
-    mock_fake_store.return_value.get_product_sync.return_value = {
-        "id": 1, "titulo": "Produto Teste", "imagem": "img.png", "preco": 10.0
-    }
+@pytest.fixture
+def mock_produto_service():
+    """Substitui o serviço de produtos (cache + API externa) por um mock."""
+    produto = ProdutoExterno(
+        id=1, title="Produto Teste", price=Decimal("10.00"), description="Descrição",
+        category="Categoria", image="img.png",
+    )
+    service = MagicMock(spec=ProdutoService)
+    service.obter_produtos = AsyncMock(
+        side_effect=lambda produto_ids: {1: produto} if 1 in list(produto_ids) else {}
+    )
+    app.dependency_overrides[get_produto_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_produto_service, None)
+
 
+def test_crud_cliente_e_favoritos(mock_produto_service):
     # Criar cliente
     cliente_data = {
         "nome": "Test User",
@@ -104,4 +118,156 @@ def test_operacoes_sem_token():
     resp = client.get("/clientes/1/favoritos")
     assert resp.status_code in (401, 403)
     resp = client.post("/clientes/1/favoritos", json={"produto_ids": [1]})
-    assert resp.status_code in (401, 403)
\ No newline at end of file
+    assert resp.status_code in (401, 403)
+
+# --- Serialização das respostas ---
+def _favoritos() -> list[FavoritoResponse]:
+    produto = ProdutoExterno(
+        id=1, title="Mochila", price=Decimal("109.95"), description="Descrição com acentuação",
+        category="Categoria", image="https://img.com/1.png",
+    )
+    return [FavoritoResponse(id=10, cliente_id=1, produto=produto)]
+
+
+@pytest.fixture
+def usuario_autenticado():
+    app.dependency_overrides[get_current_user] = lambda: Cliente(
+        id=1, nome="Ana", email="ana@exemplo.com", tipo=TipoCliente.USER
+    )
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def versoes_fixas():
+    versoes = MagicMock(spec=VersaoCache)
+    versoes.obter = AsyncMock(return_value=5)
+    produto_cache = MagicMock(spec=ProdutoCache)
+    produto_cache.geracao = AsyncMock(return_value=7)
+    app.dependency_overrides[get_versao_cache] = lambda: versoes
+    app.dependency_overrides[get_produto_cache] = lambda: produto_cache
+    yield versoes, produto_cache
+    app.dependency_overrides.pop(get_versao_cache, None)
+    app.dependency_overrides.pop(get_produto_cache, None)
+
+
+@pytest.fixture
+def favoritos_service():
+    service = MagicMock(spec=FavoritoService)
+    service.listar_favoritos_paginado = AsyncMock(return_value=Pagina[FavoritoResponse](
+        itens=_favoritos(), proximo_cursor=None
+    ))
+    app.dependency_overrides[get_favorito_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_favorito_service, None)
+
+
+def test_json_response_igual_ao_response_model():
+    """Testa que a serialização direta gera os mesmos bytes do caminho com response_model (inclusive Decimal)."""
+    referencia = FastAPI()
+
+    @referencia.get("/favoritos", response_model=list[FavoritoResponse])
+    def favoritos():
+        return _favoritos()
+
+    esperado = TestClient(referencia).get("/favoritos").content
+
+    assert json_response(FAVORITOS_JSON, _favoritos()).body == esperado
+    assert b'"price":"109.95"' in esperado
+
+
+def test_listar_favoritos_nao_revalida_o_modelo(usuario_autenticado, versoes_fixas):
+    """Testa que a rota envia os modelos já validados pelo serviço sem validá-los novamente."""
+    # Produto fora das regras do modelo: seria rejeitado por uma nova validação do response_model
+    produto = ProdutoExterno.model_construct(
+        id=1, title="P", price=Decimal("-1"), description="d", category="c", image="i", rating=None
+    )
+    service = MagicMock(spec=FavoritoService)
+    service.listar_favoritos_paginado = AsyncMock(return_value=Pagina[FavoritoResponse].model_construct(
+        itens=[FavoritoResponse.model_construct(id=10, cliente_id=1, produto=produto)], proximo_cursor=None
+    ))
+    app.dependency_overrides[get_favorito_service] = lambda: service
+    try:
+        resp = client.get("/clientes/1/favoritos")
+    finally:
+        app.dependency_overrides.pop(get_favorito_service, None)
+
+    assert resp.status_code == 200
+    assert resp.json()[0]["produto"]["price"] == "-1"
+
+
+def test_listar_favoritos_if_none_match_retorna_304_sem_consultas(
+    usuario_autenticado, versoes_fixas, favoritos_service
+):
+    """Testa que a ETag atual recebe 304 sem consultar o serviço (banco e produtos)."""
+    resp = client.get("/clientes/1/favoritos")
+    etag = resp.headers["etag"]
+
+    resp = client.get("/clientes/1/favoritos", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+    favoritos_service.listar_favoritos_paginado.assert_awaited_once()
+
+
+def test_etag_de_favoritos_muda_com_a_geracao_dos_produtos(
+    usuario_autenticado, versoes_fixas, favoritos_service
+):
+    """Testa que uma alteração no cache de produtos invalida a ETag, mesmo sem mudança nos favoritos."""
+    _, produto_cache = versoes_fixas
+    etag = client.get("/clientes/1/favoritos").headers["etag"]
+    produto_cache.geracao.return_value = 8
+
+    resp = client.get("/clientes/1/favoritos", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert favoritos_service.listar_favoritos_paginado.await_count == 2
+
+
+class SessaoExportacao:
+    """Sessão que entrega os lotes da exportação e falha se lida depois de fechada."""
+
+    def __init__(self, lotes):
+        self.lotes = lotes
+        self.aberta = False
+        self.lotes_lidos = 0
+
+    async def __aenter__(self):
+        self.aberta = True
+        return self
+
+    async def __aexit__(self, *exc):
+        self.aberta = False
+
+    async def stream(self, stmt):
+        async def partitions():
+            for lote in self.lotes:
+                if not self.aberta:
+                    raise RuntimeError("sessão fechada durante o streaming")
+                self.lotes_lidos += 1
+                yield lote
+
+        return MagicMock(partitions=partitions)
+
+
+def test_exportar_clientes_mantem_a_sessao_aberta_ate_o_fim_do_stream():
+    """Testa que a exportação lê vários lotes com a sessão aberta durante todo o envio, e a fecha ao final."""
+    clientes = [Cliente(id=i, nome=f"C{i}", email=f"c{i}@exemplo.com", tipo=TipoCliente.USER) for i in range(1, 6)]
+    sessao = SessaoExportacao([clientes[0:2], clientes[2:4], clientes[4:]])
+    app.dependency_overrides[get_async_sessionmaker] = lambda: lambda: sessao
+    app.dependency_overrides[get_current_user] = lambda: Cliente(
+        id=99, nome="Admin", email="admin@exemplo.com", tipo=TipoCliente.ADMIN
+    )
+    try:
+        with client.stream("GET", "/clientes/exportar") as resp:
+            linhas = [linha for linha in resp.iter_lines() if linha]
+    finally:
+        app.dependency_overrides.pop(get_async_sessionmaker, None)
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert resp.status_code == 200
+    assert [json.loads(linha)["id"] for linha in linhas] == [1, 2, 3, 4, 5]
+    assert sessao.lotes_lidos == 3
+    assert not sessao.aberta
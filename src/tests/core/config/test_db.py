@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, exc, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool, QueuePool
+
+from core.config.db import (
+    AsyncQueuePoolMonitorado,
+    EsperaMonitoradaMixin,
+    EstatisticasPool,
+    RoutingSession,
+    criar_async_engine,
+    estatisticas_pool,
+    ler_do_primario,
+    pool_kwargs,
+)
+from core.config.settings import Settings
+from core.repository.cliente_orm import ClienteORM
+
+
+class QueuePoolTeste(EsperaMonitoradaMixin, QueuePool):
+    estatisticas = EstatisticasPool()
+
+
+def test_pool_configurado_pelas_settings():
+    """Testa que tamanho, overflow, timeout, recycle e pre-ping vêm das configurações."""
+    settings = Settings(db_pool_size=3, db_max_overflow=2, db_pool_timeout=1.5, db_pool_recycle=60)
+
+    engine = criar_async_engine(settings)
+
+    assert isinstance(engine.pool, AsyncQueuePoolMonitorado)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert engine.pool.timeout() == 1.5
+    assert engine.pool._recycle == 60
+    assert engine.pool._pre_ping is True
+
+
+def test_modo_pgbouncer_desativa_pool_e_cache_de_statements():
+    """Testa que o modo pgbouncer não mantém pool local nem prepared statements em cache."""
+    settings = Settings(db_pgbouncer=True)
+
+    with patch("core.config.db.create_async_engine", wraps=create_async_engine) as criar:
+        engine = criar_async_engine(settings)
+
+    assert pool_kwargs(settings) == {"poolclass": NullPool}
+    assert isinstance(engine.pool, NullPool)
+    assert engine.url.query["prepared_statement_cache_size"] == "0"
+    assert estatisticas_pool(engine) == {"modo": "pgbouncer"}
+    connect_args = criar.call_args.kwargs["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    nome = connect_args["prepared_statement_name_func"]
+    assert nome().startswith("__asyncpg_") and nome() != nome()
+
+
+def test_estatisticas_de_espera_e_timeout():
+    """Testa que checkouts, timeouts e conexões em uso são contabilizados."""
+    QueuePoolTeste.estatisticas = EstatisticasPool()
+    pool = QueuePoolTeste(creator=MagicMock, pool_size=1, max_overflow=0, timeout=0.01)
+
+    conexao = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    estatisticas = estatisticas_pool(SimpleNamespace(pool=pool))
+    assert estatisticas["em_uso"] == 1
+    assert estatisticas["checkouts"] == 2
+    assert estatisticas["timeouts"] == 1
+    assert estatisticas["espera_maxima_ms"] >= 10
+    conexao.close()
+    assert estatisticas_pool(SimpleNamespace(pool=pool))["em_uso"] == 0
+
+
+def test_engines_tem_estatisticas_separadas():
+    """Testa que primário e réplica não compartilham as estatísticas de espera."""
+    settings = Settings()
+
+    primario = criar_async_engine(settings)
+    replica = criar_async_engine(settings, "postgresql+asyncpg://u:p@replica:5432/db")
+
+    assert primario.pool.estatisticas is not replica.pool.estatisticas
+    assert replica.url.host == "replica"
+
+
+def test_routing_session_le_da_replica_e_escreve_no_primario():
+    """Testa que leituras vão à réplica até a primeira escrita da sessão, e depois ao primário."""
+    primario = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    session = RoutingSession(primario=primario, replica=replica)
+
+    assert session.get_bind(clause=select(ClienteORM)) is replica
+    assert session.get_bind(clause=update(ClienteORM).values(nome="X")) is primario
+    assert session.get_bind(clause=select(ClienteORM)) is primario
+
+
+def test_ler_do_primario_desvia_leituras_da_replica():
+    """Testa que leituras que não toleram atraso de replicação podem ser enviadas ao primário."""
+    primario = create_engine("sqlite://")
+    replica = create_engine("sqlite://")
+    session = RoutingSession(primario=primario, replica=replica)
+
+    ler_do_primario(SimpleNamespace(sync_session=session))
+
+    assert session.get_bind(clause=select(ClienteORM)) is primario
+    # Sem réplica, a sessão não é de roteamento e nada muda
+    ler_do_primario(SimpleNamespace(sync_session=MagicMock()))
+
+
+def test_replica_configurada_por_host():
+    """Testa que a réplica é opcional e reutiliza as credenciais do primário."""
+    assert Settings(db_replica_host="").async_replica_database_url is None
+    url = Settings(db_replica_host="replica", db_user="u", db_pass="p").async_replica_database_url
+    assert url.startswith("postgresql+asyncpg://u:p@replica:")
@@ -0,0 +1,26 @@
+from core.config.redis_config import RedisConfig
+
+
+def test_pool_configurado_por_variaveis_de_ambiente(monkeypatch):
+    """Testa que limites e timeouts do pool são lidos do ambiente."""
+    monkeypatch.setenv("REDIS_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("REDIS_SOCKET_TIMEOUT", "1.5")
+    monkeypatch.setenv("REDIS_HEALTH_CHECK_INTERVAL", "15")
+
+    pool = RedisConfig().get_async_pool()
+
+    assert pool.max_connections == 7
+    assert pool.connection_kwargs["socket_timeout"] == 1.5
+    assert pool.connection_kwargs["health_check_interval"] == 15
+
+
+def test_clientes_compartilham_o_mesmo_pool():
+    """Testa que clientes criados a partir de um pool reutilizam suas conexões."""
+    config = RedisConfig()
+    pool = config.get_async_pool()
+
+    cliente_a = config.get_async_client(pool)
+    cliente_b = config.get_async_client(pool)
+
+    assert cliente_a.connection_pool is pool
+    assert cliente_b.connection_pool is pool
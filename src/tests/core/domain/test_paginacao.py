@@ -0,0 +1,39 @@
+import pytest
+
+from core.domain.favorito import Favorito
+from core.domain.paginacao import (
+    CursorInvalidoError,
+    codificar_cursor,
+    decodificar_cursor,
+    fatiar_pagina,
+)
+
+
+def test_cursor_ida_e_volta():
+    """Testa que o cursor é opaco e devolve o último ID codificado."""
+    cursor = codificar_cursor(42)
+    assert "42" not in cursor
+    assert decodificar_cursor(cursor) == 42
+
+
+@pytest.mark.parametrize("cursor", ["nao-e-base64!", codificar_cursor(1)[:-2], "eyJ4IjoxfQ", "eyJpZCI6IjEifQ"])
+def test_cursor_invalido(cursor):
+    """Testa que cursores malformados ou adulterados são rejeitados."""
+    with pytest.raises(CursorInvalidoError):
+        decodificar_cursor(cursor)
+
+
+def test_fatiar_pagina_com_proxima():
+    """Testa que o registro excedente indica a próxima página, a partir do último ID da atual."""
+    registros = [Favorito(id=i, cliente_id=1, produto_id=i) for i in (1, 2, 3)]
+
+    pagina, proximo_cursor = fatiar_pagina(registros, limite=2)
+
+    assert [f.id for f in pagina] == [1, 2]
+    assert decodificar_cursor(proximo_cursor) == 2
+
+
+def test_fatiar_pagina_ultima():
+    """Testa que a última página não tem cursor."""
+    registros = [Favorito(id=1, cliente_id=1, produto_id=1)]
+    assert fatiar_pagina(registros, limite=2) == (registros, None)
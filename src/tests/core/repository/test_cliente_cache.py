@@ -0,0 +1,99 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.domain.cliente import Cliente, ClienteInDB, TipoCliente
+from core.repository.cliente_cache import ClienteCache
+
+pytestmark = pytest.mark.asyncio
+
+
+class RedisLocal:
+    """Substituto local do Redis com os comandos usados pelo cache de perfis."""
+
+    def __init__(self):
+        self.dados = {}
+        self.expiracoes = {}
+
+    async def get(self, chave):
+        return self.dados.get(chave)
+
+    async def set(self, chave, valor, ex=None):
+        self.dados[chave] = valor
+        self.expiracoes[chave] = ex
+
+    async def delete(self, *chaves):
+        for chave in chaves:
+            self.dados.pop(chave, None)
+
+
+class RedisIndisponivel:
+    async def get(self, chave):
+        raise RedisConnectionError("sem conexão")
+
+    async def set(self, chave, valor, ex=None):
+        raise RedisConnectionError("sem conexão")
+
+    async def delete(self, *chaves):
+        raise RedisConnectionError("sem conexão")
+
+
+def _cliente() -> Cliente:
+    return Cliente(id=1, nome="Ana", email="ana@exemplo.com", tipo=TipoCliente.ADMIN)
+
+
+@pytest.fixture
+def redis_local():
+    return RedisLocal()
+
+
+@pytest.fixture
+def cache(redis_local):
+    return ClienteCache(redis_local, expires=30)
+
+
+async def test_set_e_get_por_email(cache, redis_local):
+    """Testa que o perfil é gravado com TTL curto e recuperado pelo e-mail (subject)."""
+    await cache.set(_cliente())
+
+    assert await cache.get("ana@exemplo.com") == _cliente()
+    assert await cache.get("outro@exemplo.com") is None
+    assert redis_local.expiracoes == {"auth:cliente:ana@exemplo.com": 30}
+    assert cache.estatisticas() == {"hits": 1, "misses": 1}
+
+
+async def test_set_nao_grava_senha(cache, redis_local):
+    """Testa que o hash da senha nunca é gravado no cache."""
+    await cache.set(ClienteInDB(**_cliente().model_dump(), senha="hash_bcrypt"))
+
+    valor = redis_local.dados["auth:cliente:ana@exemplo.com"]
+    assert "senha" not in valor
+    assert "hash_bcrypt" not in valor
+    assert type(await cache.get("ana@exemplo.com")) is Cliente
+
+
+async def test_invalidar_remove_perfil(cache):
+    """Testa que a invalidação força a próxima leitura a ir ao banco."""
+    await cache.set(_cliente())
+
+    await cache.invalidar("ana@exemplo.com")
+
+    assert await cache.get("ana@exemplo.com") is None
+
+
+async def test_invalidar_varios_emails(cache, redis_local):
+    """Testa que vários perfis (ex.: e-mail anterior e novo) são removidos de uma vez."""
+    await cache.set(_cliente())
+    await cache.set(_cliente().model_copy(update={"email": "ana.nova@exemplo.com"}))
+
+    await cache.invalidar("ana@exemplo.com", "ana.nova@exemplo.com")
+
+    assert redis_local.dados == {}
+
+
+async def test_redis_indisponivel_nao_impede_autenticacao():
+    """Testa que falhas do Redis são tratadas como ausência no cache."""
+    cache = ClienteCache(RedisIndisponivel())
+
+    assert await cache.get("ana@exemplo.com") is None
+    await cache.set(_cliente())
+    await cache.invalidar("ana@exemplo.com")
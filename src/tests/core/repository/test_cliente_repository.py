@@ -1,10 +1,12 @@
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from pydantic import ValidationError, SecretStr
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from core.domain.cliente import Cliente, ClienteCreate, TipoCliente
-from core.repository.cliente_repository import ClienteRepository
+from core.domain.cliente import Cliente, ClienteCreate, ClienteUpdate, TipoCliente
+from core.repository.cliente_repository import AsyncClienteRepository, ClienteRepository
 from core.repository.cliente_orm import ClienteORM
 
 
@@ -73,22 +75,27 @@ def test_list_clientes(repo, mock_db):
             id=2, nome="B", email="b@b.com", tipo=TipoCliente.USER, senha="pass2"
         ),
     ]
-    mock_db.query.return_value.all.return_value = clientes_orm
+    mock_db.query.return_value.order_by.return_value.all.return_value = clientes_orm
     clientes = repo.list()
     assert len(clientes) == 2
     assert clientes[0].nome == "A"
     assert clientes[1].nome == "B"
 
 
+def test_list_clientes_paginado(repo, mock_db):
+    query = mock_db.query.return_value.filter.return_value.order_by.return_value
+    query.limit.return_value.all.return_value = [
+        ClienteORM(id=3, nome="C", email="c@c.com", tipo=TipoCliente.USER, senha="pass3")
+    ]
+    clientes = repo.list(apos_id=2, limite=1)
+    assert [c.id for c in clientes] == [3]
+    query.limit.assert_called_once_with(1)
+
+
 def test_update_cliente_found(repo, mock_db):
-    cliente_orm = ClienteORM(
-        id=3,
-        nome="Antigo",
-        email="antigo@email.com",
-        tipo=TipoCliente.USER,
-        senha="antiga_senha",
+    mock_db.execute.return_value.first.return_value = MagicMock(
+        id=3, nome="Novo Nome", email="novo@email.com", tipo=TipoCliente.ADMIN
     )
-    mock_db.query.return_value.filter.return_value.first.return_value = cliente_orm
     cliente_update_data = Cliente(
         id=3,
         nome="Novo Nome",
@@ -102,11 +109,19 @@ def test_update_cliente_found(repo, mock_db):
     assert updated_cliente is not None
     assert updated_cliente.nome == "Novo Nome"
     assert updated_cliente.tipo == TipoCliente.ADMIN
+    mock_db.execute.assert_called_once()
+    mock_db.query.assert_not_called()
+    mock_db.refresh.assert_not_called()
     mock_db.commit.assert_called_once()
+    stmt = mock_db.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE clientes SET")
+    assert "RETURNING clientes.id, clientes.nome, clientes.email, clientes.tipo" in sql
+    assert stmt.compile().params["nome"] == "Novo Nome"
 
 
 def test_update_cliente_not_found(repo, mock_db):
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.execute.return_value.first.return_value = None
     cliente_update_data = Cliente(
         id=4, nome="Nao Existe", email="nao@existe.com", senha=SecretStr("password"), tipo=TipoCliente.USER
     )
@@ -114,16 +129,148 @@ def test_update_cliente_not_found(repo, mock_db):
     assert updated_cliente is None
 
 
+def test_update_cliente_grava_senha_sem_secretstr(repo, mock_db):
+    mock_db.execute.return_value.first.return_value = None
+    repo.update(4, ClienteUpdate(senha=SecretStr("hash_da_senha")))
+    params = mock_db.execute.call_args.args[0].compile().params
+    assert params["senha"] == "hash_da_senha"
+    assert "nome" not in params
+
+
+def test_update_cliente_sem_alteracoes(repo, mock_db):
+    mock_db.query.return_value.filter.return_value.first.return_value = ClienteORM(
+        id=4, nome="Igual", email="igual@email.com", tipo=TipoCliente.USER, senha="hash"
+    )
+    updated_cliente = repo.update(4, ClienteUpdate())
+    assert updated_cliente.nome == "Igual"
+    mock_db.execute.assert_not_called()
+    mock_db.commit.assert_not_called()
+
+
 def test_delete_cliente_found(repo, mock_db):
-    cliente_orm = ClienteORM(id=5, nome="Para Deletar", email="del@del.com")
-    mock_db.query.return_value.filter.return_value.first.return_value = cliente_orm
+    mock_db.execute.return_value.first.return_value = MagicMock(id=5)
     deleted = repo.delete(5)
     assert deleted is True
-    mock_db.delete.assert_called_once_with(cliente_orm)
+    mock_db.execute.assert_called_once()
+    mock_db.delete.assert_not_called()
     mock_db.commit.assert_called_once()
+    sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("DELETE FROM clientes WHERE clientes.id =")
+    assert sql.endswith("RETURNING clientes.email")
 
 
 def test_delete_cliente_not_found(repo, mock_db):
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.execute.return_value.first.return_value = None
     deleted = repo.delete(999)
     assert deleted is False
+
+
+@pytest.fixture
+def async_db():
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.mark.asyncio
+async def test_async_get_by_email(async_db):
+    async_db.scalar.return_value = ClienteORM(
+        id=1, nome="A", email="a@a.com", tipo=TipoCliente.USER, senha="hash"
+    )
+    cliente = await AsyncClienteRepository(async_db).get_by_email("a@a.com")
+    assert cliente.senha.get_secret_value() == "hash"
+    stmt = async_db.scalar.await_args.args[0]
+    assert "WHERE clientes.email = :email_1" in str(stmt)
+
+
+@pytest.mark.asyncio
+async def test_async_get_perfil_by_email_nao_carrega_senha(async_db):
+    async_db.execute.return_value = MagicMock(first=MagicMock(return_value=MagicMock(
+        id=1, nome="A", email="a@a.com", tipo=TipoCliente.USER
+    )))
+    cliente = await AsyncClienteRepository(async_db).get_perfil_by_email("a@a.com")
+    assert cliente.id == 1
+    assert not hasattr(cliente, "senha")
+    stmt = str(async_db.execute.await_args.args[0])
+    assert "clientes.senha" not in stmt
+    assert "WHERE clientes.email = :email_1" in stmt
+
+
+@pytest.mark.asyncio
+async def test_async_stream_all_em_lotes(async_db):
+    lotes = [
+        [MagicMock(id=1, nome="A", email="a@a.com", tipo=TipoCliente.USER)],
+        [MagicMock(id=2, nome="B", email="b@b.com", tipo=TipoCliente.ADMIN)],
+    ]
+
+    async def partitions():
+        for lote in lotes:
+            yield lote
+
+    async_db.stream.return_value = MagicMock(partitions=partitions)
+    recebidos = [lote async for lote in AsyncClienteRepository(async_db).stream_all(tamanho_lote=1)]
+
+    assert [[c.id for c in lote] for lote in recebidos] == [[1], [2]]
+    stmt = async_db.stream.await_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 1
+    assert "clientes.senha" not in str(stmt)
+    assert "ORDER BY clientes.id" in str(stmt)
+
+
+@pytest.mark.asyncio
+async def test_async_list_paginado(async_db):
+    async_db.scalars.return_value = MagicMock(all=MagicMock(return_value=[
+        ClienteORM(id=3, nome="C", email="c@c.com", tipo=TipoCliente.USER, senha="pass3")
+    ]))
+    clientes = await AsyncClienteRepository(async_db).list(apos_id=2, limite=1)
+    assert [c.id for c in clientes] == [3]
+    sql = str(async_db.scalars.await_args.args[0])
+    assert "WHERE clientes.id > :id_1 ORDER BY clientes.id" in sql
+    assert "LIMIT :param_1" in sql
+
+
+@pytest.mark.asyncio
+async def test_async_delete_not_found(async_db):
+    async_db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=None))
+    assert await AsyncClienteRepository(async_db).delete(99) is None
+    async_db.execute.assert_awaited_once()
+    async_db.delete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_async_delete_retorna_email_em_um_comando(async_db):
+    async_db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value="a@a.com"))
+    assert await AsyncClienteRepository(async_db).delete(1) == "a@a.com"
+    async_db.execute.assert_awaited_once()
+    async_db.get.assert_not_awaited()
+    sql = str(async_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("DELETE FROM clientes WHERE clientes.id =")
+    assert sql.endswith("RETURNING clientes.email")
+
+
+@pytest.mark.asyncio
+async def test_async_update_em_um_comando(async_db):
+    async_db.execute.return_value = MagicMock(first=MagicMock(return_value=MagicMock(
+        id=1, nome="Novo", email="a@a.com", tipo=TipoCliente.USER
+    )))
+    cliente = await AsyncClienteRepository(async_db).update(1, ClienteUpdate(nome="Novo"))
+    assert cliente.nome == "Novo"
+    async_db.execute.assert_awaited_once()
+    async_db.get.assert_not_awaited()
+    async_db.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_async_update_retorna_email_anterior_no_mesmo_comando(async_db):
+    async_db.execute.return_value = MagicMock(first=MagicMock(return_value=MagicMock(
+        id=1, nome="A", email="novo@a.com", tipo=TipoCliente.USER, email_anterior="antigo@a.com"
+    )))
+    novos_dados = Cliente(id=1, nome="A", email="novo@a.com", tipo=TipoCliente.USER)
+
+    cliente, email_anterior = await AsyncClienteRepository(async_db).update_returning_previous_email(1, novos_dados)
+
+    assert (cliente.email, email_anterior) == ("novo@a.com", "antigo@a.com")
+    async_db.execute.assert_awaited_once()
+    sql = str(async_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH anterior AS MATERIALIZED")
+    assert "FOR UPDATE" in sql
+    assert "FROM anterior WHERE clientes.id = anterior.id" in sql
+    assert sql.endswith("anterior.email AS email_anterior")
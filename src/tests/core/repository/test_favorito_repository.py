@@ -1,9 +1,11 @@
 import pytest
-from unittest.mock import MagicMock, call
+from unittest.mock import AsyncMock, MagicMock, call
 from sqlalchemy.orm import Session
 from unittest.mock import MagicMock, call
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from core.repository.favorito_repository import FavoritoRepository
+from core.repository.favorito_repository import AsyncFavoritoRepository, FavoritoRepository
 from core.domain.favorito import FavoritoCreate
 from core.repository.favorito_orm import FavoritoORM
 
@@ -26,25 +28,33 @@ def repository(mock_db):
 
 
 def test_create_many(repository, mock_db):
-    """Testa a criação de múltiplos favoritos em lote."""
+    """Testa a criação de múltiplos favoritos em um único INSERT ... ON CONFLICT DO NOTHING RETURNING."""
     favoritos_data = [
         FavoritoCreate(cliente_id=1, produto_id=10),
         FavoritoCreate(cliente_id=1, produto_id=20),
     ]
+    # Produto 20 já favoritado por uma requisição concorrente: não retorna do INSERT
+    mock_db.execute.return_value.all.return_value = [
+        MagicMock(id=1, cliente_id=1, produto_id=10),
+    ]
 
-    # Usar uma lista mutável para o contador
-    counter = [1]
-    def refresh_side_effect(fav):
-        fav.id = counter[0]
-        fav.cliente_id = fav.cliente_id if hasattr(fav, 'cliente_id') else 1
-        fav.produto_id = fav.produto_id if hasattr(fav, 'produto_id') else 10
-        counter[0] += 1
-    mock_db.refresh.side_effect = refresh_side_effect
-
-    repository.create_many(favoritos_data)
+    result = repository.create_many(favoritos_data)
 
-    assert mock_db.add_all.call_count == 1
+    assert [(f.id, f.produto_id) for f in result] == [(1, 10)]
+    mock_db.execute.assert_called_once()
     mock_db.commit.assert_called_once()
+    mock_db.add_all.assert_not_called()
+    mock_db.refresh.assert_not_called()
+    sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uix_cliente_produto DO NOTHING" in sql
+    assert "RETURNING" in sql
+
+
+def test_create_many_vazio(repository, mock_db):
+    """Testa que nenhuma escrita é feita sem favoritos."""
+    assert repository.create_many([]) == []
+    mock_db.execute.assert_not_called()
+    mock_db.commit.assert_not_called()
 
 
 def test_list_by_cliente(repository, mock_db):
@@ -53,7 +63,7 @@ def test_list_by_cliente(repository, mock_db):
         FavoritoORM(id=1, cliente_id=1, produto_id=10),
         FavoritoORM(id=2, cliente_id=1, produto_id=20),
     ]
-    mock_db.query.return_value.filter.return_value.all.return_value = mock_favoritos_orm
+    mock_db.query.return_value.filter.return_value.order_by.return_value.all.return_value = mock_favoritos_orm
 
     result = repository.list_by_cliente(cliente_id=1)
 
@@ -61,27 +71,43 @@ def test_list_by_cliente(repository, mock_db):
     assert len(result) == 2
 
 
+def test_list_by_cliente_paginado(repository, mock_db):
+    """Testa a listagem de uma página de favoritos a partir do último ID da página anterior."""
+    query = mock_db.query.return_value.filter.return_value.order_by.return_value
+    query.limit.return_value.all.return_value = [FavoritoORM(id=3, cliente_id=1, produto_id=30)]
+
+    result = repository.list_by_cliente(cliente_id=1, apos_id=2, limite=1)
+
+    assert [f.id for f in result] == [3]
+    query.limit.assert_called_once_with(1)
+    filtros = mock_db.query.return_value.filter.call_args.args
+    assert [str(f) for f in filtros] == ["favoritos.cliente_id = :cliente_id_1", "favoritos.id > :id_1"]
+
+
 
 def test_delete_favorito_found(repository, mock_db):
-    """Testa a remoção de um favorito que existe."""
-    mock_favorito = FavoritoORM()
-    mock_db.query.return_value.filter.return_value.first.return_value = mock_favorito
+    """Testa a remoção de um favorito que existe, em um único DELETE ... RETURNING."""
+    mock_db.execute.return_value.first.return_value = MagicMock(id=1)
 
     result = repository.delete(cliente_id=1, produto_id=1)
 
-    mock_db.delete.assert_called_once_with(mock_favorito)
+    mock_db.execute.assert_called_once()
+    mock_db.query.assert_not_called()
+    mock_db.delete.assert_not_called()
     mock_db.commit.assert_called_once()
     assert result is True
+    sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("DELETE FROM favoritos WHERE favoritos.cliente_id =")
+    assert sql.endswith("RETURNING favoritos.id")
 
 
 def test_delete_favorito_not_found(repository, mock_db):
     """Testa a tentativa de remoção de um favorito que não existe."""
-    mock_db.query.return_value.filter.return_value.first.return_value = None
+    mock_db.execute.return_value.first.return_value = None
 
     result = repository.delete(cliente_id=1, produto_id=99)
 
     mock_db.delete.assert_not_called()
-    mock_db.commit.assert_not_called()
     assert result is False
 
 
@@ -97,3 +123,66 @@ def test_exists_false(repository, mock_db):
     mock_db.query.return_value.filter.return_value.first.return_value = None
     result = repository.exists(cliente_id=1, produto_id=99)
     assert result is False
+
+
+def test_existing_produto_ids(repository, mock_db):
+    """Testa que os produtos já favoritados são obtidos em uma única consulta."""
+    mock_db.query.return_value.filter.return_value.all.return_value = [
+        MagicMock(produto_id=10), MagicMock(produto_id=30)
+    ]
+
+    result = repository.existing_produto_ids(cliente_id=1, produto_ids=[10, 20, 30])
+
+    assert result == {10, 30}
+    mock_db.query.assert_called_once_with(FavoritoORM.produto_id)
+
+
+def test_existing_produto_ids_vazio(repository, mock_db):
+    """Testa que nenhuma consulta é feita para uma lista vazia."""
+    assert repository.existing_produto_ids(cliente_id=1, produto_ids=[]) == set()
+    mock_db.query.assert_not_called()
+
+
+@pytest.fixture
+def async_db():
+    """Fixture que cria um mock para a sessão assíncrona do banco de dados."""
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.mark.asyncio
+async def test_async_create_many(async_db):
+    """Testa a criação em lote com a sessão assíncrona, em um único INSERT."""
+    async_db.execute.return_value = MagicMock(all=MagicMock(return_value=[
+        MagicMock(id=1, cliente_id=1, produto_id=10),
+    ]))
+
+    result = await AsyncFavoritoRepository(async_db).create_many([FavoritoCreate(cliente_id=1, produto_id=10)])
+
+    assert [f.id for f in result] == [1]
+    async_db.execute.assert_awaited_once()
+    async_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_existing_produto_ids(async_db):
+    """Testa a verificação de duplicados em uma única consulta assíncrona."""
+    async_db.scalars.return_value = MagicMock(all=MagicMock(return_value=[10]))
+
+    result = await AsyncFavoritoRepository(async_db).existing_produto_ids(1, [10, 20])
+
+    assert result == {10}
+    async_db.scalars.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_list_by_cliente(async_db):
+    """Testa a listagem paginada de favoritos com a sessão assíncrona."""
+    async_db.scalars.return_value = MagicMock(all=MagicMock(return_value=[
+        FavoritoORM(id=3, cliente_id=1, produto_id=30),
+    ]))
+
+    result = await AsyncFavoritoRepository(async_db).list_by_cliente(1, apos_id=2, limite=1)
+
+    assert [f.id for f in result] == [3]
+    sql = str(async_db.scalars.await_args.args[0])
+    assert "favoritos.id > :id_1 ORDER BY favoritos.id" in sql
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import time
+from decimal import Decimal
+
+import pytest
+
+from core.domain.produto import ProdutoExterno
+from core.repository.produto_cache import ProdutoCache, ProdutoCacheLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+class RedisLocal:
+    """Substituto local do Redis que contabiliza as idas e voltas à rede."""
+
+    def __init__(self):
+        self.dados = {}
+        self.expiracoes = {}
+        self.publicacoes = []
+        self.round_trips = 0
+
+    async def mget(self, chaves):
+        self.round_trips += 1
+        return [self.dados.get(chave) for chave in chaves]
+
+    def pipeline(self, transaction=True):
+        return PipelineLocal(self)
+
+
+class PipelineLocal:
+    def __init__(self, redis):
+        self.redis = redis
+        self.comandos = []
+
+    def set(self, chave, valor, ex=None, nx=False):
+        self.comandos.append(("set", chave, valor, ex, nx))
+
+    def get(self, chave):
+        self.comandos.append(("get", chave))
+
+    def incr(self, chave):
+        self.comandos.append(("incr", chave))
+
+    def delete(self, *chaves):
+        self.comandos.extend(("delete", chave) for chave in chaves)
+
+    def publish(self, canal, mensagem):
+        self.comandos.append(("publish", canal, mensagem))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        resultados = []
+        for comando, *args in self.comandos:
+            if comando == "set":
+                chave, valor, ex, nx = args
+                if not (nx and chave in self.redis.dados):
+                    self.redis.dados[chave] = str(valor)
+                    if ex is not None:
+                        self.redis.expiracoes[chave] = ex
+                resultados.append(True)
+            elif comando == "get":
+                resultados.append(self.redis.dados.get(args[0]))
+            elif comando == "incr":
+                self.redis.dados[args[0]] = str(int(self.redis.dados.get(args[0], 0)) + 1)
+                resultados.append(int(self.redis.dados[args[0]]))
+            elif comando == "delete":
+                self.redis.dados.pop(args[0], None)
+                resultados.append(1)
+            else:
+                self.redis.publicacoes.append(tuple(args))
+                resultados.append(1)
+        return resultados
+
+
+class PubSubLocal:
+    def __init__(self, mensagens):
+        self.mensagens = list(mensagens)
+        self.canais = []
+
+    async def subscribe(self, canal):
+        self.canais.append(canal)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=None):
+        if self.mensagens:
+            return {"type": "message", "data": self.mensagens.pop(0)}
+        await asyncio.sleep(timeout or 0)
+
+    async def aclose(self):
+        pass
+
+
+def _produto(produto_id: int) -> ProdutoExterno:
+    return ProdutoExterno(
+        id=produto_id, title=f"P{produto_id}", price=Decimal("10.50"), description="Descrição",
+        category="Categoria", image=f"https://img.com/{produto_id}.png",
+    )
+
+
+@pytest.fixture
+def redis_local():
+    return RedisLocal()
+
+
+@pytest.fixture
+def cache(redis_local):
+    return ProdutoCache(redis_local, expires=120)
+
+
+@pytest.fixture
+def cache_l1(redis_local):
+    return ProdutoCache(redis_local, expires=120, local=ProdutoCacheLocal(max_itens=10, ttl=60))
+
+
+async def test_get_many_usa_um_unico_mget(cache, redis_local):
+    """Testa que a leitura de vários produtos custa uma única ida ao Redis."""
+    redis_local.dados["produto:1"] = _produto(1).model_dump_json()
+    redis_local.dados["produto:3"] = _produto(3).model_dump_json()
+
+    produtos = await cache.get_many([1, 2, 3])
+
+    assert produtos == {1: _produto(1), 3: _produto(3)}
+    assert redis_local.round_trips == 1
+
+
+async def test_get_many_vazio_nao_acessa_redis(cache, redis_local):
+    """Testa que uma lista vazia não gera acesso ao Redis."""
+    assert await cache.get_many([]) == {}
+    assert redis_local.round_trips == 0
+
+
+async def test_set_many_usa_um_unico_pipeline_com_expiracao(cache, redis_local):
+    """Testa que a escrita de vários produtos custa uma única ida ao Redis, com TTL."""
+    produtos = {i: _produto(i) for i in (1, 2, 3)}
+    await cache.set_many(produtos)
+
+    assert redis_local.round_trips == 1
+    assert json.loads(redis_local.dados["produto:2"])["produto"]["id"] == 2
+    assert set(redis_local.expiracoes.values()) == {120}
+    assert await cache.get_many([1, 2, 3]) == produtos
+    assert redis_local.round_trips == 2
+
+
+async def test_set_many_vazio_nao_acessa_redis(cache, redis_local):
+    """Testa que nenhuma escrita é feita quando não há produtos."""
+    await cache.set_many({})
+    assert redis_local.round_trips == 0
+
+
+async def test_get_many_com_validade_indica_desatualizados(redis_local):
+    """Testa que produtos mais antigos que o soft TTL são servidos, mas marcados como desatualizados."""
+    cache = ProdutoCache(redis_local, expires=3600, soft_ttl=60)
+    redis_local.dados["produto:1"] = ProdutoCache._serializar(_produto(1), time.time() - 120)
+    redis_local.dados["produto:2"] = ProdutoCache._serializar(_produto(2), time.time())
+    redis_local.dados["produto:3"] = json.dumps({"id": 3, "title": "Formato antigo", "price": 1,
+                                                 "description": "d", "category": "c", "image": "i"})
+
+    produtos, desatualizados = await cache.get_many_com_validade([1, 2, 3])
+
+    assert set(produtos) == {1, 2, 3}
+    assert desatualizados == {1, 3}
+
+
+async def test_produto_inexistente_usa_ttl_curto(cache_l1, redis_local):
+    """Testa que entradas negativas expiram antes dos produtos e são distinguidas de ausências."""
+    cache_l1.negativo_ttl = 30
+    await cache_l1.set_many({1: _produto(1), 999: None})
+    cache_l1.local.limpar()
+
+    registros, desatualizados = await cache_l1.get_many_com_validade([1, 999, 2])
+
+    assert registros == {1: _produto(1), 999: None}
+    assert desatualizados == set()
+    assert redis_local.expiracoes == {"produto:1": 120, "produto:999": 30}
+    assert await cache_l1.get_many([999]) == {}
+
+
+async def test_produto_inexistente_lido_do_redis_expira_cedo_na_memoria(redis_local, monkeypatch):
+    """Testa que uma entrada negativa gravada por outro worker não fica na memória local além do `negativo_ttl`."""
+    escritor = ProdutoCache(redis_local, expires=120, negativo_ttl=30)
+    leitor = ProdutoCache(redis_local, expires=120, local=ProdutoCacheLocal(ttl=300), negativo_ttl=30)
+    await escritor.set_many({1: _produto(1), 999: None})
+
+    assert await leitor.get_many_com_validade([1, 999]) == ({1: _produto(1), 999: None}, set())
+
+    agora = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: agora + 31)
+    assert leitor.local.get_registro(999) is None
+    assert leitor.local.get(1) == _produto(1)
+
+
+async def test_cache_local_evita_acesso_ao_redis(cache_l1, redis_local):
+    """Testa que produtos já em memória não geram acesso ao Redis e que os contadores são atualizados."""
+    redis_local.dados["produto:1"] = _produto(1).model_dump_json()
+
+    await cache_l1.get_many([1, 2])  # L1 miss para ambos; L2 hit para 1
+    produtos = await cache_l1.get_many([1])  # L1 hit
+
+    assert produtos == {1: _produto(1)}
+    assert redis_local.round_trips == 1
+    assert cache_l1.estatisticas() == {
+        "l1": {"hits": 1, "misses": 2, "itens": 1},
+        "l2": {"hits": 1, "misses": 1},
+    }
+
+
+async def test_set_many_anuncia_produtos_alterados_no_mesmo_pipeline(cache_l1, redis_local):
+    """Testa que a gravação pode anunciar produtos alterados sem uma ida extra ao Redis."""
+    await cache_l1.set_many({1: _produto(1), 2: _produto(2)}, notificar=[2])
+
+    assert redis_local.round_trips == 1
+    assert [(canal, json.loads(mensagem)) for canal, mensagem in redis_local.publicacoes] == [
+        (ProdutoCache.CANAL_INVALIDACAO, {"origem": cache_l1.origem, "produtos": [2]})
+    ]
+
+
+async def test_invalidar_remove_e_publica(cache_l1, redis_local):
+    """Testa que a invalidação remove o produto dos dois níveis e avisa os demais workers."""
+    await cache_l1.set_many({1: _produto(1)})
+
+    await cache_l1.invalidar([1])
+
+    assert "produto:1" not in redis_local.dados
+    assert len(cache_l1.local) == 0
+    assert [(canal, json.loads(mensagem)) for canal, mensagem in redis_local.publicacoes] == [
+        (ProdutoCache.CANAL_INVALIDACAO, {"origem": cache_l1.origem, "produtos": [1]})
+    ]
+
+
+async def test_geracao_avanca_a_cada_alteracao_anunciada(cache_l1, redis_local):
+    """Testa que a geração muda com alterações anunciadas e invalidações, e não com gravações simples."""
+    inicial = await cache_l1.geracao()
+    await cache_l1.set_many({1: _produto(1)})
+    assert await cache_l1.geracao() == inicial
+
+    await cache_l1.set_many({1: _produto(1)}, notificar=[1])
+    assert await cache_l1.geracao() == inicial + 1
+    await cache_l1.invalidar([1])
+    assert await cache_l1.geracao() == inicial + 2
+    # Uma ida ao Redis por operação: a geração avança no mesmo pipeline da gravação
+    assert redis_local.round_trips == 7
+
+
+async def test_geracao_recriada_nao_repete_valores(cache, redis_local):
+    """Testa que uma geração perdida recomeça de um valor novo, e não de zero."""
+    anterior = await cache.geracao()
+    await cache.invalidar([1])
+    del redis_local.dados[ProdutoCache.CHAVE_GERACAO]
+
+    assert await cache.geracao() not in (anterior, anterior + 1, 0, 1)
+
+
+async def test_escutar_invalidacoes_descarta_cache_local(cache_l1, redis_local):
+    """Testa que mensagens de outros workers descartam os produtos da memória local, e as próprias não."""
+    cache_l1.local.set(1, _produto(1))
+    cache_l1.local.set(2, _produto(2))
+    redis_local.pubsub = lambda: PubSubLocal([
+        json.dumps({"origem": "outro-worker", "produtos": [1]}),
+        json.dumps({"origem": cache_l1.origem, "produtos": [2]}),
+    ])
+
+    tarefa = asyncio.create_task(cache_l1.escutar_invalidacoes())
+    await asyncio.sleep(0.05)
+    tarefa.cancel()
+    await asyncio.gather(tarefa, return_exceptions=True)
+
+    assert cache_l1.local.get(1) is None
+    assert cache_l1.local.get(2) == _produto(2)
+
+
+async def test_cache_local_lru_e_ttl(monkeypatch):
+    """Testa a remoção do item menos usado ao atingir o limite e a expiração por TTL."""
+    local = ProdutoCacheLocal(max_itens=2, ttl=10)
+    local.set(1, _produto(1))
+    local.set(2, _produto(2))
+    local.get(1)
+    local.set(3, _produto(3))
+
+    assert local.get(2) is None
+    assert local.get(1) == _produto(1)
+
+    agora = local._itens[1][0]
+    monkeypatch.setattr("core.repository.produto_cache.time.monotonic", lambda: agora + 1)
+    assert local.get(1) is None
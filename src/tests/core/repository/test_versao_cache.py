@@ -0,0 +1,135 @@
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.repository.versao_cache import VersaoCache
+
+pytestmark = pytest.mark.asyncio
+
+
+class RedisLocal:
+    """Substituto local do Redis com os comandos de hash usados pelos contadores."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.expiracoes = {}
+        self.round_trips = 0
+        self.indisponivel = False
+        self.pipeline_indisponivel = False
+
+    def pipeline(self, transaction=True):
+        return PipelineLocal(self)
+
+    async def delete(self, *chaves):
+        if self.indisponivel:
+            raise RedisConnectionError("sem conexão")
+        for chave in chaves:
+            self.hashes.pop(chave, None)
+
+
+class PipelineLocal:
+    def __init__(self, redis):
+        self.redis = redis
+        self.comandos = []
+
+    def __getattr__(self, comando):
+        return lambda *args, **kwargs: self.comandos.append((comando, args, kwargs))
+
+    async def execute(self):
+        if getattr(self.redis, "indisponivel", False) or getattr(self.redis, "pipeline_indisponivel", False):
+            raise RedisConnectionError("sem conexão")
+        self.redis.round_trips += 1
+        resultados = []
+        for comando, args, kwargs in self.comandos:
+            if comando == "delete":
+                resultados.append(sum(self.redis.hashes.pop(chave, None) is not None for chave in args))
+                continue
+            campos = self.redis.hashes.setdefault(args[0], {})
+            if comando == "hsetnx":
+                resultados.append(campos.setdefault(args[1], str(args[2])) == str(args[2]))
+            elif comando == "hget":
+                resultados.append(campos.get(args[1]))
+            elif comando == "hincrby":
+                campos[args[1]] = str(int(campos.get(args[1], 0)) + args[2])
+                resultados.append(int(campos[args[1]]))
+            elif comando == "expire":
+                if not kwargs.get("nx") or args[0] not in self.redis.expiracoes:
+                    self.redis.expiracoes[args[0]] = args[1]
+                resultados.append(True)
+        return resultados
+
+
+class RedisIndisponivel:
+    def pipeline(self, transaction=True):
+        pipe = PipelineLocal(self)
+
+        async def execute():
+            raise RedisConnectionError("sem conexão")
+
+        pipe.execute = execute
+        return pipe
+
+
+@pytest.fixture
+def redis_local():
+    return RedisLocal()
+
+
+@pytest.fixture
+def versoes(redis_local):
+    return VersaoCache(redis_local, expires=600)
+
+
+async def test_obter_e_estavel_ate_incrementar(versoes, redis_local):
+    """Testa que a versão não muda entre leituras e muda a cada alteração, em uma ida ao Redis."""
+    inicial = await versoes.obter(1, VersaoCache.FAVORITOS)
+
+    assert await versoes.obter(1, VersaoCache.FAVORITOS) == inicial
+    assert redis_local.round_trips == 2
+    await versoes.incrementar(1, VersaoCache.FAVORITOS)
+    assert await versoes.obter(1, VersaoCache.FAVORITOS) == inicial + 1
+    assert await versoes.obter(2, VersaoCache.FAVORITOS) != inicial + 1
+    assert redis_local.expiracoes["versao:cliente:1"] == 600
+
+
+async def test_contador_recriado_nao_repete_versoes(versoes):
+    """Testa que um contador perdido recomeça de um valor novo, e não de zero."""
+    anterior = await versoes.obter(1, VersaoCache.PERFIL)
+    await versoes.incrementar(1, VersaoCache.PERFIL)
+
+    await versoes.remover(1)
+
+    assert await versoes.obter(1, VersaoCache.PERFIL) not in (anterior, anterior + 1, 0, 1)
+
+
+async def test_obter_com_redis_indisponivel():
+    """Testa que, sem Redis, a versão é desconhecida e a resposta segue sem ETag."""
+    assert await VersaoCache(RedisIndisponivel()).obter(1, VersaoCache.PERFIL) is None
+
+
+async def test_falha_ao_incrementar_descarta_os_contadores(versoes, redis_local):
+    """Testa que, se o incremento falhar, os contadores são descartados em vez de mantidos desatualizados."""
+    anterior = await versoes.obter(1, VersaoCache.FAVORITOS)
+    redis_local.pipeline_indisponivel = True
+
+    await versoes.incrementar(1, VersaoCache.FAVORITOS)
+
+    assert "versao:cliente:1" not in redis_local.hashes
+    redis_local.pipeline_indisponivel = False
+    assert await versoes.obter(1, VersaoCache.FAVORITOS) not in (anterior, anterior + 1)
+
+
+async def test_descarte_pendente_ate_o_redis_voltar(versoes, redis_local):
+    """Testa que, sem o descarte, a versão do cliente fica desconhecida até ser descartada."""
+    anterior = await versoes.obter(1, VersaoCache.FAVORITOS)
+    await versoes.obter(2, VersaoCache.FAVORITOS)
+    redis_local.indisponivel = True
+
+    await versoes.incrementar(1, VersaoCache.FAVORITOS)
+    await versoes.remover(2)
+
+    assert await versoes.obter(1, VersaoCache.FAVORITOS) is None
+    redis_local.indisponivel = False
+    # A próxima consulta, de qualquer cliente, descarta os contadores pendentes
+    await versoes.obter(3, VersaoCache.PERFIL)
+    assert set(redis_local.hashes) == {"versao:cliente:3"}
+    assert await versoes.obter(1, VersaoCache.FAVORITOS) not in (anterior, anterior + 1)
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from passlib.context import CryptContext
+
+from core.domain.cliente import Cliente, TipoCliente
+from core.security.security import (
+    SenhaExecutor,
+    SenhaExecutorSobrecarregadoError,
+    TokenCache,
+    create_access_token,
+    decode_access_token,
+    get_current_user,
+)
+
+
+def _cliente() -> Cliente:
+    return Cliente(id=1, nome="Ana", email="ana@exemplo.com", tipo=TipoCliente.USER)
+
+
+@pytest.mark.asyncio
+@patch("core.security.security.AsyncClienteRepository")
+async def test_get_current_user_usa_cache_sem_consultar_banco(mock_repo_cls):
+    """Testa que um perfil em cache autentica a requisição sem SQL."""
+    cache = AsyncMock()
+    cache.get.return_value = _cliente()
+    token = create_access_token({"sub": "ana@exemplo.com"})
+
+    user = await get_current_user(token=token, db=AsyncMock(), cliente_cache=cache)
+
+    assert user == _cliente()
+    cache.get.assert_awaited_once_with("ana@exemplo.com")
+    mock_repo_cls.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("core.security.security.AsyncClienteRepository")
+async def test_get_current_user_carrega_do_banco_e_grava_no_cache(mock_repo_cls):
+    """Testa que, na ausência do cache, o perfil (sem senha) é carregado e gravado."""
+    cache = AsyncMock()
+    cache.get.return_value = None
+    mock_repo_cls.return_value.get_perfil_by_email = AsyncMock(return_value=_cliente())
+    token = create_access_token({"sub": "ana@exemplo.com"})
+
+    user = await get_current_user(token=token, db=AsyncMock(), cliente_cache=cache)
+
+    assert user == _cliente()
+    mock_repo_cls.return_value.get_perfil_by_email.assert_awaited_once_with(email="ana@exemplo.com")
+    cache.set.assert_awaited_once_with(_cliente())
+
+
+@pytest.mark.asyncio
+@patch("core.security.security.AsyncClienteRepository")
+async def test_get_current_user_inexistente(mock_repo_cls):
+    """Testa que um subject sem cliente correspondente é rejeitado e não é cacheado."""
+    cache = AsyncMock()
+    cache.get.return_value = None
+    mock_repo_cls.return_value.get_perfil_by_email = AsyncMock(return_value=None)
+    token = create_access_token({"sub": "removido@exemplo.com"})
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user(token=token, db=AsyncMock(), cliente_cache=cache)
+
+    assert exc.value.status_code == 401
+    cache.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_senha_executor_rejeita_quando_fila_cheia():
+    """Testa que, com threads e fila ocupadas, novas operações falham imediatamente."""
+    executor = SenhaExecutor(max_workers=1, max_fila=1)
+    liberar = threading.Event()
+
+    with patch("core.security.security.get_password_hash", lambda senha: liberar.wait(5) and "hash"):
+        ocupadas = [asyncio.create_task(executor.hash("a")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(SenhaExecutorSobrecarregadoError):
+            await executor.hash("b")
+        liberar.set()
+        assert await asyncio.gather(*ocupadas) == ["hash", "hash"]
+
+    assert executor.estatisticas()["rejeitadas"] == 1
+    assert executor.estatisticas()["em_andamento"] == 0
+
+
+@pytest.mark.asyncio
+async def test_senha_executor_cancelamento_nao_libera_vaga_em_execucao():
+    """Testa que uma requisição cancelada mantém a vaga até o bcrypt terminar na thread."""
+    executor = SenhaExecutor(max_workers=1, max_fila=0)
+    iniciado, liberar = threading.Event(), threading.Event()
+
+    def hash_lento(senha):
+        iniciado.set()
+        liberar.wait(5)
+        return "hash"
+
+    with patch("core.security.security.get_password_hash", hash_lento):
+        tarefa = asyncio.create_task(executor.hash("a"))
+        await asyncio.to_thread(iniciado.wait, 5)
+        tarefa.cancel()
+        await asyncio.gather(tarefa, return_exceptions=True)
+
+        assert executor.estatisticas()["em_andamento"] == 1
+        with pytest.raises(SenhaExecutorSobrecarregadoError):
+            await executor.hash("b")
+        liberar.set()
+        async with asyncio.timeout(5):
+            while executor.estatisticas()["em_andamento"]:
+                await asyncio.sleep(0.01)
+        assert await executor.hash("c") == "hash"
+
+
+@pytest.mark.asyncio
+async def test_senha_executor_refaz_hash_com_custo_diferente():
+    """Testa que a verificação devolve um novo hash quando o custo do bcrypt mudou."""
+    executor = SenhaExecutor(max_workers=1)
+    hash_antigo = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("senha123")
+
+    valida, novo_hash = await executor.verificar("senha123", hash_antigo)
+    assert valida is True
+    assert novo_hash is not None and novo_hash != hash_antigo
+
+    assert await executor.verificar("senha123", novo_hash) == (True, None)
+    assert (await executor.verificar("errada", novo_hash))[0] is False
+
+
+def test_token_cache_evita_nova_verificacao_da_assinatura():
+    """Testa que um token repetido é servido do cache, sem nova chamada a jwt.decode."""
+    token = create_access_token({"sub": "ana@exemplo.com"})
+    cache = TokenCache(max_itens=10)
+
+    with patch("core.security.security.token_cache", cache), \
+            patch("core.security.security.jwt.decode", wraps=jwt.decode) as decode:
+        assert decode_access_token(token)["sub"] == "ana@exemplo.com"
+        assert decode_access_token(token)["sub"] == "ana@exemplo.com"
+
+    assert decode.call_count == 1
+    assert cache.estatisticas() == {"hits": 1, "misses": 1, "itens": 1}
+
+
+def test_token_cache_respeita_exp_e_limite(monkeypatch):
+    """Testa a expiração das entradas no `exp` do token e a remoção do menos usado."""
+    cache = TokenCache(max_itens=2)
+    cache.set("a", {"sub": "a", "exp": 1000})
+    cache.set("b", {"sub": "b", "exp": 2000})
+    cache.set("sem_exp", {"sub": "c"})
+    monkeypatch.setattr("core.security.security.time.time", lambda: 1500)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == {"sub": "b", "exp": 2000}
+    cache.set("d", {"sub": "d", "exp": 3000})
+    cache.set("e", {"sub": "e", "exp": 3000})
+    assert cache.get("b") is None
+    assert cache.get("sem_exp") is None
+    assert cache.estatisticas()["itens"] == 2
+
+
+def test_token_invalido_nao_e_cacheado():
+    """Testa que tokens com assinatura inválida continuam sendo rejeitados."""
+    cache = TokenCache()
+    token = create_access_token({"sub": "ana@exemplo.com"}) + "x"
+
+    with patch("core.security.security.token_cache", cache):
+        for _ in range(2):
+            with pytest.raises(JWTError):
+                decode_access_token(token)
+
+    assert cache.estatisticas()["itens"] == 0
@@ -1,7 +1,8 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
-from core.domain.cliente import ClienteCreate, ClienteUpdate, TipoCliente
-from core.service.cliente_service import ClienteService
+from core.domain.cliente import Cliente, ClienteCreate, ClienteInDB, ClienteUpdate, TipoCliente
+from core.repository.cliente_cache import ClienteCache
+from core.service.cliente_service import AsyncClienteService, ClienteService
 from pydantic import SecretStr
 
 
@@ -108,3 +109,175 @@ def test_atualizar_cliente_sem_senha():
     assert update_payload_obj.nome == "Outro Nome"
     # A senha não foi fornecida, então deve ser None no objeto de atualização
     assert update_payload_obj.senha is None
+
+
+def test_listar_clientes_paginado():
+    """Testa que a página consulta um registro a mais para saber se há próxima página."""
+    from core.domain.cliente import Cliente
+    from core.domain.paginacao import codificar_cursor, decodificar_cursor
+
+    mock_repo = MagicMock()
+    mock_repo.list.return_value = [
+        Cliente(id=i, nome=f"C{i}", email=f"c{i}@exemplo.com", tipo=TipoCliente.USER) for i in (11, 12, 13)
+    ]
+    service = ClienteService(mock_repo)
+
+    pagina = service.listar_clientes_paginado(limite=2, cursor=codificar_cursor(10))
+
+    mock_repo.list.assert_called_once_with(apos_id=10, limite=3)
+    assert [c.id for c in pagina.itens] == [11, 12]
+    assert decodificar_cursor(pagina.proximo_cursor) == 12
+
+
+@pytest.mark.asyncio
+async def test_async_criar_cliente():
+    """Testa a criação de um cliente pelo serviço assíncrono, com a senha hasheada."""
+    mock_repo = AsyncMock()
+    mock_repo.get_by_email.return_value = None
+    mock_senhas = AsyncMock()
+    mock_senhas.hash.return_value = "senha_hasheada"
+    service = AsyncClienteService(mock_repo, senhas=mock_senhas)
+
+    await service.criar_cliente(
+        ClienteCreate(nome="Teste", email="teste@exemplo.com", senha="senha123", tipo=TipoCliente.USER)
+    )
+
+    args, _ = mock_repo.create.call_args
+    assert args[0].senha.get_secret_value() == "senha_hasheada"
+
+
+@pytest.mark.asyncio
+async def test_async_atualizar_cliente_hasheia_senha():
+    """Testa que a nova senha é armazenada com hash."""
+    mock_repo = AsyncMock()
+    mock_senhas = AsyncMock()
+    mock_senhas.hash.return_value = "nova_senha_hasheada"
+    mock_repo.update_returning_previous_email.return_value = (
+        Cliente(id=1, nome="Novo", email="a@a.com", tipo=TipoCliente.USER), "a@a.com"
+    )
+    service = AsyncClienteService(mock_repo, senhas=mock_senhas)
+
+    await service.atualizar_cliente(1, ClienteUpdate(nome="Novo", senha=SecretStr("nova")))
+
+    args, _ = mock_repo.update_returning_previous_email.call_args
+    assert args[0] == 1
+    assert args[1].nome == "Novo"
+    assert args[1].senha.get_secret_value() == "nova_senha_hasheada"
+    assert args[1].model_dump(exclude_unset=True).keys() == {"nome", "senha"}
+
+
+@pytest.mark.asyncio
+async def test_async_atualizar_cliente_inexistente():
+    """Testa que atualizar um cliente inexistente levanta ClienteNaoEncontradoError."""
+    from core.domain.cliente import ClienteNaoEncontradoError
+
+    mock_repo = AsyncMock()
+    mock_repo.update_returning_previous_email.return_value = None
+    with pytest.raises(ClienteNaoEncontradoError):
+        await AsyncClienteService(mock_repo).atualizar_cliente(1, ClienteUpdate(nome="X"))
+
+
+@pytest.mark.asyncio
+async def test_async_atualizar_cliente_invalida_cache_de_autenticacao():
+    """Testa que a atualização bem-sucedida remove o perfil do cliente do cache."""
+    mock_repo = AsyncMock()
+    mock_repo.update_returning_previous_email.return_value = (
+        Cliente(id=1, nome="Novo", email="a@a.com", tipo=TipoCliente.USER), "a@a.com"
+    )
+    mock_cache = AsyncMock()
+
+    await AsyncClienteService(mock_repo, cliente_cache=mock_cache).atualizar_cliente(1, ClienteUpdate(nome="Novo"))
+
+    mock_cache.invalidar.assert_awaited_once_with("a@a.com")
+
+
+@pytest.mark.asyncio
+async def test_async_atualizar_email_invalida_cache_do_email_anterior():
+    """Testa que, se o e-mail mudar, o perfil em cache do e-mail anterior também é removido."""
+    mock_repo = AsyncMock()
+    mock_repo.update_returning_previous_email.return_value = (
+        Cliente(id=1, nome="A", email="novo@a.com", tipo=TipoCliente.USER), "antigo@a.com"
+    )
+    mock_redis = AsyncMock()
+
+    await AsyncClienteService(mock_repo, cliente_cache=ClienteCache(mock_redis)).atualizar_cliente(
+        1, ClienteUpdate(nome="A")
+    )
+
+    mock_redis.delete.assert_awaited_once_with("auth:cliente:antigo@a.com", "auth:cliente:novo@a.com")
+
+
+@pytest.mark.asyncio
+async def test_async_deletar_cliente_invalida_cache_de_autenticacao():
+    """Testa que a remoção invalida o perfil em cache pelo e-mail do DELETE, e que falhas não o alteram."""
+    mock_repo = AsyncMock()
+    mock_repo.delete.return_value = "a@a.com"
+    mock_cache = AsyncMock()
+    service = AsyncClienteService(mock_repo, cliente_cache=mock_cache)
+
+    assert await service.deletar_cliente(1) is True
+    mock_cache.invalidar.assert_awaited_once_with("a@a.com")
+    mock_repo.get_by_id.assert_not_awaited()
+
+    mock_cache.reset_mock()
+    mock_repo.delete.return_value = None
+    assert await service.deletar_cliente(2) is False
+    mock_cache.invalidar.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_async_autenticar_refaz_hash_com_custo_antigo():
+    """Testa que um hash com custo desatualizado é substituído após um login válido."""
+    mock_repo = AsyncMock()
+    mock_repo.get_by_email.return_value = ClienteInDB(
+        id=1, nome="A", email="a@a.com", tipo=TipoCliente.USER, senha="hash_antigo"
+    )
+    mock_senhas = AsyncMock()
+    mock_senhas.verificar.return_value = (True, "hash_novo")
+    service = AsyncClienteService(mock_repo, senhas=mock_senhas)
+
+    cliente = await service.autenticar("a@a.com", "senha123")
+
+    assert cliente.id == 1
+    mock_senhas.verificar.assert_awaited_once_with("senha123", "hash_antigo")
+    args, _ = mock_repo.update.call_args
+    assert args[0] == 1
+    assert args[1].model_dump(exclude_unset=True).keys() == {"senha"}
+    assert args[1].senha.get_secret_value() == "hash_novo"
+
+
+@pytest.mark.asyncio
+async def test_async_autenticar_credenciais_invalidas():
+    """Testa que e-mail desconhecido ou senha incorreta não autenticam nem regravam o hash."""
+    mock_repo = AsyncMock()
+    mock_repo.get_by_email.return_value = None
+    mock_senhas = AsyncMock()
+    service = AsyncClienteService(mock_repo, senhas=mock_senhas)
+
+    assert await service.autenticar("x@x.com", "senha") is None
+    mock_senhas.verificar.assert_not_awaited()
+
+    mock_repo.get_by_email.return_value = ClienteInDB(
+        id=1, nome="A", email="a@a.com", tipo=TipoCliente.USER, senha="hash"
+    )
+    mock_senhas.verificar.return_value = (False, None)
+    assert await service.autenticar("a@a.com", "errada") is None
+    mock_repo.update.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_async_alteracoes_atualizam_versao_do_cliente():
+    """Testa que atualizar incrementa a versão do perfil e remover descarta os contadores."""
+    mock_repo = AsyncMock()
+    mock_repo.update_returning_previous_email.return_value = (
+        Cliente(id=1, nome="Novo", email="a@a.com", tipo=TipoCliente.USER), "a@a.com"
+    )
+    mock_repo.delete.return_value = "a@a.com"
+    mock_versoes = AsyncMock()
+    service = AsyncClienteService(mock_repo, versoes=mock_versoes)
+
+    await service.atualizar_cliente(1, ClienteUpdate(nome="Novo"))
+    assert await service.deletar_cliente(1) is True
+
+    mock_versoes.incrementar.assert_awaited_once_with(1, "perfil")
+    mock_versoes.remover.assert_awaited_once_with(1)
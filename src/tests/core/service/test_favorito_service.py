@@ -1,61 +1,72 @@
 from unittest.mock import MagicMock, AsyncMock, call
+import asyncio
+import time
 import pytest
 from core.domain.favorito import Favorito, FavoritoResponse, FavoritoCreate, ProdutoExterno
+from core.domain.paginacao import codificar_cursor, decodificar_cursor
+from core.domain.produto import ProdutoIndisponivelError
+from core.repository.favorito_repository import AsyncFavoritoRepository
+from core.repository.produto_cache import ProdutoCache
 from core.service.favorito_service import FavoritoService
+from core.service.produto_service import ProdutoService
 from externos.fake_store_product import FakeStoreProduct
 
 pytestmark = pytest.mark.asyncio
 
 
+def _produto(produto_id: int, title: str) -> dict:
+    return {
+        "id": produto_id, "title": title, "price": 10.5, "description": "Descrição",
+        "category": "Categoria", "image": f"https://img.com/{produto_id}.png",
+    }
+
+
 @pytest.fixture
 def mock_dependencies():
     """Fixture para criar mocks das dependências do FavoritoService."""
-    mock_repo = MagicMock()
+    mock_repo = AsyncMock(spec=AsyncFavoritoRepository)
     mock_fake_store = AsyncMock(spec=FakeStoreProduct)
-    mock_redis = MagicMock()
-    return mock_repo, mock_fake_store, mock_redis
+    mock_cache = MagicMock(spec=ProdutoCache)
+    mock_cache.get_many_com_validade.return_value = ({}, set())
+    return mock_repo, mock_fake_store, mock_cache
 
 
 @pytest.fixture
 def service(mock_dependencies):
     """Fixture para criar uma instância do FavoritoService com mocks."""
-    mock_repo, mock_fake_store, mock_redis = mock_dependencies
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
     return FavoritoService(
-        repository=mock_repo, fake_store_product=mock_fake_store, redis_client=mock_redis
+        repository=mock_repo, produto_service=ProdutoService(mock_cache, mock_fake_store)
     )
 
 
 async def test_adicionar_favoritos_com_sucesso(service, mock_dependencies):
     """Testa adicionar favoritos com sucesso (cache miss e hit)."""
-    mock_repo, mock_fake_store, mock_redis = mock_dependencies
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
 
     # --- Configuração dos Mocks ---
     # Produto 1 (cache hit), Produto 2 (cache miss), Produto 3 (já favorito)
-    mock_redis.get.side_effect = [
-        b'{"id": 1, "titulo": "P1 Cache", "preco": 10, "imagem": "http://img1.com/img01.png"}', # P1
-        None, # P2
-    ]
-    mock_fake_store.get_product.return_value = {
-        "id": 2, "title": "P2 API", "price": 20, "image": "http://img2.com/img02.png"
-    }
-    mock_repo.exists.side_effect = [False, False, True] # P1, P2, P3
-    service.listar_favoritos = MagicMock(return_value=[]) # Mock para a chamada final
+    mock_cache.get_many_com_validade.return_value = ({1: ProdutoExterno(**_produto(1, "P1 Cache"))}, set()) # P1
+    mock_fake_store.get_product.return_value = _produto(2, "P2 API")
+    mock_repo.existing_produto_ids.return_value = {3} # P3
+    service.listar_favoritos = AsyncMock(return_value=[]) # Mock para a chamada final
 
     # --- Execução ---
     await service.adicionar_favoritos(cliente_id=1, produto_ids=[1, 2, 3])
 
     # --- Verificações ---
-    # 1. Verificação de existência
-    mock_repo.exists.assert_has_calls([call(1, 1), call(1, 2), call(1, 3)])
+    # 1. Verificação de existência em uma única consulta
+    mock_repo.existing_produto_ids.assert_called_once_with(1, [1, 2, 3])
+    mock_repo.exists.assert_not_called()
 
-    # 2. Acesso ao cache Redis
-    mock_redis.get.assert_has_calls([call("produto:1"), call("produto:2")])
+    # 2. Acesso ao cache em uma única leitura
+    mock_cache.get_many_com_validade.assert_called_once_with([1, 2])
 
     # 3. Acesso à API externa (apenas para P2, que não estava em cache)
     mock_fake_store.get_product.assert_called_once_with(2)
 
-    # 4. Cache do produto P2
-    mock_redis.set.assert_called_once()
+    # 4. Cache do produto P2 em uma única escrita
+    mock_cache.set_many.assert_called_once_with({2: ProdutoExterno(**_produto(2, "P2 API"))}, notificar=[2])
 
     # 5. Criação dos favoritos em lote (apenas P1 e P2)
     mock_repo.create_many.assert_called_once()
@@ -64,34 +75,144 @@ async def test_adicionar_favoritos_com_sucesso(service, mock_dependencies):
     assert args[0][0].produto_id == 1
     assert args[0][1].produto_id == 2
 
+async def test_adicionar_favoritos_consulta_api_em_paralelo(mock_dependencies):
+    """Testa que cache misses são validados em paralelo, respeitando o limite e a ordem."""
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
+    em_andamento = 0
+    pico = 0
+
+    async def api_lenta(produto_id):
+        nonlocal em_andamento, pico
+        em_andamento += 1
+        pico = max(pico, em_andamento)
+        await asyncio.sleep(0.1)
+        em_andamento -= 1
+        return _produto(produto_id, f"P{produto_id}")
+
+    mock_repo.existing_produto_ids.return_value = set()
+    mock_fake_store.get_product.side_effect = api_lenta
+    service = FavoritoService(
+        repository=mock_repo,
+        produto_service=ProdutoService(mock_cache, mock_fake_store, max_concorrencia=5),
+    )
+    service.listar_favoritos = AsyncMock(return_value=[])
+    produto_ids = list(range(20, 0, -1))
+
+    inicio = time.perf_counter()
+    await service.adicionar_favoritos(cliente_id=1, produto_ids=produto_ids)
+    duracao = time.perf_counter() - inicio
+
+    # Serialmente seriam 2s (20 x 0.1s); com 5 simultâneas, ~0.4s
+    assert duracao < 1.0
+    assert pico == 5
+    args, _ = mock_repo.create_many.call_args
+    assert [f.produto_id for f in args[0]] == produto_ids
+
+
+async def test_adicionar_favoritos_tempo_limite_excedido(mock_dependencies):
+    """Testa que o lote falha rapidamente quando a API externa excede o tempo limite."""
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
+
+    async def api_travada(produto_id):
+        await asyncio.sleep(10)
+
+    mock_repo.existing_produto_ids.return_value = set()
+    mock_fake_store.get_product.side_effect = api_travada
+    service = FavoritoService(
+        repository=mock_repo,
+        produto_service=ProdutoService(mock_cache, mock_fake_store, tempo_limite_lote=0.1),
+    )
+
+    with pytest.raises(ProdutoIndisponivelError):
+        await service.adicionar_favoritos(cliente_id=1, produto_ids=[1, 2])
+    mock_repo.create_many.assert_not_called()
+
+
 async def test_listar_favoritos(service, mock_dependencies):
     """Testa a listagem de favoritos, buscando dados do cache e da API externa."""
-    mock_repo, mock_fake_store, mock_redis = mock_dependencies
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
 
     # --- Configuração ---
     mock_repo.list_by_cliente.return_value = [
         Favorito(id=1, cliente_id=1, produto_id=10),
         Favorito(id=2, cliente_id=1, produto_id=20)
     ]
-    mock_redis.get.side_effect = [
-        b'{"id": 10, "titulo": "P10 Cache", "preco": 10, "imagem": "img10.png"}', # P10 (cache hit)
-        None # P20 (cache miss)
-    ]
-    mock_fake_store.get_product_sync.return_value = {
-        "id": 20, "titulo": "P20 API", "preco": 20, "imagem": "img20.png"
-    }
+    mock_cache.get_many_com_validade.return_value = ({10: ProdutoExterno(**_produto(10, "P10 Cache"))}, set()) # P20 (cache miss)
+    mock_fake_store.get_product.return_value = _produto(20, "P20 API")
 
     # --- Execução ---
-    response = service.listar_favoritos(cliente_id=1)
+    response = await service.listar_favoritos(cliente_id=1)
 
-    # --- Verificações -- -
+    # --- Verificações ---
     assert len(response) == 2
-    assert response[0].produto.titulo == "P10 Cache"
-    assert response[1].produto.titulo == "P20 API"
-    mock_fake_store.get_product_sync.assert_called_once_with(20)
+    assert response[0].produto.title == "P10 Cache"
+    assert response[1].produto.title == "P20 API"
+    mock_cache.get_many_com_validade.assert_called_once_with([10, 20])
+    mock_fake_store.get_product.assert_awaited_once_with(20)
+    mock_fake_store.get_product_sync.assert_not_called()
 
     # Verifica se o produto foi adicionado ao cache
-    mock_redis.set.assert_called_once_with("produto:20", '''{"id": 20, "titulo": "P20 API", "preco": 20, "imagem": "img20.png"}''', ex=3600)
+    mock_cache.set_many.assert_called_once_with({20: ProdutoExterno(**_produto(20, "P20 API"))}, notificar=[20])
+
+
+async def test_listar_favoritos_consulta_api_em_paralelo(service, mock_dependencies):
+    """Testa que os cache misses da listagem são resolvidos em paralelo."""
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
+
+    async def api_lenta(produto_id):
+        await asyncio.sleep(0.1)
+        return _produto(produto_id, f"P{produto_id}")
+
+    mock_repo.list_by_cliente.return_value = [
+        Favorito(id=i, cliente_id=1, produto_id=i) for i in range(1, 11)
+    ]
+    mock_fake_store.get_product.side_effect = api_lenta
+
+    inicio = time.perf_counter()
+    response = await service.listar_favoritos(cliente_id=1)
+    duracao = time.perf_counter() - inicio
+
+    assert duracao < 0.5
+    assert [f.produto.id for f in response] == list(range(1, 11))
+
+async def test_listar_favoritos_ignora_produto_invalido(service, mock_dependencies):
+    """Testa que produtos inválidos na API externa não são cacheados nem listados."""
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
+    mock_repo.list_by_cliente.return_value = [Favorito(id=1, cliente_id=1, produto_id=30)]
+    mock_fake_store.get_product.return_value = {"id": 30, "titulo": "Sem campos obrigatórios"}
+
+    response = await service.listar_favoritos(cliente_id=1)
+
+    assert response == []
+    mock_cache.set_many.assert_awaited_once_with({}, notificar=[])
+
+
+async def test_listar_favoritos_paginado_consulta_apenas_produtos_da_pagina(service, mock_dependencies):
+    """Testa que apenas os produtos da página atual são consultados."""
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
+    mock_repo.list_by_cliente.return_value = [
+        Favorito(id=i, cliente_id=1, produto_id=i * 10) for i in (6, 7, 8)
+    ]
+    mock_fake_store.get_product.side_effect = lambda produto_id: _produto(produto_id, f"P{produto_id}")
+
+    pagina = await service.listar_favoritos_paginado(cliente_id=1, limite=2, cursor=codificar_cursor(5))
+
+    mock_repo.list_by_cliente.assert_called_once_with(1, apos_id=5, limite=3)
+    mock_cache.get_many_com_validade.assert_called_once_with([60, 70])
+    assert [f.produto.id for f in pagina.itens] == [60, 70]
+    assert decodificar_cursor(pagina.proximo_cursor) == 7
+
+
+async def test_listar_favoritos_paginado_ultima_pagina(service, mock_dependencies):
+    """Testa que a última página não tem cursor."""
+    mock_repo, _, _ = mock_dependencies
+    mock_repo.list_by_cliente.return_value = []
+
+    pagina = await service.listar_favoritos_paginado(cliente_id=1, limite=2)
+
+    mock_repo.list_by_cliente.assert_called_once_with(1, apos_id=None, limite=3)
+    assert pagina.itens == [] and pagina.proximo_cursor is None
+
 
 @pytest.mark.asyncio
 async def test_remover_favorito(service, mock_dependencies):
@@ -99,7 +220,26 @@ async def test_remover_favorito(service, mock_dependencies):
     mock_repo, _, _ = mock_dependencies
     mock_repo.delete.return_value = True
 
-    result = service.remover_favorito(cliente_id=1, produto_id=1)
+    result = await service.remover_favorito(cliente_id=1, produto_id=1)
 
-    mock_repo.delete.assert_called_once_with(1, 1)
+    mock_repo.delete.assert_awaited_once_with(1, 1)
     assert result is True
+
+
+async def test_alteracoes_incrementam_versao_dos_favoritos(mock_dependencies):
+    """Testa que adicionar e remover favoritos invalidam as ETags do cliente."""
+    mock_repo, mock_fake_store, mock_cache = mock_dependencies
+    mock_versoes = AsyncMock()
+    service = FavoritoService(
+        repository=mock_repo, produto_service=ProdutoService(mock_cache, mock_fake_store), versoes=mock_versoes
+    )
+    mock_cache.get_many_com_validade.return_value = ({1: ProdutoExterno(**_produto(1, "P1"))}, set())
+    mock_repo.existing_produto_ids.return_value = set()
+    mock_repo.list_by_cliente.return_value = []
+    mock_repo.delete.side_effect = [True, False]
+
+    await service.adicionar_favoritos(cliente_id=7, produto_ids=[1])
+    await service.remover_favorito(7, 1)
+    await service.remover_favorito(7, 1)
+
+    assert mock_versoes.incrementar.await_args_list == [call(7, "favoritos"), call(7, "favoritos")]
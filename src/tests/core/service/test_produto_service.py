@@ -0,0 +1,216 @@
+from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import pytest
+from core.domain.produto import ProdutoExterno, ProdutoIndisponivelError
+from core.repository.produto_cache import ProdutoCache
+from core.service.produto_service import ProdutoService
+from externos.circuit_breaker import CircuitoAbertoError
+from externos.fake_store_product import FakeStoreProduct
+import httpx
+
+pytestmark = pytest.mark.asyncio
+
+
+def _produto(produto_id: int) -> dict:
+    return {
+        "id": produto_id, "title": f"P{produto_id}", "price": 10.5, "description": "Descrição",
+        "category": "Categoria", "image": f"https://img.com/{produto_id}.png",
+    }
+
+
+@pytest.fixture
+def mock_cache():
+    cache = MagicMock(spec=ProdutoCache)
+    cache.get_many_com_validade.return_value = ({}, set())
+    return cache
+
+
+@pytest.fixture
+def mock_fake_store():
+    return AsyncMock(spec=FakeStoreProduct)
+
+
+async def test_buscas_simultaneas_do_mesmo_produto_sao_coalescidas(mock_cache, mock_fake_store):
+    """Testa que requisições simultâneas pelo mesmo produto geram uma única consulta externa."""
+    async def api_lenta(produto_id):
+        await asyncio.sleep(0.05)
+        return _produto(produto_id)
+
+    mock_fake_store.get_product.side_effect = api_lenta
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    resultados = await asyncio.gather(*(service.obter_produtos([1, 2]) for _ in range(10)))
+
+    assert mock_fake_store.get_product.await_count == 2
+    assert all(r == {1: ProdutoExterno(**_produto(1)), 2: ProdutoExterno(**_produto(2))} for r in resultados)
+    # Apenas o lote que iniciou as buscas grava no cache
+    gravacoes = [c.args[0] for c in mock_cache.set_many.await_args_list if c.args[0]]
+    assert gravacoes == [{1: ProdutoExterno(**_produto(1)), 2: ProdutoExterno(**_produto(2))}]
+    assert service._em_andamento == {}
+
+
+async def test_tempo_limite_de_um_lote_nao_cancela_busca_compartilhada(mock_cache, mock_fake_store):
+    """Testa que o tempo limite de um chamador não interrompe a busca aguardada por outro."""
+    async def api_lenta(produto_id):
+        await asyncio.sleep(0.2)
+        return _produto(produto_id)
+
+    mock_fake_store.get_product.side_effect = api_lenta
+    apressado = ProdutoService(mock_cache, mock_fake_store, tempo_limite_lote=0.05)
+    paciente = ProdutoService(mock_cache, mock_fake_store)
+    paciente._em_andamento = apressado._em_andamento
+
+    tarefa = asyncio.create_task(paciente.obter_produtos([1]))
+    await asyncio.sleep(0)
+    with pytest.raises(ProdutoIndisponivelError):
+        await apressado.obter_produtos([1])
+
+    assert await tarefa == {1: ProdutoExterno(**_produto(1))}
+    assert mock_fake_store.get_product.await_count == 1
+
+
+async def test_lock_distribuido_aguarda_outro_worker(mock_cache, mock_fake_store):
+    """Testa que, sem o lock, o worker aguarda o produto gravado por quem o detém."""
+    produto = ProdutoExterno(**_produto(1))
+    mock_cache.adquirir_lock.return_value = None
+    mock_cache.lock_ativo.side_effect = [True, False]
+    mock_cache.get_many_com_validade.side_effect = [({}, set()), ({1: produto}, set())]
+    service = ProdutoService(mock_cache, mock_fake_store, lock_distribuido=True)
+
+    assert await service.obter_produtos([1]) == {1: produto}
+    mock_fake_store.get_product.assert_not_awaited()
+
+
+async def test_lock_distribuido_busca_e_libera(mock_cache, mock_fake_store):
+    """Testa que quem obtém o lock busca na API, grava no cache uma única vez e libera o lock."""
+    mock_cache.adquirir_lock.return_value = "token"
+    mock_fake_store.get_product.return_value = _produto(1)
+    service = ProdutoService(mock_cache, mock_fake_store, lock_distribuido=True)
+
+    assert await service.obter_produtos([1]) == {1: ProdutoExterno(**_produto(1))}
+    mock_cache.set_many.assert_awaited_once_with({1: ProdutoExterno(**_produto(1))}, notificar=[1])
+    mock_cache.liberar_lock.assert_awaited_once_with(1, "token")
+
+
+async def test_lock_distribuido_revalidacao_grava_uma_vez(mock_cache, mock_fake_store):
+    """Testa que a revalidação com lock grava o produto só no detentor do lock, anunciando se mudou."""
+    antigo = ProdutoExterno(**dict(_produto(1), title="Antigo"))
+    mock_cache.get_many_com_validade.return_value = ({1: antigo}, {1})
+    mock_cache.adquirir_lock.return_value = "token"
+    mock_fake_store.get_product.return_value = _produto(1)
+    service = ProdutoService(mock_cache, mock_fake_store, lock_distribuido=True)
+
+    await service.obter_produtos([1])
+    await asyncio.gather(*service._revalidacoes)
+
+    mock_cache.set_many.assert_awaited_once_with({1: ProdutoExterno(**_produto(1))}, notificar=[1])
+
+
+async def test_produto_desatualizado_e_servido_e_revalidado(mock_cache, mock_fake_store):
+    """Testa que um produto além do soft TTL é servido na hora e atualizado em segundo plano."""
+    antigo = ProdutoExterno(**dict(_produto(1), title="Antigo"))
+    mock_cache.get_many_com_validade.return_value = ({1: antigo}, {1})
+    mock_fake_store.get_product.return_value = _produto(1)
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    assert await service.obter_produtos([1]) == {1: antigo}
+    await asyncio.gather(*service._revalidacoes)
+
+    mock_fake_store.get_product.assert_awaited_once_with(1)
+    mock_cache.set_many.assert_awaited_once_with({1: ProdutoExterno(**_produto(1))}, notificar=[1])
+
+
+async def test_revalidacao_sem_alteracao_nao_e_anunciada(mock_cache, mock_fake_store):
+    """Testa que um produto revalidado sem mudanças é regravado sem anúncio aos demais workers."""
+    mock_cache.get_many_com_validade.return_value = ({1: ProdutoExterno(**_produto(1))}, {1})
+    mock_fake_store.get_product.return_value = _produto(1)
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    await service.obter_produtos([1])
+    await asyncio.gather(*service._revalidacoes)
+
+    mock_cache.set_many.assert_awaited_once_with({1: ProdutoExterno(**_produto(1))}, notificar=[])
+
+
+async def test_revalidacao_com_falha_mantem_copia(mock_cache, mock_fake_store):
+    """Testa que falhas na revalidação não afetam a resposta nem o cache."""
+    antigo = ProdutoExterno(**_produto(1))
+    mock_cache.get_many_com_validade.return_value = ({1: antigo}, {1})
+    mock_fake_store.get_product.side_effect = CircuitoAbertoError("aberto")
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    assert await service.obter_produtos([1]) == {1: antigo}
+    await asyncio.gather(*service._revalidacoes)
+
+    mock_cache.set_many.assert_not_awaited()
+
+
+async def test_falha_da_api_sem_copia_em_cache(mock_cache, mock_fake_store):
+    """Testa que a falha da API externa para um produto sem cópia gera ProdutoIndisponivelError."""
+    mock_fake_store.get_product.side_effect = httpx.ConnectTimeout("timeout")
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    with pytest.raises(ProdutoIndisponivelError):
+        await service.obter_produtos([1])
+
+
+async def test_produto_inexistente_e_cacheado_como_negativo(mock_cache, mock_fake_store):
+    """Testa que IDs desconhecidos pela API externa são gravados como inexistentes e omitidos."""
+    mock_fake_store.get_product.side_effect = lambda produto_id: None if produto_id == 999 else _produto(produto_id)
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    assert await service.obter_produtos([1, 999]) == {1: ProdutoExterno(**_produto(1))}
+    mock_cache.set_many.assert_awaited_once_with(
+        {1: ProdutoExterno(**_produto(1)), 999: None}, notificar=[1, 999]
+    )
+
+
+async def test_produto_em_cache_negativo_nao_consulta_api(mock_cache, mock_fake_store):
+    """Testa que um ID já registrado como inexistente não gera nova consulta externa."""
+    mock_cache.get_many_com_validade.return_value = ({999: None}, set())
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    assert await service.obter_produtos([999]) == {}
+    mock_fake_store.get_product.assert_not_awaited()
+
+
+async def test_carregar_catalogo_grava_em_lote_e_anuncia_alterados(mock_cache, mock_fake_store):
+    """Testa que o catálogo é gravado de uma vez e apenas produtos alterados ou novos são anunciados."""
+    alterado = dict(_produto(2), title="Título antigo")
+    mock_fake_store.get_products.return_value = [_produto(1), _produto(2), _produto(3), {"id": 4}]
+    mock_cache.reservar_atualizacao_catalogo.return_value = True
+    mock_cache.get_many_com_validade.return_value = (
+        {1: ProdutoExterno(**_produto(1)), 2: ProdutoExterno(**alterado)}, set()
+    )
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    assert await service.carregar_catalogo(intervalo=60) == 3
+
+    mock_fake_store.get_product.assert_not_awaited()
+    mock_cache.set_many.assert_awaited_once_with(
+        {i: ProdutoExterno(**_produto(i)) for i in (1, 2, 3)}, notificar=[2, 3]
+    )
+
+
+async def test_carregar_catalogo_ignorado_se_outro_worker_atualizou(mock_cache, mock_fake_store):
+    """Testa que a carga é ignorada quando o catálogo já foi atualizado dentro do intervalo."""
+    mock_cache.reservar_atualizacao_catalogo.return_value = False
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    assert await service.carregar_catalogo(intervalo=60) == 0
+    mock_fake_store.get_products.assert_not_awaited()
+    mock_cache.set_many.assert_not_awaited()
+
+
+async def test_atualizacao_periodica_sobrevive_a_falhas(mock_cache, mock_fake_store):
+    """Testa que falhas da API externa não interrompem a atualização periódica do catálogo."""
+    mock_cache.reservar_atualizacao_catalogo.return_value = True
+    mock_fake_store.get_products.side_effect = [httpx.ConnectError("falha"), [_produto(1)]]
+    service = ProdutoService(mock_cache, mock_fake_store)
+
+    tarefa = asyncio.create_task(service.atualizar_catalogo_periodicamente(0.01))
+    await asyncio.sleep(0.1)
+    tarefa.cancel()
+    await asyncio.gather(tarefa, return_exceptions=True)
+
+    mock_cache.set_many.assert_awaited_once_with({1: ProdutoExterno(**_produto(1))}, notificar=[1])
@@ -0,0 +1,61 @@
+import pytest
+
+from externos.circuit_breaker import CircuitBreaker, CircuitoAbertoError
+
+
+def test_abre_apos_falhas_consecutivas():
+    """Testa que o circuito abre ao atingir o limite de falhas e rejeita chamadas."""
+    cb = CircuitBreaker("teste", limite_falhas=2, tempo_recuperacao=60)
+    cb.verificar()
+    cb.registrar_falha()
+    cb.verificar()
+    cb.registrar_falha()
+
+    with pytest.raises(CircuitoAbertoError):
+        cb.verificar()
+    assert cb.estatisticas() == {"estado": "aberto", "falhas_consecutivas": 2, "rejeitadas": 1}
+
+
+def test_sucesso_zera_falhas():
+    """Testa que um sucesso reinicia a contagem de falhas consecutivas."""
+    cb = CircuitBreaker("teste", limite_falhas=2)
+    cb.registrar_falha()
+    cb.registrar_sucesso()
+    cb.registrar_falha()
+
+    cb.verificar()
+    assert cb.estado == CircuitBreaker.FECHADO
+
+
+def test_meio_aberto_permite_uma_tentativa(monkeypatch):
+    """Testa que, após o tempo de recuperação, apenas uma chamada de teste é permitida."""
+    agora = [100.0]
+    monkeypatch.setattr("externos.circuit_breaker.time.monotonic", lambda: agora[0])
+    cb = CircuitBreaker("teste", limite_falhas=1, tempo_recuperacao=10)
+    cb.registrar_falha()
+
+    agora[0] += 10
+    cb.verificar()
+    assert cb.estado == CircuitBreaker.MEIO_ABERTO
+    with pytest.raises(CircuitoAbertoError):
+        cb.verificar()
+
+    cb.registrar_sucesso()
+    assert cb.estado == CircuitBreaker.FECHADO
+
+
+def test_falha_no_meio_aberto_reabre(monkeypatch):
+    """Testa que uma falha na chamada de teste reabre o circuito."""
+    agora = [100.0]
+    monkeypatch.setattr("externos.circuit_breaker.time.monotonic", lambda: agora[0])
+    cb = CircuitBreaker("teste", limite_falhas=3, tempo_recuperacao=10)
+    for _ in range(3):
+        cb.registrar_falha()
+
+    agora[0] += 10
+    cb.verificar()
+    cb.registrar_falha()
+
+    assert cb.estado == CircuitBreaker.ABERTO
+    with pytest.raises(CircuitoAbertoError):
+        cb.verificar()
@@ -0,0 +1,148 @@
+import asyncio
+import httpx
+import pytest
+
+from externos.circuit_breaker import CircuitBreaker, CircuitoAbertoError
+from externos.fake_store_product import FakeStoreProduct
+
+pytestmark = pytest.mark.asyncio
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/products":
+        return httpx.Response(200, json=[{"id": 1}, {"id": 2}])
+    product_id = int(request.url.path.rsplit("/", 1)[-1])
+    if product_id == 404:
+        return httpx.Response(404)
+    if product_id == 500:
+        return httpx.Response(500)
+    if product_id == 429:
+        return httpx.Response(429)
+    if product_id == 408:
+        raise httpx.ReadTimeout("timeout", request=request)
+    if product_id == 999:
+        return httpx.Response(200, content=b"")
+    return httpx.Response(200, json={"id": product_id})
+
+
+async def test_get_product_reutiliza_cliente_compartilhado():
+    """Testa que chamadas consecutivas usam o mesmo cliente HTTP (pool compartilhado)."""
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(client=client)
+
+    assert await fake_store.get_product(1) == {"id": 1}
+    assert await fake_store.get_product(2) == {"id": 2}
+    assert fake_store.client is client
+
+    await fake_store.aclose()
+    assert client.is_closed
+
+
+async def test_get_product_not_found():
+    """Testa que erros HTTP retornam None."""
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(client=client)
+
+    assert await fake_store.get_product(404) is None
+    await fake_store.aclose()
+
+
+async def test_get_product_corpo_vazio_indica_inexistente():
+    """Testa que a resposta 200 sem corpo, usada pela FakeStore para IDs desconhecidos, retorna None."""
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(client=client)
+
+    assert await fake_store.get_product(999) is None
+    await fake_store.aclose()
+
+
+async def test_get_product_sync_reutiliza_cliente():
+    """Testa o método síncrono com cliente injetado."""
+    sync_client = httpx.Client(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(sync_client=sync_client)
+
+    assert fake_store.get_product_sync(3) == {"id": 3}
+    assert fake_store.sync_client is sync_client
+
+    await fake_store.aclose()
+    assert sync_client.is_closed
+
+
+async def test_falhas_transitorias_abrem_o_circuito():
+    """Testa que 5xx e timeouts são propagados e abrem o circuito, que passa a falhar rápido."""
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(client=client, circuit_breaker=CircuitBreaker("fakestore", limite_falhas=2))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fake_store.get_product(500)
+    with pytest.raises(httpx.TimeoutException):
+        await fake_store.get_product(408)
+    with pytest.raises(CircuitoAbertoError):
+        await fake_store.get_product(1)
+
+    assert fake_store.circuit_breaker.estado == CircuitBreaker.ABERTO
+    await fake_store.aclose()
+
+
+async def test_produto_inexistente_nao_conta_como_falha():
+    """Testa que respostas 4xx não abrem o circuito."""
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(client=client, circuit_breaker=CircuitBreaker("fakestore", limite_falhas=1))
+
+    assert await fake_store.get_product(404) is None
+    assert await fake_store.get_product(1) == {"id": 1}
+    await fake_store.aclose()
+
+
+async def test_erros_4xx_transitorios_contam_como_falha():
+    """Testa que 429 não é tratado como produto inexistente e conta como falha do circuito."""
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(_handler))
+    fake_store = FakeStoreProduct(client=client, circuit_breaker=CircuitBreaker("fakestore", limite_falhas=1))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fake_store.get_product(429)
+
+    assert fake_store.circuit_breaker.estado == CircuitBreaker.ABERTO
+    await fake_store.aclose()
+
+
+async def test_get_products_busca_catalogo_em_uma_chamada():
+    """Testa que o catálogo completo é obtido em uma única requisição."""
+    requisicoes = []
+
+    def handler(request):
+        requisicoes.append(request.url.path)
+        return _handler(request)
+
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(handler))
+    fake_store = FakeStoreProduct(client=client)
+
+    assert await fake_store.get_products() == [{"id": 1}, {"id": 2}]
+    assert requisicoes == ["/products"]
+    await fake_store.aclose()
+
+
+@pytest.mark.parametrize("erro", [httpx.DecodingError("corpo inválido"), asyncio.CancelledError()])
+async def test_excecao_na_chamada_de_teste_libera_o_circuito(monkeypatch, erro):
+    """Testa que exceções fora de TransportError (ex.: cancelamento) encerram a chamada de teste."""
+    agora = [100.0]
+    monkeypatch.setattr("externos.circuit_breaker.time.monotonic", lambda: agora[0])
+
+    def handler(request):
+        raise erro
+
+    client = httpx.AsyncClient(base_url="https://fake", transport=httpx.MockTransport(handler))
+    breaker = CircuitBreaker("fakestore", limite_falhas=1, tempo_recuperacao=10)
+    breaker.registrar_falha()
+    fake_store = FakeStoreProduct(client=client, circuit_breaker=breaker)
+
+    agora[0] += 10
+    with pytest.raises(type(erro)):
+        await fake_store.get_product(1)
+    assert breaker.estado == CircuitBreaker.ABERTO
+
+    # Passado o tempo de recuperação, uma nova chamada de teste é permitida
+    agora[0] += 10
+    with pytest.raises(type(erro)):
+        await fake_store.get_product(1)
+    await fake_store.aclose()